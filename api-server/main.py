@@ -1,4 +1,5 @@
 import os
+import re
 import sys
 import json
 import logging
@@ -16,7 +17,15 @@ if PARENT_DIR not in sys.path:
     sys.path.append(PARENT_DIR)
 
 from consistentvideo import reference, story, video  # noqa: E402
+from consistentvideo.story.bulk_cut import STATUS_COMPLETED, STATUS_FAILED  # noqa: E402
 from consistentvideo.multimodal import EntityMultimodalEditor, edit_or_add_entity  # noqa: E402
+from consistentvideo.aimodel import get_response_cache, governor_snapshot, get_job_poller, model_concurrency, run_ordered, warm_up  # noqa: E402
+from consistentvideo.storage.derivatives import (  # noqa: E402
+    SIZES as DERIVATIVE_SIZES,
+    FORMATS as DERIVATIVE_FORMATS,
+    get_derivative,
+    media_type_of as derivative_media_type,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -193,6 +202,11 @@ def save_text(path: str, text: str) -> None:
         f.write(text or "")
 
 
+def is_cut_image_file(filename: str) -> bool:
+    # S0001-C0001.png 형식의 컷 이미지만 (이전 버전이 남긴 resized_* 등 부산물 제외)
+    return filename.lower().endswith((".png", ".jpg", ".jpeg")) and re.match(r"S(\d+)-C(\d+)", filename) is not None
+
+
 # -----------------------------
 # 스키마
 # -----------------------------
@@ -227,6 +241,7 @@ class CreateEntitiesRequest(BaseModel):
 class CreateEntitiesResponse(BaseModel):
     entity_list: list
     entity_list_output_path: str
+    cache_report: Optional[dict] = None
 
 
 class GenerateScenesRequest(BaseModel):
@@ -258,6 +273,10 @@ class GenerateCutsRequest(BaseModel):
 class GenerateCutsResponse(BaseModel):
     cut_list: list
     cuts_output_path: str
+    failed_scenes: list = Field(default_factory=list, description="동시 생성 모드에서 실패한 씬 목록")
+    token_usage: dict = Field(default_factory=dict, description="프롬프트/캐시/완성 토큰 사용량 합계")
+    bulk_status: Optional[str] = Field(default=None, description="벌크 모드 작업 상태 (running/completed/failed)")
+    bulk_job_id: Optional[str] = Field(default=None, description="벌크 모드 작업 ID")
 
 
 class GenerateCutImagesRequest(BaseModel):
@@ -275,6 +294,8 @@ class GenerateCutImagesRequest(BaseModel):
 
 class GenerateCutImagesResponse(BaseModel):
     cut_image_paths: List[str]
+    failed_cuts: list = Field(default_factory=list, description="생성에 실패한 컷 목록 (나머지 컷은 계속 생성)")
+    reused_cut_image_paths: List[str] = Field(default_factory=list, description="증분 모드에서 입력이 바뀌지 않아 재사용한 컷 이미지")
 
 
 class GenerateCutVideosRequest(BaseModel):
@@ -289,6 +310,8 @@ class GenerateCutVideosRequest(BaseModel):
 
 class GenerateCutVideosResponse(BaseModel):
     video_clip_paths: List[str]
+    failed_cuts: list = Field(default_factory=list, description="영상 생성에 실패한 컷 목록")
+    resumed_cut_ids: list = Field(default_factory=list, description="다시 제출하지 않고 기존 렌더 작업을 이어받은 컷 ID")
 
 
 class ConcatVideosRequest(BaseModel):
@@ -318,6 +341,15 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def warm_up_clients():
+    # CAVG_WARM_UP_CLIENTS=1이면 공용 프로바이더 클라이언트를 미리 생성, connect면 연결(TLS)까지 열어 둠
+    mode = os.getenv("CAVG_WARM_UP_CLIENTS", "").lower()
+    if mode in ("1", "true", "yes", "connect"):
+        status = warm_up(connect=(mode == "connect"))
+        logger.info(f"프로바이더 클라이언트 warm-up: {status}")
+
+
 # 1) 시놉시스 분석
 @app.post("/analyze-synopsis", response_model=SynopsisAnalyzeResponse)
 def analyze_synopsis(
@@ -328,6 +360,8 @@ def analyze_synopsis(
     synopsis_text_file: Optional[UploadFile] = File(None),
     analyzer_save_dir: Optional[str] = Form(None),
     text_model: str = Form("gpt-4.1"),
+    use_cache: bool = Form(True),
+    chunk_chars: Optional[int] = Form(None, description="지정하면 시놉시스를 이 글자 수 이하 청크로 나눠 동시에 분석"),
 ):
     os.environ.setdefault("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY", ""))
 
@@ -355,7 +389,7 @@ def analyze_synopsis(
                 synopsis = f.read()
         else:
             raise HTTPException(status_code=400, detail="synopsis_text is required (no input and no default file found)")
-    entity_dict_draft_list = analyzer.analyze(synopsis)
+    entity_dict_draft_list = analyzer.analyze(synopsis, use_cache=use_cache, chunk_chars=chunk_chars)
 
     saved_txt = os.path.join(analyzer_dir, "entity_draft.txt")
     saved_json = os.path.join(analyzer_dir, "entity_dict_draft.json")
@@ -376,6 +410,8 @@ def create_entities(
     image_style: str = Form("realistic"),
     image_quality: str = Form("low"),
     image_size: str = Form("1536x1024"),
+    concurrency: int = Form(4, description="동시에 생성할 레퍼런스 이미지 수 (모델별 상한 적용)"),
+    force_regenerate: bool = Form(False, description="True면 레퍼런스 이미지 캐시를 무시하고 새로 생성"),
 ):
     paths = derive_paths(work_dir, entity_set_name)
     reference_image_dir = reference_image_dir or paths["REFERENCE_IMAGES_DIR"]
@@ -411,34 +447,50 @@ def create_entities(
         creator.set_style(image_style)
         creator.set_image_quality(image_quality)
         creator.set_image_size(image_size)
+        creator.set_force_regenerate(force_regenerate)
         # Gemini 모델인 경우 aspect ratio 설정
         if image_model == "gemini-2.5-flash-imag(Nano Banana)":
             creator.set_aspect_ratio("1:1")
 
-    entity_list = []
+    def create_one(entity: dict) -> tuple:
+        type_ = entity.get("type")
+        name = entity.get("name")
+        description = entity.get("description")
+        try:
+            if name == "기타":
+                return (type_, name, description, None)
+            elif type_ == "character":
+                return character_creator.create(type_, name, description)
+            elif type_ == "location":
+                return location_creator.create(type_, name, description)
+            elif type_ == "object":
+                return object_creator.create(type_, name, description)
+            return (type_, name, description, None)
+        except Exception as e:
+            logger.error(f"이미지 생성 실패 [{type_}:{name}]: {e}")
+            return (type_, name, description, None)
+
+    # 완료된 엔티티는 앞선 엔티티가 모두 끝나는 즉시 입력 순서대로 기록
     with open(entity_list_output_path, "w", encoding="utf-8") as f:
-        for entity in entities:
-            type_ = entity.get("type")
-            name = entity.get("name")
-            description = entity.get("description")
-            try:
-                if name == "기타":
-                    result = (type_, name, description, None)
-                elif type_ == "character":
-                    result = character_creator.create(type_, name, description)
-                elif type_ == "location":
-                    result = location_creator.create(type_, name, description)
-                elif type_ == "object":
-                    result = object_creator.create(type_, name, description)
-                else:
-                    result = (type_, name, description, None)
-            except Exception as e:
-                logger.error(f"이미지 생성 실패 [{type_}:{name}]: {e}")
-                result = (type_, name, description, None)
-            entity_list.append(result)
+        def write_row(index: int, entity: dict, result) -> None:
             f.write(str(result) + "\n")
+            f.flush()
+
+        entity_list = run_ordered(
+            entities,
+            create_one,
+            max_workers=min(max(1, concurrency), model_concurrency(image_model)),
+            on_result=write_row,
+        )
+
+    cache_report = {"hits": 0, "misses": 0, "hit_names": [], "miss_names": []}
+    for creator in (character_creator, location_creator, object_creator):
+        report = creator.cache_report()
+        for key in cache_report:
+            cache_report[key] += report[key]
+    logger.info(f"레퍼런스 이미지 캐시: 적중 {cache_report['hits']}개, 생성 {cache_report['misses']}개")
 
-    return CreateEntitiesResponse(entity_list=entity_list, entity_list_output_path=entity_list_output_path)
+    return CreateEntitiesResponse(entity_list=entity_list, entity_list_output_path=entity_list_output_path, cache_report=cache_report)
 
 
 # 2-2) 멀티모달 기반 entity_list 수정 또는 생성 (이미지 업로드 지원)
@@ -459,6 +511,7 @@ async def multimodal_edit_or_add(
     image_style: str = Form("realistic"),
     image_quality: str = Form("low"),
     image_size: str = Form("1024x1024"),
+    use_cache: bool = Form(True),
     image: Optional[UploadFile] = File(None),
 ):
     paths = derive_paths(work_dir, entity_set_name)
@@ -486,6 +539,7 @@ async def multimodal_edit_or_add(
         image_style=image_style,
         image_quality=image_quality,
         image_size=image_size,
+        use_cache=use_cache,
     )
     
     # Gemini 모델인 경우 aspect ratio 설정
@@ -524,6 +578,8 @@ def generate_scenes(
     story_text_file: Optional[UploadFile] = File(None),
     output_scene_txt_path: Optional[str] = Form(None),
     text_model: str = Form("gpt-4.1"),
+    use_cache: bool = Form(True),
+    stream: bool = Form(False, description="응답을 스트리밍으로 받아 씬이 완성될 때마다 scene.txt에 기록"),
 ):
     story_text_content = read_upload_text_sync(story_text_file)
     story_text_content = story_text_content if story_text_content is not None else load_text_from_path_or_content(story_text_path, story_text)
@@ -548,10 +604,21 @@ def generate_scenes(
             raise HTTPException(status_code=400, detail="story_text is required (no input and no default file found)")
 
     scene_gen = story.SceneGenerator()
-    scenes = scene_gen.generate_scenes(story_text_content, model=text_model)
-
     output_scene_txt_path = output_scene_txt_path or paths["SCENE_TXT_PATH"]
 
+    if stream and output_scene_txt_path:
+        # 씬이 완성되는 즉시 한 줄씩 기록
+        ensure_dir(os.path.dirname(output_scene_txt_path))
+        scenes = []
+        with open(output_scene_txt_path, "w", encoding="utf-8") as f:
+            for scene in scene_gen.iter_scenes(story_text_content, model=text_model, use_cache=use_cache):
+                scenes.append(scene)
+                f.write(str(scene) + "\n")
+                f.flush()
+        return GenerateScenesResponse(scenes=scenes, output_scene_txt_path=output_scene_txt_path)
+
+    scenes = scene_gen.generate_scenes(story_text_content, model=text_model, use_cache=use_cache, stream=stream)
+
     output_path = None
     if output_scene_txt_path:
         ensure_dir(os.path.dirname(output_scene_txt_path))
@@ -578,6 +645,10 @@ def generate_cuts(
     story_text_file: Optional[UploadFile] = File(None),
     cuts_output_path: Optional[str] = Form(None),
     text_model: str = Form("gpt-4.1"),
+    use_cache: bool = Form(True),
+    concurrency: int = Form(1, description="동시에 컷 분할할 씬 수 (1이면 순차 처리)"),
+    prompt_layout: str = Form("inline", description="'inline' 또는 'prefix' (프로바이더 프롬프트 캐시용 고정 접두부)"),
+    bulk: Optional[str] = Form(None, description="'openai' 또는 'local': 벌크 작업으로 제출하고, 같은 요청을 다시 보내면 완료된 결과를 cut.txt에 기록"),
 ):
     # 씬 로드
     scenes_list = parse_json_str(scenes)
@@ -616,18 +687,91 @@ def generate_cuts(
         entity_list = load_entity_list(entity_list_path)
     cuts_output = cuts_output_path or paths["CUT_TXT_PATH"]
 
-    cut_generator = story.CutGenerator()
+    try:
+        cut_generator = story.CutGenerator(prompt_layout=prompt_layout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if bulk:
+        return generate_cuts_bulk(
+            cut_generator, bulk, scenes_list, entity_list, story_text_content, cuts_output,
+            model=text_model, use_cache=use_cache,
+        )
+
     cut_list = []
-    for scene in scenes_list:
-        cuts = cut_generator.cut_scene(scene, entity_list, story_text=story_text_content, model=text_model)
-        cut_list.append(cuts)
+    failed_scenes = []
+    if concurrency > 1:
+        # 씬별로 독립 실행하고, 실패한 씬은 빈 컷 목록으로 자리를 유지해 씬 순서를 보존
+        results = cut_generator.cut_scenes(
+            scenes_list, entity_list, story_text_content,
+            model=text_model, use_cache=use_cache, max_workers=concurrency,
+        )
+        for idx, (scene, result) in enumerate(zip(scenes_list, results), start=1):
+            if isinstance(result, Exception):
+                scene_id = scene.get("scene_id") if isinstance(scene, dict) else None
+                failed_scenes.append({"scene_num": idx, "scene_id": scene_id, "error": str(result)})
+                cut_list.append([])
+            else:
+                cut_list.append(result)
+    else:
+        for scene in scenes_list:
+            cuts = cut_generator.cut_scene(scene, entity_list, story_text=story_text_content, model=text_model, use_cache=use_cache)
+            cut_list.append(cuts)
 
     ensure_dir(os.path.dirname(cuts_output))
     with open(cuts_output, "w", encoding="utf-8") as f:
         for cuts in cut_list:
             f.write(str(cuts) + "\n")
 
-    return GenerateCutsResponse(cut_list=cut_list, cuts_output_path=cuts_output)
+    return GenerateCutsResponse(
+        cut_list=cut_list,
+        cuts_output_path=cuts_output,
+        failed_scenes=failed_scenes,
+        token_usage=cut_generator.usage_summary(),
+    )
+
+
+def generate_cuts_bulk(cut_generator, backend_name: str, scenes_list: list, entity_list: list, story_text: str,
+                       cuts_output: str, *, model: str, use_cache: bool) -> GenerateCutsResponse:
+    """
+    벌크 모드: 처음 호출하면 전체 씬을 벌크 작업으로 제출하고 바로 반환한다.
+    같은 입력으로 다시 호출하면 작업 상태를 확인해, 끝났으면 결과를 cut.txt에 기록하고 컷 목록을 반환한다.
+    작업 정보는 cut.txt 옆 bulk/ 폴더에 남으므로 서버를 재시작해도 이어서 받을 수 있다.
+    """
+    try:
+        backend = story.get_bulk_backend(backend_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = story.BulkCutJob(
+        cut_generator, backend, os.path.join(os.path.dirname(cuts_output), "bulk"), model=model, use_cache=use_cache
+    )
+
+    if job.has_manifest():
+        job.resume()
+        if job.input_digest != job.make_input_digest(scenes_list, entity_list, story_text):
+            # 입력이 바뀌었으면 이전 작업 결과는 쓰지 않고 새로 제출
+            logger.warning(f"이전 벌크 작업(job_id={job.job_id})과 입력이 달라 새로 제출합니다.")
+            job.finish()
+    if not job.has_manifest():
+        job.submit(scenes_list, entity_list, story_text)
+
+    status = job.status()
+    if status == STATUS_FAILED:
+        job.finish()
+        raise HTTPException(status_code=502, detail=f"벌크 작업이 실패했습니다: job_id={job.job_id}")
+    if status != STATUS_COMPLETED:
+        return GenerateCutsResponse(cut_list=[], cuts_output_path=cuts_output, bulk_status=status, bulk_job_id=job.job_id)
+
+    job.collect()
+    job.write_cut_txt(cuts_output)
+    job.finish()
+    return GenerateCutsResponse(
+        cut_list=[[] if isinstance(cuts, Exception) else cuts for cuts in job.results],
+        cuts_output_path=cuts_output,
+        failed_scenes=job.failed_scenes(),
+        token_usage=cut_generator.usage_summary(),
+        bulk_status=status,
+        bulk_job_id=job.job_id,
+    )
 
 
 # 5) 컷 이미지 생성
@@ -648,6 +792,8 @@ def generate_cut_images(
     scene_num: Optional[int] = Form(None),
     cut_num: Optional[int] = Form(None),
     selected_cuts: Optional[str] = Form(None),  # JSON string of selected cuts
+    concurrency: int = Form(4, description="동시에 생성할 컷 이미지 수 (모델별 상한 적용, 1이면 순차 처리)"),
+    incremental: bool = Form(False, description="입력(설명/엔티티/참조 이미지/스타일/모델)이 바뀐 컷만 다시 생성"),
 ):
     paths = derive_paths(work_dir, entity_set_name)
     entity_list_path = entity_list_path or paths["REFERENCE_ENTITY_LIST_PATH"]
@@ -668,9 +814,43 @@ def generate_cut_images(
     ensure_dir(cut_image_output_dir)
 
     cut_image_paths: List[str] = []
+    failed_cuts = []
 
-    # selected_cuts 파라미터가 있으면 선택된 컷만 처리
+    # 엔티티 색인/참조 이미지 확인은 한 번만 하고 모든 컷 생성기가 공유
+    catalog = video.EntityCatalog(entity_list, entity_image_dir)
+
+    def make_generator(s_num: int, c_num: int, cut: dict):
+        # cut 객체에 cut_num 추가
+        cut["cut_num"] = c_num
+        return video.CutImageGenerator(
+            scene_num=s_num,
+            cut=cut,
+            output_path=cut_image_output_dir,
+            entity_image_path=entity_image_dir,
+            entity=entity_list,
+            ai_model=image_model,
+            style=image_style,
+            quality=image_quality,
+            size=image_size,
+            catalog=catalog,
+            incremental=incremental,
+        )
+
+    # 단일 컷 지정 시 처리
+    if not selected_cuts and scene_num is not None and cut_num is not None:
+        if scene_num < 1 or scene_num > len(cuts_by_scene):
+            raise HTTPException(status_code=400, detail="scene_num out of range")
+        scene_cuts = cuts_by_scene[scene_num - 1]
+        if cut_num < 1 or cut_num > len(scene_cuts):
+            raise HTTPException(status_code=400, detail="cut_num out of range")
+        generator = make_generator(scene_num, cut_num, scene_cuts[cut_num - 1])
+        cut_image_paths.append(generator.execute())
+        return GenerateCutImagesResponse(cut_image_paths=cut_image_paths)
+
+    # 생성할 컷 목록 (scene_num, cut_num, cut)
+    targets = []
     if selected_cuts:
+        # selected_cuts 파라미터가 있으면 선택된 컷만 처리
         import json
         selected_list = json.loads(selected_cuts)
         for cut_info in selected_list:
@@ -681,71 +861,44 @@ def generate_cut_images(
             scene_cuts = cuts_by_scene[s_num - 1]
             if c_num < 1 or c_num > len(scene_cuts):
                 continue
-            cut = scene_cuts[c_num - 1]
-            # cut 객체에 cut_num 추가
-            cut["cut_num"] = c_num
-            generator = video.CutImageGenerator(
-                scene_num=s_num,
-                cut=cut,
-                output_path=cut_image_output_dir,
-                entity_image_path=entity_image_dir,
-                entity=entity_list,
-                ai_model=image_model,
-                style=image_style,
-                quality=image_quality,
-                size=image_size,
-            )
-            filename = generator.execute()
-            cut_image_paths.append(filename)
-    # 단일 컷 지정 시 처리
-    elif scene_num is not None and cut_num is not None:
-        if scene_num < 1 or scene_num > len(cuts_by_scene):
-            raise HTTPException(status_code=400, detail="scene_num out of range")
-        scene_cuts = cuts_by_scene[scene_num - 1]
-        if cut_num < 1 or cut_num > len(scene_cuts):
-            raise HTTPException(status_code=400, detail="cut_num out of range")
-        cut = scene_cuts[cut_num - 1]
-        # cut 객체에 cut_num 추가
-        cut["cut_num"] = cut_num
-        generator = video.CutImageGenerator(
-            scene_num=scene_num,
-            cut=cut,
-            output_path=cut_image_output_dir,
-            entity_image_path=entity_image_dir,
-            entity=entity_list,
-            ai_model=image_model,
-            style=image_style,
-            quality=image_quality,
-            size=image_size,
-        )
-        filename = generator.execute()
-        cut_image_paths.append(filename)
+            targets.append((s_num, c_num, scene_cuts[c_num - 1]))
     else:
         # 전체 컷 처리
-        s_idx = 1
-        for scene in cuts_by_scene:
-            c_idx = 1
-            for cut in scene:
-                # cut 객체에 cut_num 추가
-                cut["cut_num"] = c_idx
-                cut_image_generator = video.CutImageGenerator(
-                    scene_num=s_idx,
-                    cut=cut,
-                    output_path=cut_image_output_dir,
-                    entity_image_path=entity_image_dir,
-                    entity=entity_list,
-                    ai_model=image_model,
-                    style=image_style,
-                    quality=image_quality,
-                    size=image_size,
-                )
-                filename = cut_image_generator.execute()
-                cut_image_paths.append(filename)
-                c_idx += 1
-            s_idx += 1
+        for s_idx, scene in enumerate(cuts_by_scene, start=1):
+            for c_idx, cut in enumerate(scene, start=1):
+                targets.append((s_idx, c_idx, cut))
+
+    generators = [make_generator(s_num, c_num, cut) for s_num, c_num, cut in targets]
+
+    # 컷별로 독립 실행하고, 실패한 컷은 기록만 한 뒤 나머지 컷을 계속 생성
+    results = run_ordered(
+        generators,
+        lambda generator: generator.execute(),
+        max_workers=min(max(1, concurrency), model_concurrency(image_model)),
+    )
+    reused_cut_image_paths = []
+    for generator, (s_num, c_num, cut), result in zip(generators, targets, results):
+        if isinstance(result, Exception):
+            logger.error(f"컷 이미지 생성 실패 [S{s_num:04d}-C{c_num:04d}]: {result}")
+            failed_cuts.append({
+                "scene_num": s_num,
+                "cut_num": c_num,
+                "cut_id": cut.get("cut_id"),
+                "error": str(result),
+            })
+        elif result:
+            cut_image_paths.append(result)
+            if generator.reused:
+                reused_cut_image_paths.append(result)
+    if incremental:
+        logger.info(f"컷 이미지 증분 생성: 재사용 {len(reused_cut_image_paths)}개, 생성 {len(cut_image_paths) - len(reused_cut_image_paths)}개")
 
     cut_image_paths.sort()
-    return GenerateCutImagesResponse(cut_image_paths=cut_image_paths)
+    return GenerateCutImagesResponse(
+        cut_image_paths=cut_image_paths,
+        failed_cuts=failed_cuts,
+        reused_cut_image_paths=reused_cut_image_paths,
+    )
 
 
 # 6) 컷 영상 생성
@@ -761,6 +914,8 @@ def generate_cut_videos(
     video_model: str = Form("veo-3.0-fast-generate-preview"),
     scene_num: Optional[int] = Form(None),
     cut_num: Optional[int] = Form(None),
+    submit_all: bool = Form(False, description="모든 컷 작업을 먼저 제출하고 끝나는 순서대로 받아 저장"),
+    max_in_flight: Optional[int] = Form(None, description="동시에 렌더 중인 작업 수 상한 (기본: 모델별 상한)"),
 ):
     # 컷 이미지 목록 로드
     image_paths: List[str] = []
@@ -806,7 +961,7 @@ def generate_cut_videos(
         else:
             # 전체 이미지 사용
             for filename in os.listdir(cid):
-                if filename.lower().endswith((".png", ".jpg", ".jpeg")):
+                if is_cut_image_file(filename):
                     image_paths.append(os.path.join(cid, filename))
             image_paths.sort()
 
@@ -822,7 +977,10 @@ def generate_cut_videos(
     vod = video_output_dir or paths3["VIDEO_OUTPUT_DIR"]
     ensure_dir(vod)
 
-    video_generator = video.VideoGenerator(cut_list, vod, cut_image_list=image_paths, ai_model=video_model)
+    video_generator = video.VideoGenerator(
+        cut_list, vod, cut_image_list=image_paths, ai_model=video_model,
+        submit_all=submit_all, max_in_flight=max_in_flight,
+    )
     video_generator.execute()
 
     # 생성된 영상 스캔
@@ -832,7 +990,11 @@ def generate_cut_videos(
             video_clip_paths.append(os.path.join(vod, filename))
     video_clip_paths.sort()
 
-    return GenerateCutVideosResponse(video_clip_paths=video_clip_paths)
+    return GenerateCutVideosResponse(
+        video_clip_paths=video_clip_paths,
+        failed_cuts=video_generator.failed_cuts,
+        resumed_cut_ids=video_generator.resumed_cut_ids,
+    )
 
 
 # 7) 컷 영상 연결
@@ -892,6 +1054,21 @@ def health():
     return {"status": "ok"}
 
 
+# LLM 응답 캐시 적중/미스 통계
+@app.get("/llm-cache/stats")
+def llm_cache_stats():
+    cache = get_response_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+# 프로바이더별 현재 동시 요청 한도/사용 현황
+@app.get("/provider-limits")
+def provider_limits():
+    return {"providers": governor_snapshot(), "job_poller": get_job_poller().snapshot()}
+
+
 # 8) 기존 entity_list 로드
 @app.get("/load-entity-list")
 def get_entity_list(
@@ -947,9 +1124,15 @@ def get_cuts(
 def serve_image(
     work_dir: str,
     entity_set_name: str,
-    relative_path: str
+    relative_path: str,
+    size: Optional[str] = None,
+    format: Optional[str] = None,
 ):
-    """이미지 파일을 서빙하는 엔드포인트"""
+    """
+    이미지 파일을 서빙하는 엔드포인트.
+    size(thumb/medium/full) 또는 format(webp/avif/jpeg/png)을 지정하면 캐시된 파생 이미지를 반환하고,
+    아직 없으면 바로 만들며, 만들 수 없으면 원본을 반환한다.
+    """
     # 보안: 경로 탐색 공격 방지
     if ".." in relative_path:
         raise HTTPException(status_code=400, detail="Invalid path")
@@ -972,6 +1155,16 @@ def serve_image(
     # 이미지 파일인지 확인
     if not full_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
         raise HTTPException(status_code=400, detail="Not an image file")
+
+    # 파생 이미지 (썸네일/미리보기/WebP·AVIF 변환)
+    if size or format:
+        variant_size = size or "full"
+        variant_format = format or "webp"
+        if variant_size not in DERIVATIVE_SIZES or variant_format not in DERIVATIVE_FORMATS:
+            raise HTTPException(status_code=400, detail="Unsupported image size or format")
+        derivative = get_derivative(full_path, variant_size, variant_format)
+        if derivative:
+            return FileResponse(derivative, media_type=derivative_media_type(variant_format))
     
     # 적절한 MIME 타입 설정
     if full_path.lower().endswith('.png'):
@@ -1053,9 +1246,8 @@ def load_cut_images(work_dir: str, entity_set_name: str):
     
     images = []
     for filename in sorted(os.listdir(images_dir)):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+        if is_cut_image_file(filename):
             # S01-C01 형식에서 씬/컷 번호 추출
-            import re
             match = re.match(r"S(\d+)-C(\d+)", filename)
             if match:
                 images.append({
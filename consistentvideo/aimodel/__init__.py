@@ -0,0 +1,29 @@
+from .response_cache import (
+    ResponseCache,
+    get_response_cache,
+    chat_completion_text,
+    achat_completion_text,
+    chat_completion_with_usage,
+    achat_completion_with_usage,
+    chat_completion_stream,
+)
+from .governor import ConcurrencyGovernor, get_governor, governor_snapshot
+from .pool import model_concurrency, run_ordered
+from .clients import (
+    get_openai_client,
+    get_async_openai_client,
+    aclose_async_openai_client,
+    get_genai_client,
+    get_runway_client,
+    get_http_session,
+    warm_up,
+)
+from .upload_cache import (
+    UploadBackend,
+    GeminiFileBackend,
+    RunwayUploadBackend,
+    LocalUploadBackend,
+    UploadCache,
+    get_upload_cache,
+)
+from .job_poller import JobPoller, get_job_poller
@@ -0,0 +1,180 @@
+import os
+import asyncio
+import threading
+import weakref
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 공용 프로바이더 클라이언트.
+# SDK 클라이언트는 스레드 안전하며 내부 커넥션 풀(keep-alive)을 가지므로 호출마다 새로 만들지 않고 공유한다.
+# - CAVG_HTTP_MAX_CONNECTIONS: 클라이언트당 최대 동시 연결 수 (기본 64)
+# - CAVG_HTTP_MAX_KEEPALIVE: 유지할 유휴 연결 수 (기본 16)
+# - CAVG_HTTP_TIMEOUT / CAVG_HTTP_CONNECT_TIMEOUT: 요청/연결 타임아웃(초, 기본 600 / 10)
+
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+_async_openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def http_limits() -> Dict[str, Any]:
+    return {
+        "max_connections": _env_int("CAVG_HTTP_MAX_CONNECTIONS", 64),
+        "max_keepalive": _env_int("CAVG_HTTP_MAX_KEEPALIVE", 16),
+        "timeout": _env_float("CAVG_HTTP_TIMEOUT", 600.0),
+        "connect_timeout": _env_float("CAVG_HTTP_CONNECT_TIMEOUT", 10.0),
+    }
+
+
+def _httpx_options() -> Dict[str, Any]:
+    import httpx
+
+    limits = http_limits()
+    return {
+        "limits": httpx.Limits(
+            max_connections=limits["max_connections"],
+            max_keepalive_connections=limits["max_keepalive"],
+        ),
+        "timeout": httpx.Timeout(limits["timeout"], connect=limits["connect_timeout"]),
+    }
+
+
+def _get_or_create(kind: str, api_key: Optional[str], factory):
+    # API 키가 바뀌면(예: 서버에서 환경변수 갱신) 새 클라이언트를 만든다
+    key = (kind, api_key)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+            logger.debug(f"공용 클라이언트 생성: {kind}")
+        return client
+
+
+def get_openai_client():
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    def factory():
+        import httpx
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key, http_client=httpx.Client(**_httpx_options()))
+
+    return _get_or_create("openai", api_key, factory)
+
+
+def get_async_openai_client():
+    """AsyncOpenAI는 이벤트 루프에 묶이므로 실행 중인 루프별로 하나씩 공유한다."""
+    loop = asyncio.get_running_loop()
+    client = _async_openai_clients.get(loop)
+    if client is None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=httpx.AsyncClient(**_httpx_options()))
+        _async_openai_clients[loop] = client
+    return client
+
+
+async def aclose_async_openai_client() -> None:
+    """
+    실행 중인 루프에 묶인 AsyncOpenAI(와 httpx 연결 풀)를 닫는다.
+    asyncio.run처럼 호출마다 새 루프를 만드는 경우 루프가 끝나기 전에 호출해야 클라이언트가 남지 않는다.
+    """
+    client = _async_openai_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def get_genai_client():
+    api_key = os.getenv("GEMINI_API_KEY")
+
+    def factory():
+        from google import genai
+        from google.genai import types as genai_types
+
+        timeout_ms = int(http_limits()["timeout"] * 1000)
+        return genai.Client(api_key=api_key, http_options=genai_types.HttpOptions(timeout=timeout_ms))
+
+    return _get_or_create("genai", api_key, factory)
+
+
+def get_runway_client():
+    api_key = os.getenv("RUNWAY_API_KEY")
+
+    def factory():
+        import httpx
+        from runwayml import RunwayML
+
+        return RunwayML(api_key=api_key, http_client=httpx.Client(**_httpx_options()))
+
+    return _get_or_create("runway", api_key, factory)
+
+
+def get_http_session():
+    """결과물(이미지/영상) 다운로드용 requests.Session (호스트별 keep-alive 연결 풀)."""
+
+    def factory():
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        limits = http_limits()
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=limits["max_keepalive"], pool_maxsize=limits["max_connections"])
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    return _get_or_create("http", None, factory)
+
+
+def http_timeout() -> Tuple[float, float]:
+    """requests용 (연결, 읽기) 타임아웃."""
+    limits = http_limits()
+    return limits["connect_timeout"], limits["timeout"]
+
+
+_FACTORIES = {
+    "openai": get_openai_client,
+    "genai": get_genai_client,
+    "runway": get_runway_client,
+    "http": get_http_session,
+}
+
+
+def warm_up(providers: Optional[Iterable[str]] = None, *, connect: bool = False) -> Dict[str, str]:
+    """
+    서버 시작 시 공용 클라이언트를 미리 만든다.
+    connect=True면 가벼운 요청을 한 번 보내 TLS 연결까지 열어 둔다 (실패해도 무시).
+    """
+    status: Dict[str, str] = {}
+    for name in providers or _FACTORIES:
+        factory = _FACTORIES.get(name)
+        if factory is None:
+            status[name] = "unknown"
+            continue
+        try:
+            client = factory()
+            if connect and name == "openai":
+                client.models.list()
+            elif connect and name == "genai":
+                next(iter(client.models.list()), None)
+            status[name] = "ready"
+        except Exception as e:
+            logger.warning(f"클라이언트 warm-up 실패({name}): {e}")
+            status[name] = f"error: {e}"
+    return status
@@ -0,0 +1,267 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+from contextlib import contextmanager, asynccontextmanager
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Deque, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# provider: (초기 동시 요청 수, 최대 동시 요청 수, 지연 목표(초, None이면 지연 기반 감속 없음))
+DEFAULT_LIMITS: Dict[str, tuple] = {
+    "openai_text": (8, 64, 60.0),
+    "openai_image": (4, 16, 180.0),
+    "gemini": (4, 16, 180.0),
+    # Veo 렌더는 수 분씩 걸리므로 Gemini 이미지 생성과 슬롯을 나누고 지연 기반 감속을 쓰지 않음
+    "veo": (2, 8, None),
+    "runway": (2, 8, None),
+    "sora": (2, 8, None),
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    # openai/runwayml(status_code), google-genai(code), requests(response.status_code)
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms:
+            return float(ms) / 1000.0
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class ConcurrencyGovernor:
+    """
+    프로바이더별 동시 요청 수를 AIMD(가법 증가/승법 감소)로 조절한다.
+    - 성공할 때마다 한도를 1/한도 만큼 증가 (한도만큼 성공하면 +1)
+    - 429/5xx 응답이면 한도를 decrease_factor 배로 감소, Retry-After 동안 새 요청 보류
+    - 지연이 latency_target을 넘으면 한도를 완만하게 감소
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease_factor: float = 0.5,
+        latency_target: Optional[float] = None,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        # 슬롯을 기다리는 코루틴 (이벤트 루프, 깨움 Future). 도착 순서대로 하나씩 깨움
+        self._async_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            return self._try_acquire_locked()
+
+    def _try_acquire_locked(self) -> bool:
+        if time.monotonic() < self._blocked_until or self._in_flight >= self.limit:
+            return False
+        self._in_flight += 1
+        return True
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._try_acquire_locked():
+                now = time.monotonic()
+                wait = 1.0
+                if self._blocked_until > now:
+                    wait = self._blocked_until - now
+                if deadline is not None:
+                    if now >= deadline:
+                        return False
+                    wait = min(wait, deadline - now)
+                self._cond.wait(wait)
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._cond.notify_all()
+            self._wake_async_waiter_locked()
+
+    def _wake_async_waiter_locked(self) -> None:
+        # 가장 오래 기다린 코루틴 하나를 그 코루틴의 이벤트 루프에서 깨움 (릴리스는 어느 스레드에서든 올 수 있음)
+        while self._async_waiters:
+            loop, future = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_set_waiter_done, future)
+                return
+            except RuntimeError:
+                continue  # 이미 닫힌 이벤트 루프
+
+    def _remove_async_waiter_locked(self, future: asyncio.Future) -> bool:
+        for entry in self._async_waiters:
+            if entry[1] is future:
+                self._async_waiters.remove(entry)
+                return True
+        return False
+
+    async def aacquire(self) -> None:
+        """이벤트 루프를 막지 않고 슬롯을 기다린다. 기다리는 코루틴은 도착 순서대로 슬롯을 받는다."""
+        loop = asyncio.get_running_loop()
+        first = True
+        while True:
+            with self._cond:
+                # 처음에는 앞에 기다리는 코루틴이 없을 때만 바로 획득 (새치기 방지)
+                if (not first or not self._async_waiters) and self._try_acquire_locked():
+                    return
+                future = loop.create_future()
+                if first:
+                    self._async_waiters.append((loop, future))
+                else:
+                    # 깨웠는데 다른 스레드가 먼저 슬롯을 가져간 경우: 맨 앞에서 다시 기다림
+                    self._async_waiters.appendleft((loop, future))
+                # Retry-After 보류가 끝나거나 한도가 늘어나는 경우는 깨움이 없으므로 주기적으로 다시 확인
+                wait = max(self._blocked_until - time.monotonic(), 0.0) or 1.0
+            first = False
+            try:
+                await asyncio.wait_for(asyncio.shield(future), wait)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                with self._cond:
+                    if not self._remove_async_waiter_locked(future):
+                        # 이미 깨워진 뒤 취소됨: 받은 차례를 다음 코루틴에게 넘김
+                        self._wake_async_waiter_locked()
+                raise
+            with self._cond:
+                self._remove_async_waiter_locked(future)
+
+    def on_success(self, latency: Optional[float] = None) -> None:
+        with self._cond:
+            self.successes += 1
+            if self.latency_target is not None and latency is not None and latency > self.latency_target:
+                self._limit = max(float(self.min_limit), self._limit * 0.9)
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+            self._cond.notify_all()
+            self._wake_async_waiter_locked()
+
+    def on_failure(self, exc: BaseException) -> None:
+        status = _status_code(exc)
+        with self._cond:
+            if status == 429 or (status is not None and 500 <= status < 600):
+                self.throttled += 1
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                retry_after = _retry_after(exc)
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                logger.warning(
+                    f"[{self.name}] 프로바이더 제한 감지(status={status}): 동시 요청 한도 {self.limit}"
+                    + (f", {retry_after:.1f}s 대기" if retry_after else "")
+                )
+            else:
+                self.errors += 1
+
+    @contextmanager
+    def slot(self):
+        """with governor.slot(): 프로바이더 호출 ..."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.on_failure(e)
+            raise
+        else:
+            self.on_success(time.monotonic() - started)
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        """async with governor.aslot(): 이벤트 루프를 막지 않고 도착 순서대로 슬롯을 기다린다."""
+        await self.aacquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.on_failure(e)
+            raise
+        else:
+            self.on_success(time.monotonic() - started)
+        finally:
+            self.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+                "successes": self.successes,
+                "throttled": self.throttled,
+                "errors": self.errors,
+            }
+
+
+def _set_waiter_done(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_governors: Dict[str, ConcurrencyGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(provider: str) -> ConcurrencyGovernor:
+    """프로세스 공용 프로바이더 거버너. CAVG_<PROVIDER>_MAX_CONCURRENCY로 최대 한도를 바꿀 수 있다."""
+    with _governors_lock:
+        governor = _governors.get(provider)
+        if governor is None:
+            initial, max_limit, latency_target = DEFAULT_LIMITS.get(provider, (4, 16, None))
+            env_max = os.getenv(f"CAVG_{provider.upper()}_MAX_CONCURRENCY")
+            if env_max:
+                max_limit = max(1, int(env_max))
+                initial = min(initial, max_limit)
+            governor = ConcurrencyGovernor(
+                provider, initial=initial, max_limit=max_limit, latency_target=latency_target
+            )
+            _governors[provider] = governor
+        return governor
+
+
+def governor_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {provider: get_governor(provider).snapshot() for provider in DEFAULT_LIMITS}
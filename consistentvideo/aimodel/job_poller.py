@@ -0,0 +1,187 @@
+import os
+import heapq
+import time
+import itertools
+import threading
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .governor import _status_code
+
+logger = logging.getLogger(__name__)
+
+# check() -> (완료 여부, 진행률(0~100, 모르면 None))
+CheckFn = Callable[[], Tuple[bool, Optional[float]]]
+
+
+class JobLostError(RuntimeError):
+    """상태 확인이 4xx로 실패: 원격 작업이 없거나(만료/삭제) 접근할 수 없어 다시 확인해도 소용없다."""
+
+
+def is_permanent_check_error(exc: BaseException) -> bool:
+    """다시 확인해도 실패하는 상태 확인 오류인지 (4xx, 단 408/429 제외)."""
+    status = _status_code(exc)
+    return status is not None and 400 <= status < 500 and status not in (408, 429)
+
+
+class _PolledTask:
+    __slots__ = ("name", "check", "future", "started", "interval", "progress", "errors")
+
+    def __init__(self, name: str, check: CheckFn, interval: float):
+        self.name = name
+        self.check = check
+        self.future: Future = Future()
+        self.started = time.monotonic()
+        self.interval = interval
+        self.progress: Optional[float] = None
+        self.errors = 0
+
+
+class JobPoller:
+    """
+    프로바이더 렌더 작업(Runway task, Veo operation, Sora video)의 상태 확인 일정을 스레드 하나에서 관리하고,
+    실제 확인 호출은 작은 스레드 풀(check_workers)에서 실행한다. 작업마다 다음 확인 시각을 힙에 두고, 간격은 min_interval에서 시작해 backoff 배씩 늘리되
+    진행률이 보고되면 남은 시간 추정치의 절반을 넘지 않게 줄인다.
+    빨리 끝나는 작업은 1~2초 안에 감지하고, 오래 걸리는 작업은 max_interval보다 자주 묻지 않는다.
+
+    ex)
+    future = get_job_poller().track(lambda: model.poll(job), name="S0001-C0001")
+    future.add_done_callback(on_done)   # 완료 시 확인 스레드에서 호출 (가볍게 유지)
+    future.result()                     # 또는 완료까지 대기
+    """
+
+    def __init__(
+        self,
+        *,
+        min_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        max_errors: int = 5,
+        check_workers: int = 4,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+        self._heap: List[Tuple[float, int, _PolledTask]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=max(1, check_workers), thread_name_prefix="job-poller-check")
+        self._checking = 0  # 확인 호출이 진행 중인 작업 수
+        self.checks = 0
+
+    def next_interval(self, task: _PolledTask) -> float:
+        interval = task.interval * self.backoff
+        progress = task.progress
+        if progress is not None and 0 < progress < 100:
+            elapsed = max(time.monotonic() - task.started, 1e-3)
+            remaining = (100.0 - progress) * elapsed / progress
+            interval = min(interval, remaining / 2)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def track(self, check: CheckFn, *, name: str = "", initial_delay: Optional[float] = None) -> Future:
+        """check를 완료될 때까지 주기적으로 호출한다. 완료되면 Future가 True로, 실패하면 예외로 끝난다."""
+        task = _PolledTask(name, check, self.min_interval)
+        due = time.monotonic() + (self.min_interval if initial_delay is None else initial_delay)
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), task))
+            self._ensure_thread()
+            self._cond.notify()
+        return task.future
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap) + self._checking
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="job-poller", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        # 이 스레드는 확인할 시각이 된 작업을 꺼내 확인 스레드 풀에 넘기기만 한다
+        # (상태 확인 HTTP 호출 하나가 멈춰도 다른 작업의 확인 일정은 밀리지 않음)
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                _, _, task = heapq.heappop(self._heap)
+                self._checking += 1
+
+            if task.future.cancelled():
+                with self._cond:
+                    self._checking -= 1
+                continue
+            self._executor.submit(self._check, task)
+
+    def _check(self, task: _PolledTask) -> None:
+        try:
+            self._check_once(task)
+        finally:
+            with self._cond:
+                self._checking -= 1
+
+    def _check_once(self, task: _PolledTask) -> None:
+        try:
+            done, progress = task.check()
+            with self._cond:
+                self.checks += 1
+            task.errors = 0
+        except Exception as e:
+            if is_permanent_check_error(e):
+                logger.error(f"[{task.name}] 원격 작업을 확인할 수 없어 포기합니다: {e}")
+                lost = JobLostError(str(e))
+                lost.__cause__ = e
+                task.future.set_exception(lost)
+                return
+            task.errors += 1
+            if task.errors >= self.max_errors:
+                logger.error(f"[{task.name}] 작업 상태 확인 실패, 포기합니다: {e}")
+                task.future.set_exception(e)
+                return
+            # 일시적 오류(429/5xx 등)는 간격을 늘려 다시 확인
+            logger.warning(f"[{task.name}] 작업 상태 확인 실패({task.errors}/{self.max_errors}): {e}")
+            task.interval = min(task.interval * 2, self.max_interval)
+            self._reschedule(task, task.interval)
+            return
+
+        if done:
+            logger.debug(f"[{task.name}] 작업 완료 ({time.monotonic() - task.started:.1f}s)")
+            task.future.set_result(True)
+            return
+        if progress is not None:
+            task.progress = progress
+        task.interval = self.next_interval(task)
+        self._reschedule(task, task.interval)
+
+    def _reschedule(self, task: _PolledTask, delay: float) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), task))
+            self._cond.notify()
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._cond:
+            return {"pending": len(self._heap) + self._checking, "checking": self._checking, "checks": self.checks}
+
+
+_poller: Optional[JobPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_job_poller() -> JobPoller:
+    """
+    프로세스 공용 작업 폴러. CAVG_POLL_MIN_INTERVAL / CAVG_POLL_MAX_INTERVAL(초)로 간격 범위를,
+    CAVG_POLL_WORKERS로 동시에 진행할 수 있는 상태 확인 호출 수를 바꿀 수 있다.
+    """
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = JobPoller(
+                min_interval=float(os.getenv("CAVG_POLL_MIN_INTERVAL", "1.0")),
+                max_interval=float(os.getenv("CAVG_POLL_MAX_INTERVAL", "30.0")),
+                check_workers=int(os.getenv("CAVG_POLL_WORKERS", "4")),
+            )
+        return _poller
@@ -0,0 +1,72 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+
+# 모델별 동시 작업 수 상한 (프로바이더 전체 한도는 governor가 따로 관리)
+MODEL_CONCURRENCY: Dict[str, int] = {
+    "gpt-image-1": 4,
+    "dalle3": 2,
+    "gemini-2.5-flash-imag(Nano Banana)": 4,
+    "gemini-3-pro-image-preview(Nano Banana Pro)": 2,
+    "runway": 2,
+    "sora2": 2,
+}
+
+
+def model_concurrency(model: str, default: int = 2) -> int:
+    """모델의 동시 작업 수 상한. CAVG_MODEL_CONCURRENCY_<모델명>(영숫자 외 '_')으로 바꿀 수 있다."""
+    env_name = "CAVG_MODEL_CONCURRENCY_" + re.sub(r"[^0-9A-Za-z]+", "_", model or "").strip("_").upper()
+    value = os.getenv(env_name)
+    if value:
+        return max(1, int(value))
+    return MODEL_CONCURRENCY.get(model, default)
+
+
+def run_ordered(
+    items: Sequence[Any],
+    fn: Callable[[Any], Any],
+    *,
+    max_workers: int = 4,
+    on_result: Optional[Callable[[int, Any, Any], None]] = None,
+) -> List[Union[Any, Exception]]:
+    """
+    items를 최대 max_workers개 스레드로 fn에 적용한다.
+    결과는 입력 순서대로 반환하며, 실패한 항목은 예외 객체가 그 자리에 들어간다.
+    on_result(index, item, result)는 앞선 항목이 모두 끝난 순간 입력 순서대로 호출되므로
+    파일에 한 줄씩 바로 기록해도 순서가 유지된다.
+    """
+    results: List[Any] = [None] * len(items)
+    done = [False] * len(items)
+    next_index = 0
+
+    def flush() -> None:
+        nonlocal next_index
+        while next_index < len(items) and done[next_index]:
+            if on_result is not None:
+                on_result(next_index, items[next_index], results[next_index])
+            next_index += 1
+
+    if max_workers <= 1 or len(items) <= 1:
+        for index, item in enumerate(items):
+            try:
+                results[index] = fn(item)
+            except Exception as e:
+                results[index] = e
+            done[index] = True
+            flush()
+        return results
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fn, item): index for index, item in enumerate(items)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = e
+            results[index] = result
+            done[index] = True
+            flush()
+    return results
@@ -0,0 +1,329 @@
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+
+from .governor import get_governor
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_dir() -> str:
+    # 모든 로컬 캐시(LLM 응답, 이미지 전처리 등)의 기본 위치
+    return os.path.expanduser(os.getenv("CAVG_CACHE_DIR") or os.path.join("~", ".cache", "consistentvideo"))
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _normalize_content(content: Any, image_hashes: List[str]) -> Any:
+    # data URL 이미지는 본문 대신 해시로 치환해 키를 짧고 안정적으로 유지
+    if isinstance(content, list):
+        return [_normalize_content(part, image_hashes) for part in content]
+    if isinstance(content, dict):
+        if content.get("type") == "image_url":
+            url = (content.get("image_url") or {}).get("url", "")
+            if url.startswith("data:"):
+                digest = _sha256(url.encode("utf-8"))
+                image_hashes.append(digest)
+                return {"type": "image_url", "image_sha256": digest}
+        return {k: _normalize_content(v, image_hashes) for k, v in content.items()}
+    return content
+
+
+class ResponseCache:
+    """
+    chat completion 응답을 SQLite에 저장하는 내용 주소 기반 캐시.
+    - 키: (model, messages, temperature, max_tokens, 이미지 해시)의 SHA-256
+    - 만료(max_age_seconds)와 용량(max_entries/max_bytes) 기준으로 오래된 항목부터 제거
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        max_entries: int = 5000,
+        max_bytes: int = 200 * 1024 * 1024,
+        max_age_seconds: float = 30 * 24 * 3600,
+    ):
+        self.path = path or os.path.join(default_cache_dir(), "llm_responses.sqlite")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        image_hashes: Optional[List[str]] = None,
+    ) -> str:
+        hashes = list(image_hashes or [])
+        normalized = [
+            {**m, "content": _normalize_content(m.get("content"), hashes)} for m in messages
+        ]
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": normalized,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "image_hashes": hashes,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return _sha256(payload.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str, *, model: Optional[str] = None) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, value, size, now, now),
+            )
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_locked(time.time())
+            self._conn.commit()
+
+    def _evict_locked(self, now: float) -> None:
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age_seconds,))
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # 최근에 사용되지 않은 항목부터 제한 안쪽으로 들어올 때까지 제거
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        logger.debug(f"LLM 응답 캐시 정리: {len(doomed)}개 제거")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": total, "path": self.path}
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """프로세스 공용 캐시. LLM_CACHE_DISABLED=1이면 None."""
+    global _default_cache
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = ResponseCache()
+            except Exception as e:
+                logger.warning(f"LLM 응답 캐시를 열 수 없어 비활성화합니다: {e}")
+                return None
+        return _default_cache
+
+
+def _cache_lookup(model, messages, temperature, max_tokens, use_cache):
+    cache = get_response_cache() if use_cache else None
+    if cache is None:
+        return None, None, None
+    key = cache.make_key(model, messages, temperature, max_tokens)
+    return cache, key, cache.get(key)
+
+
+def _completion_params(model, messages, temperature, max_tokens) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"model": model, "messages": messages}
+    if temperature is not None:
+        params["temperature"] = temperature
+    if max_tokens is not None:
+        params["max_tokens"] = max_tokens
+    return params
+
+
+def usage_from_response(response) -> Dict[str, Any]:
+    """응답 usage에서 prompt/cached/completion 토큰 수를 뽑는다."""
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "local_cache_hit": False,
+    }
+
+
+def _local_hit_usage() -> Dict[str, Any]:
+    # 로컬 캐시 적중 시에는 프로바이더 토큰을 쓰지 않음
+    return {"prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "local_cache_hit": True}
+
+
+def chat_completion_with_usage(
+    client,
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> Tuple[str, Dict[str, Any]]:
+    """client.chat.completions.create 호출을 캐시를 거쳐 수행하고 (본문 텍스트, 토큰 사용량)을 반환한다."""
+    cache, key, cached = _cache_lookup(model, messages, temperature, max_tokens, use_cache)
+    if cached is not None:
+        logger.debug(f"LLM 응답 캐시 적중: model={model}")
+        return cached, _local_hit_usage()
+
+    with get_governor("openai_text").slot():
+        response = client.chat.completions.create(**_completion_params(model, messages, temperature, max_tokens))
+    text = response.choices[0].message.content
+
+    if cache is not None and text is not None:
+        cache.put(key, text, model=model)
+    return text, usage_from_response(response)
+
+
+async def achat_completion_with_usage(
+    client,
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> Tuple[str, Dict[str, Any]]:
+    """chat_completion_with_usage의 AsyncOpenAI 버전. 캐시 조회/저장(SQLite)은 이벤트 루프를 막지 않도록 스레드에서 수행."""
+    cache, key, cached = await asyncio.to_thread(_cache_lookup, model, messages, temperature, max_tokens, use_cache)
+    if cached is not None:
+        logger.debug(f"LLM 응답 캐시 적중: model={model}")
+        return cached, _local_hit_usage()
+
+    async with get_governor("openai_text").aslot():
+        response = await client.chat.completions.create(**_completion_params(model, messages, temperature, max_tokens))
+    text = response.choices[0].message.content
+
+    if cache is not None and text is not None:
+        await asyncio.to_thread(cache.put, key, text, model=model)
+    return text, usage_from_response(response)
+
+
+def chat_completion_text(client, **kwargs) -> str:
+    """chat_completion_with_usage에서 본문 텍스트만 반환한다."""
+    return chat_completion_with_usage(client, **kwargs)[0]
+
+
+async def achat_completion_text(client, **kwargs) -> str:
+    """achat_completion_with_usage에서 본문 텍스트만 반환한다."""
+    return (await achat_completion_with_usage(client, **kwargs))[0]
+
+
+def chat_completion_stream(
+    client,
+    *,
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    use_cache: bool = True,
+) -> Iterator[str]:
+    """
+    스트리밍 chat completion의 텍스트 조각을 순서대로 내보낸다.
+    캐시 적중 시 저장된 전체 응답을 한 조각으로 내보내고, 스트림이 끝까지 소비되면 결과를 캐시에 저장한다.
+    """
+    cache, key, cached = _cache_lookup(model, messages, temperature, max_tokens, use_cache)
+    if cached is not None:
+        logger.debug(f"LLM 응답 캐시 적중: model={model}")
+        yield cached
+        return
+
+    parts: List[str] = []
+    governor = get_governor("openai_text")
+    governor.acquire()
+    started = time.monotonic()
+    consumer_time = 0.0
+    latency = None
+    try:
+        stream = client.chat.completions.create(
+            **_completion_params(model, messages, temperature, max_tokens), stream=True
+        )
+        for event in stream:
+            # 지연은 마지막 조각을 받을 때까지로 보되, 소비자가 조각을 처리한 시간(scene.txt 기록 등)은 제외
+            latency = time.monotonic() - started - consumer_time
+            if not event.choices:
+                continue
+            delta = event.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yielded_at = time.monotonic()
+                yield delta
+                consumer_time += time.monotonic() - yielded_at
+    except Exception as e:
+        governor.on_failure(e)
+        raise
+    else:
+        governor.on_success(latency)
+    finally:
+        governor.release()
+
+    if cache is not None and parts:
+        cache.put(key, "".join(parts), model=model)
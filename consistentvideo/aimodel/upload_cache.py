@@ -0,0 +1,271 @@
+import os
+import time
+import uuid
+import sqlite3
+import hashlib
+import mimetypes
+import threading
+import logging
+from typing import Optional, Dict, Any, Tuple, Callable, List, TypeVar
+
+from .response_cache import default_cache_dir
+from .clients import get_genai_client, get_runway_client
+from .governor import _status_code
+
+logger = logging.getLogger(__name__)
+
+# 만료 직전의 업로드는 요청 도중 사라질 수 있으므로 여유 시간을 두고 다시 올린다
+EXPIRY_MARGIN_SECONDS = 10 * 60
+
+# 400 응답 중 업로드 참조값(파일/URI) 문제로 보이는 메시지
+_REJECTED_REF_HINTS = ("file", "uri", "url", "not found", "expired", "does not exist", "permission")
+
+T = TypeVar("T")
+
+
+def _upload_cache_disabled() -> bool:
+    return os.getenv("CAVG_UPLOAD_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+class UploadBackend:
+    """
+    참조 이미지를 프로바이더 파일/자산 API에 등록하는 백엔드.
+    upload()는 (요청에서 참조할 ID/URI, 만료 시각(epoch 초, 없으면 None))을 반환한다.
+    """
+
+    name = "base"
+
+    def upload(self, path: str, mime_type: str) -> Tuple[str, Optional[float]]:
+        raise NotImplementedError
+
+
+class GeminiFileBackend(UploadBackend):
+    """Gemini Files API (업로드 후 48시간 유지). 참조값은 file URI."""
+
+    name = "gemini"
+    ttl_seconds = 48 * 3600
+
+    def __init__(self, client=None):
+        self.client = client or get_genai_client()
+
+    def upload(self, path: str, mime_type: str) -> Tuple[str, Optional[float]]:
+        uploaded = self.client.files.upload(file=path, config={"mime_type": mime_type})
+        expires_at = None
+        expiration = getattr(uploaded, "expiration_time", None)
+        if expiration is not None and hasattr(expiration, "timestamp"):
+            expires_at = expiration.timestamp()
+        return uploaded.uri, expires_at or time.time() + self.ttl_seconds
+
+
+class RunwayUploadBackend(UploadBackend):
+    """Runway 임시 업로드 (24시간 유지). 참조값은 runway:// URI."""
+
+    name = "runway"
+    ttl_seconds = 24 * 3600
+
+    def __init__(self, client=None):
+        self.client = client or get_runway_client()
+
+    def upload(self, path: str, mime_type: str) -> Tuple[str, Optional[float]]:
+        with open(path, "rb") as f:
+            uploaded = self.client.uploads.create_ephemeral(file=f)
+        return uploaded.uri, time.time() + self.ttl_seconds
+
+
+class LocalUploadBackend(UploadBackend):
+    """프로바이더 없이 업로드 흐름을 확인하는 로컬 대체 백엔드. 참조값은 local://<uuid>."""
+
+    name = "local"
+
+    def __init__(self, ttl_seconds: Optional[float] = 3600.0):
+        self.ttl_seconds = ttl_seconds
+        self.uploads: Dict[str, str] = {}
+
+    def upload(self, path: str, mime_type: str) -> Tuple[str, Optional[float]]:
+        ref = f"local://{uuid.uuid4().hex}"
+        self.uploads[ref] = path
+        return ref, (time.time() + self.ttl_seconds) if self.ttl_seconds else None
+
+
+class UploadCache:
+    """
+    (프로바이더, 파일 내용 해시) -> 업로드 참조값을 SQLite에 기록해 같은 참조 이미지를 프로젝트당 한 번만 올린다.
+    만료 시각이 지났거나 임박한 항목은 다시 업로드한다.
+    """
+
+    def __init__(self, backend: UploadBackend, path: Optional[str] = None):
+        self.backend = backend
+        self.path = path or os.path.join(default_cache_dir(), "provider_uploads.sqlite")
+        self.hits = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+        # 같은 파일을 여러 스레드가 동시에 요청하면 한 번만 업로드하도록 해시별 잠금
+        self._upload_locks: Dict[str, threading.Lock] = {}
+        self._hashes: Dict[Tuple[str, float, int], str] = {}
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS uploads (
+                provider TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                ref TEXT NOT NULL,
+                mime_type TEXT,
+                expires_at REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (provider, digest)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _digest(self, path: str) -> str:
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached:
+            return cached
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        value = digest.hexdigest()
+        with self._lock:
+            self._hashes[key] = value
+        return value
+
+    def _lookup(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ref, mime_type, expires_at FROM uploads WHERE provider = ? AND digest = ?",
+                (self.backend.name, digest),
+            ).fetchone()
+        if row is None:
+            return None
+        if row[2] is not None and row[2] - EXPIRY_MARGIN_SECONDS < time.time():
+            return None
+        return {"ref": row[0], "mime_type": row[1], "expires_at": row[2]}
+
+    def get_or_upload(self, path: str, mime_type: Optional[str] = None) -> Dict[str, Any]:
+        """{"ref", "mime_type", "expires_at"}를 반환한다. 유효한 업로드가 있으면 재사용."""
+        mime_type = mime_type or mimetypes.guess_type(path)[0] or "image/png"
+        digest = self._digest(path)
+        with self._lock:
+            upload_lock = self._upload_locks.setdefault(digest, threading.Lock())
+
+        with upload_lock:
+            entry = self._lookup(digest)
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+            ref, expires_at = self.backend.upload(path, mime_type)
+            with self._lock:
+                self.uploads += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO uploads (provider, digest, ref, mime_type, expires_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.backend.name, digest, ref, mime_type, expires_at, time.time()),
+                )
+                self._conn.commit()
+            logger.info(f"[{self.backend.name}] 참조 이미지 업로드: {os.path.basename(path)} -> {ref}")
+            return {"ref": ref, "mime_type": mime_type, "expires_at": expires_at}
+
+    def invalidate(self, path: str) -> None:
+        """프로바이더가 참조값을 거부했을 때(삭제/만료) 다음 요청에서 다시 올리도록 항목을 지운다."""
+        digest = self._digest(path)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM uploads WHERE provider = ? AND digest = ?", (self.backend.name, digest)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"provider": self.backend.name, "hits": self.hits, "uploads": self.uploads}
+
+
+UPLOAD_BACKENDS = {
+    "gemini": GeminiFileBackend,
+    "runway": RunwayUploadBackend,
+    "local": LocalUploadBackend,
+}
+
+_upload_caches: Dict[str, UploadCache] = {}
+_upload_caches_lock = threading.Lock()
+
+
+def get_upload_cache(provider: str) -> Optional[UploadCache]:
+    """프로세스 공용 업로드 캐시. CAVG_UPLOAD_CACHE_DISABLED=1이면 None."""
+    if _upload_cache_disabled():
+        return None
+    with _upload_caches_lock:
+        cache = _upload_caches.get(provider)
+        if cache is None:
+            backend_cls = UPLOAD_BACKENDS.get(provider)
+            if backend_cls is None:
+                raise ValueError(f"지원하지 않는 업로드 백엔드입니다: {provider}")
+            cache = UploadCache(backend_cls())
+            _upload_caches[provider] = cache
+        return cache
+
+
+def gemini_image_part(path: str):
+    """
+    Gemini generate_content에 넣을 참조 이미지 파트. 업로드된 파일 URI를 참조하며,
+    업로드 캐시를 쓸 수 없으면 None (호출부에서 인라인 이미지로 폴백).
+    """
+    try:
+        cache = get_upload_cache("gemini")
+        if cache is None:
+            return None
+        from google.genai import types as genai_types
+
+        entry = cache.get_or_upload(path)
+        return genai_types.Part.from_uri(file_uri=entry["ref"], mime_type=entry["mime_type"])
+    except Exception as e:
+        logger.warning(f"Gemini 파일 업로드 실패, 인라인 이미지로 전송합니다({path}): {e}")
+        return None
+
+
+def runway_image_uri(path: str) -> Optional[str]:
+    """Runway prompt_image로 쓸 업로드 URI. 업로드할 수 없으면 None (호출부에서 data URI로 폴백)."""
+    try:
+        cache = get_upload_cache("runway")
+        if cache is None:
+            return None
+        return cache.get_or_upload(path)["ref"]
+    except Exception as e:
+        logger.warning(f"Runway 업로드 실패, data URI로 전송합니다({path}): {e}")
+        return None
+
+
+def is_rejected_upload_error(exc: BaseException) -> bool:
+    """프로바이더가 업로드 참조값(삭제/만료된 파일 URI 등)을 거부한 것으로 보이는 오류인지."""
+    status = _status_code(exc)
+    if status in (403, 404):
+        return True
+    if status == 400:
+        message = str(exc).lower()
+        return any(hint in message for hint in _REJECTED_REF_HINTS)
+    return False
+
+
+def call_with_upload_retry(provider: str, paths: List[str], build: Callable[[], Any], call: Callable[[Any], T]) -> T:
+    """
+    build()로 업로드 참조값이 들어간 요청 내용을 만들어 call()을 실행한다.
+    프로바이더가 참조값을 거부하면(만료 전 삭제 등) 해당 파일들의 캐시 항목을 지우고 다시 올려 한 번만 재시도한다.
+    """
+    try:
+        return call(build())
+    except Exception as e:
+        cache = get_upload_cache(provider) if not _upload_cache_disabled() else None
+        if cache is None or not paths or not is_rejected_upload_error(e):
+            raise
+        logger.warning(f"[{provider}] 업로드 참조값이 거부되어 다시 업로드 후 재시도합니다: {e}")
+        for path in paths:
+            cache.invalidate(path)
+        return call(build())
@@ -1,11 +1,13 @@
 import os
 import base64
 import json
+import mimetypes
 from typing import List, Tuple, Optional, Dict, Any
 import logging
 
-from openai import OpenAI
-
+from consistentvideo.aimodel.clients import get_openai_client
+from consistentvideo.aimodel.response_cache import chat_completion_text
+from consistentvideo.storage.image_prep import prepare_reference_image
 from consistentvideo.reference.entity_creator import (
     CharacterImageCreator,
     LocationImageCreator,
@@ -24,8 +26,9 @@ class EntityMultimodalEditor:
     - 갱신/추가된 엔티티는 gpt-image-1로 레퍼런스 이미지를 재생성
     """
 
-    def __init__(self, entity_image_base_dir: str, *, text_model: str = "gpt-4.1", image_model: str = "gpt-image-1", image_style: str = "realistic", image_quality: str = "low", image_size: str = "1024x1024"):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, entity_image_base_dir: str, *, text_model: str = "gpt-4.1", image_model: str = "gpt-image-1", image_style: str = "realistic", image_quality: str = "low", image_size: str = "1024x1024", use_cache: bool = True):
+        self.client = get_openai_client()
+        self.use_cache = use_cache
         self.entity_image_base_dir = entity_image_base_dir
         self.text_model = text_model
         self.image_model = image_model
@@ -77,7 +80,9 @@ class EntityMultimodalEditor:
         if not image_path or not os.path.exists(image_path):
             return ""
 
-        with open(image_path, "rb") as f:
+        # 업로드 원본 대신 축소/정규화된 캐시 사본을 전송
+        prepared_path = prepare_reference_image(image_path, "openai_vision")
+        with open(prepared_path, "rb") as f:
             image_bytes = f.read()
 
         image_b64 = base64.b64encode(image_bytes).decode("utf-8")
@@ -87,9 +92,11 @@ class EntityMultimodalEditor:
         )
 
         # data URL 형태로 이미지 전달
-        data_url = f"data:image/png;base64,{image_b64}"
+        mime_type = mimetypes.guess_type(prepared_path)[0] or "image/png"
+        data_url = f"data:{mime_type};base64,{image_b64}"
 
-        response = self.client.chat.completions.create(
+        text = chat_completion_text(
+            self.client,
             model=self.text_model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -106,9 +113,10 @@ class EntityMultimodalEditor:
                 },
             ],
             temperature=0.2,
+            use_cache=self.use_cache,
         )
 
-        return response.choices[0].message.content.strip()
+        return text.strip()
 
     def _synthesize_structured_description(
         self,
@@ -156,15 +164,16 @@ class EntityMultimodalEditor:
         )
 
         try:
-            response = self.client.chat.completions.create(
+            text = chat_completion_text(
+                self.client,
                 model=self.text_model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_content},
                 ],
                 temperature=0.1,
-            )
-            text = response.choices[0].message.content.strip()
+                use_cache=self.use_cache,
+            ).strip()
             # JSON 검증 후 문자열로 반환
             try:
                 data = json.loads(text)
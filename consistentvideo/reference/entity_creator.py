@@ -2,23 +2,27 @@ from consistentvideo.reference.base import SynopsisAnalyzerBase, EntityCreatorBa
 
 import os
 import re
-import base64
 from typing import Optional, Tuple, Union, List
-from openai import OpenAI
-from google import genai
 from google.genai import types as genai_types
-from io import BytesIO
 from mimetypes import guess_type
 from PIL import Image
 import logging
 
+from consistentvideo.aimodel.governor import get_governor
+from consistentvideo.aimodel.clients import get_openai_client, get_genai_client
+from consistentvideo.storage import get_artifact_store, GeneratedImage
+from consistentvideo.storage.image_prep import prepare_reference_image
+from consistentvideo.storage.derivatives import schedule_derivatives
+from consistentvideo.aimodel.upload_cache import call_with_upload_retry, gemini_image_part
+from .image_cache import ReferenceImageCache, fingerprint
+
 logger = logging.getLogger(__name__)
 
 
 class EntityCreator:
     def __init__(self):
         self.image_dir = "reference_images"  # 기본값, set_base_dir로 재설정됨
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai_client = get_openai_client()
         self.gemini_client = None
         self.typename = "generic"  # 서브클래스에서 덮어씀
         self.prompt = None
@@ -27,6 +31,8 @@ class EntityCreator:
         self.image_quality = "low"
         self.image_size = "1024x1024"
         self.aspect_ratio = "1:1"
+        self.force_regenerate = False
+        self.image_cache = ReferenceImageCache(self.image_dir)
 
         # 화풍 프리셋
         self.STYLE_PRESETS: dict[str, str] = {
@@ -46,14 +52,14 @@ class EntityCreator:
         # self.image_dir = os.path.join(path, self.subfolder)
         self.image_dir = os.path.join(path)
         os.makedirs(self.image_dir, exist_ok=True)
+        self.image_cache = ReferenceImageCache(self.image_dir)
 
     def set_image_model(self, model_name: str):
         self.image_model = model_name
         # Gemini 모델인 경우 클라이언트 초기화
         if model_name == "gemini-2.5-flash-imag(Nano Banana)":
-            api_key = os.getenv("GEMINI_API_KEY")
-            if api_key:
-                self.gemini_client = genai.Client(api_key=api_key)
+            if os.getenv("GEMINI_API_KEY"):
+                self.gemini_client = get_genai_client()
             else:
                 logger.warning("GEMINI_API_KEY가 설정되지 않았습니다.")
 
@@ -76,6 +82,13 @@ class EntityCreator:
         # Gemini용 aspect ratio 설정
         self.aspect_ratio = ratio
 
+    def set_force_regenerate(self, force: bool):
+        # True면 캐시를 무시하고 항상 새로 생성 (생성 결과는 캐시에 갱신)
+        self.force_regenerate = force
+
+    def cache_report(self) -> dict:
+        return self.image_cache.report()
+
     def create(self, type: str, name: str, description: str, reference_image_path: Optional[Union[str, List[str]]] = None) -> tuple:
         raise NotImplementedError("create() must be implemented by subclasses")
 
@@ -87,15 +100,46 @@ class EntityCreator:
         reference_image_path: Optional[Union[str, List[str]]] = None,
     ) -> Optional[str]:
         try:
+            key = self._cache_key(prompt, name, view, reference_image_path)
+            if not self.force_regenerate:
+                cached = self.image_cache.get(key)
+                if cached:
+                    logger.info(f"레퍼런스 이미지 캐시 적중 ({name}): {cached}")
+                    self.image_cache.record(name, hit=True)
+                    return cached
+            self.image_cache.record(name, hit=False)
+
             if self.image_model == "gemini-2.5-flash-imag(Nano Banana)":
-                return self._generate_image_gemini(prompt, name, view, reference_image_path)
+                filename = self._generate_image_gemini(prompt, name, view, reference_image_path)
             else:
-                return self._generate_image_openai(prompt, name, view, reference_image_path)
+                filename = self._generate_image_openai(prompt, name, view, reference_image_path)
+            if filename:
+                self.image_cache.put(key, filename, name=name)
+            return filename
 
         except Exception as e:
             logger.error(f"이미지 생성 실패 ({name}): {e}")
             return None
 
+    def _cache_key(self, prompt: str, name: str, view: str, reference_image_path: Optional[Union[str, List[str]]]) -> str:
+        # prompt에는 description과 화풍 프리셋 문구가 함께 들어 있음
+        if isinstance(reference_image_path, str):
+            paths = [reference_image_path] if reference_image_path else []
+        else:
+            paths = [p for p in (reference_image_path or []) if isinstance(p, str) and p]
+        fields = {
+            "typename": self.typename,
+            "name": name,
+            "view": view,
+            "prompt": prompt,
+            "style": self.style,
+            "image_model": self.image_model,
+            "quality": self.image_quality,
+            "size": self.image_size,
+            "aspect_ratio": self.aspect_ratio,
+        }
+        return fingerprint(fields, paths)
+
     def _generate_image_openai(
         self,
         prompt: str,
@@ -117,25 +161,27 @@ class EntityCreator:
                     if not os.path.exists(p):
                         logger.warning(f"참조 이미지가 존재하지 않아 스킵합니다: {p}")
                         continue
-                    file_handles.append(open(p, "rb"))
-
-            if file_handles:
-                response = self.openai_client.images.edit(
-                    model=self.image_model,
-                    image=file_handles,
-                    prompt=prompt,
-                    quality=self.image_quality,
-                    size=self.image_size,
-                    n=1,
-                )
-            else:
-                response = self.openai_client.images.generate(
-                    model=self.image_model,
-                    prompt=prompt,
-                    size=self.image_size,
-                    quality=self.image_quality,
-                    n=1
-                )
+                    # 축소/정규화된 캐시 사본을 업로드
+                    file_handles.append(open(prepare_reference_image(p, "openai_edit"), "rb"))
+
+            with get_governor("openai_image").slot():
+                if file_handles:
+                    response = self.openai_client.images.edit(
+                        model=self.image_model,
+                        image=file_handles,
+                        prompt=prompt,
+                        quality=self.image_quality,
+                        size=self.image_size,
+                        n=1,
+                    )
+                else:
+                    response = self.openai_client.images.generate(
+                        model=self.image_model,
+                        prompt=prompt,
+                        size=self.image_size,
+                        quality=self.image_quality,
+                        n=1
+                    )
         finally:
             for fh in file_handles:
                 try:
@@ -143,21 +189,17 @@ class EntityCreator:
                 except Exception:
                     pass
 
-        image_b64 = response.data[0].b64_json
-        image_bytes = base64.b64decode(image_b64)
+        return self._save_image(GeneratedImage.from_base64(response.data[0].b64_json), name, view)
 
+    def _save_image(self, image: GeneratedImage, name: str, view: str) -> str:
+        # 이름 중복 시 _1, _2 ... 버전 파일명으로 저장 (버전 할당은 저장소 매니페스트에서 원자적으로 처리)
+        # PNG 응답은 디코딩/재인코딩 없이 그대로 기록
         base_name = re.sub(r"[^\w\-]", "_", name)
-        filename = f"{self.typename}+{base_name}_{view}.png"
-        counter = 1
-        path = os.path.join(self.image_dir, filename)
-        while os.path.exists(path):
-            filename = f"{self.typename}+{base_name}_{view}_{counter}.png"
-            path = os.path.join(self.image_dir, filename)
-            counter += 1
-
-        with open(path, "wb") as f:
-            f.write(image_bytes)
-
+        filename = get_artifact_store(self.image_dir).put_stream(
+            f"{self.typename}+{base_name}_{view}", lambda f: image.save(f, "PNG"), ext=".png", versioned=True
+        )
+        # 갤러리용 썸네일/미리보기는 백그라운드에서 미리 생성
+        schedule_derivatives(os.path.join(self.image_dir, filename))
         return filename
 
     def _generate_image_gemini(
@@ -174,7 +216,7 @@ class EntityCreator:
         # 참조 이미지가 있는 경우와 없는 경우를 분리 처리
         if reference_image_path:
             # 참조 이미지가 있는 경우: PIL Image 객체 + 텍스트 프롬프트
-            contents = []
+            prepared_paths = []
             
             if isinstance(reference_image_path, str):
                 paths = [reference_image_path]
@@ -186,33 +228,39 @@ class EntityCreator:
                     logger.warning(f"참조 이미지가 존재하지 않아 스킵합니다: {img_path}")
                     continue
                 
-                # PIL Image 객체로 직접 로드
-                pil_image = Image.open(img_path)
-                contents.append(pil_image)
+                prepared_paths.append(prepare_reference_image(img_path, "gemini"))
             
-            # 텍스트 프롬프트 추가
-            contents.append(prompt)
+            def build_contents():
+                # 업로드된 파일 URI로 참조하고, 업로드할 수 없으면 PIL Image로 인라인 전송 + 텍스트 프롬프트
+                parts = [gemini_image_part(path) or Image.open(path) for path in prepared_paths]
+                return parts + [prompt]
             
-            response = self.gemini_client.models.generate_content(
-                model="gemini-2.5-flash-image",
-                contents=contents,
-                config=genai_types.GenerateContentConfig(
-                    image_config=genai_types.ImageConfig(
-                        aspect_ratio=self.aspect_ratio,
+            def generate(contents):
+                with get_governor("gemini").slot():
+                    return self.gemini_client.models.generate_content(
+                        model="gemini-2.5-flash-image",
+                        contents=contents,
+                        config=genai_types.GenerateContentConfig(
+                            image_config=genai_types.ImageConfig(
+                                aspect_ratio=self.aspect_ratio,
+                            )
+                        )
                     )
-                )
-            )
+            
+            # 업로드 URI가 거부되면(프로바이더에서 먼저 삭제됨 등) 다시 업로드해 한 번 재시도
+            response = call_with_upload_retry("gemini", prepared_paths, build_contents, generate)
         else:
             # 참조 이미지가 없는 경우: 텍스트만
-            response = self.gemini_client.models.generate_content(
-                model="gemini-2.5-flash-image",
-                contents=[prompt],
-                config=genai_types.GenerateContentConfig(
-                    image_config=genai_types.ImageConfig(
-                        aspect_ratio=self.aspect_ratio,
+            with get_governor("gemini").slot():
+                response = self.gemini_client.models.generate_content(
+                    model="gemini-2.5-flash-image",
+                    contents=[prompt],
+                    config=genai_types.GenerateContentConfig(
+                        image_config=genai_types.ImageConfig(
+                            aspect_ratio=self.aspect_ratio,
+                        )
                     )
                 )
-            )
 
         image_parts = [
             part.inline_data.data
@@ -224,20 +272,7 @@ class EntityCreator:
             logger.error("Gemini에서 이미지를 생성하지 못했습니다.")
             return None
 
-        image_bytes = image_parts[0]
-        image = Image.open(BytesIO(image_bytes))
-
-        base_name = re.sub(r"[^\w\-]", "_", name)
-        filename = f"{self.typename}+{base_name}_{view}.png"
-        counter = 1
-        path = os.path.join(self.image_dir, filename)
-        while os.path.exists(path):
-            filename = f"{self.typename}+{base_name}_{view}_{counter}.png"
-            path = os.path.join(self.image_dir, filename)
-            counter += 1
-
-        image.save(path, "PNG")
-        return filename
+        return self._save_image(GeneratedImage(image_parts[0]), name, view)
 
 
 class CharacterImageCreator(EntityCreator):
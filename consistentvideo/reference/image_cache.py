@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+from typing import Optional, List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".reference_cache.json"
+
+# 같은 디렉터리를 쓰는 여러 생성기(인물/장소/사물)가 매니페스트를 동시에 갱신하므로 경로별로 잠금을 공유
+_manifest_locks: Dict[str, threading.Lock] = {}
+_manifest_locks_guard = threading.Lock()
+
+
+def _manifest_lock(path: str) -> threading.Lock:
+    with _manifest_locks_guard:
+        return _manifest_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(fields: Dict[str, Any], reference_paths: Optional[List[str]] = None) -> str:
+    """생성 조건과 참조 이미지 내용으로 만든 SHA-256 키."""
+    payload = dict(fields)
+    payload["reference_images"] = [
+        file_sha256(p) for p in (reference_paths or []) if os.path.exists(p)
+    ]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ReferenceImageCache:
+    """
+    레퍼런스 이미지 디렉터리의 `.reference_cache.json`에 (fingerprint -> 파일명)을 기록한다.
+    같은 조건으로 다시 요청하면 프로바이더 호출 없이 기존 파일을 돌려준다.
+    """
+
+    def __init__(self, image_dir: str):
+        self.image_dir = image_dir
+        self.path = os.path.join(image_dir, MANIFEST_NAME)
+        self.hits: List[str] = []
+        self.misses: List[str] = []
+        self._stats_lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"레퍼런스 이미지 캐시 매니페스트를 읽을 수 없어 무시합니다: {e}")
+            return {}
+
+    def get(self, key: str) -> Optional[str]:
+        with _manifest_lock(self.path):
+            entry = self._load().get(key)
+        if not entry:
+            return None
+        filename = entry.get("filename")
+        if not filename or not os.path.exists(os.path.join(self.image_dir, filename)):
+            return None
+        return filename
+
+    def put(self, key: str, filename: str, *, name: str = "") -> None:
+        with _manifest_lock(self.path):
+            manifest = self._load()
+            manifest[key] = {"filename": filename, "name": name}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def record(self, name: str, hit: bool) -> None:
+        with self._stats_lock:
+            (self.hits if hit else self.misses).append(name)
+
+    def report(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "hits": len(self.hits),
+                "misses": len(self.misses),
+                "hit_names": list(self.hits),
+                "miss_names": list(self.misses),
+            }
@@ -167,8 +167,11 @@ c. 사물 정보
 
 import os
 import json
-from openai import OpenAI
-from .synopsis_parser import parse_characters, parse_locations, parse_objects
+from typing import Optional
+from .synopsis_parser import parse_characters, parse_locations, parse_objects, split_synopsis, merge_entities
+from consistentvideo.aimodel.clients import get_openai_client
+from consistentvideo.aimodel.pool import run_ordered
+from consistentvideo.aimodel.response_cache import chat_completion_text
 from dotenv import load_dotenv
 import logging
 
@@ -180,22 +183,41 @@ class SynopsisAnalyzer:
     def __init__(self, save_dir="first_results"):
         self.save_dir = save_dir
         # os.makedirs(self.save_dir, exist_ok=True)
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = get_openai_client()
 
         self.system_prompt = SYSTEM_PROMPT
 
-    def analyze(self, synopsis_text: str) -> list:
-        messages = [
-            {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": synopsis_text},
-        ]
-
+    def analyze(self, synopsis_text: str, *, use_cache: bool = True, chunk_chars: Optional[int] = None, max_workers: int = 4) -> list:
+        """
+        chunk_chars를 지정하면 시놉시스를 문단 단위 청크(최대 chunk_chars자)로 나눠 동시에 분석한 뒤
+        인물/장소/사물을 정규화된 이름 기준으로 합친다. 결과 형식은 단일 호출과 같다.
+        """
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1", messages=messages, temperature=0.3
-            )
-
-            result_text = response.choices[0].message.content
+            chunks = split_synopsis(synopsis_text, chunk_chars) if chunk_chars else []
+            if len(chunks) > 1:
+                logger.info(f"시놉시스 청크 분석: {len(chunks)}개 청크, 동시 {max_workers}개")
+                # 청크 하나의 요청이 실패해도 나머지 청크 결과는 합쳐서 사용
+                result_texts = run_ordered(chunks, lambda chunk: self._request(chunk, use_cache), max_workers=max(1, max_workers))
+                parsed = []
+                for i, text in enumerate(result_texts, start=1):
+                    if isinstance(text, Exception):
+                        logger.error(f"청크 {i}/{len(chunks)} 분석 요청 실패, 건너뜁니다: {text}")
+                        continue
+                    try:
+                        parsed.append(self._parse_result(text))
+                    except IndexError as e:
+                        logger.warning(f"청크 {i} 분석 결과 형식이 맞지 않아 건너뜁니다: {e}")
+                if not parsed:
+                    raise RuntimeError("모든 청크 분석이 실패했습니다.")
+                items = merge_entities(parsed)
+                result_text = "\n\n".join(
+                    f"### chunk {i}/{len(result_texts)}\n{text}"
+                    for i, text in enumerate(result_texts, start=1)
+                    if not isinstance(text, Exception)
+                )
+            else:
+                result_text = self._request(synopsis_text, use_cache)
+                items = self._parse_result(result_text)
 
             # Save to first_results/
             # base_name = os.path.splitext(os.path.basename(original_filename))[0]
@@ -206,19 +228,8 @@ class SynopsisAnalyzer:
                 f.write(result_text)
             logger.info(f"시놉시스 1차 결과 저장: {result_path}")
 
-            # Parse to structured list
-            character_block = (
-                result_text.split("b. 장소")[0].replace("a. 인물", "").strip()
-            )
-            location_block = result_text.split("b. 장소")[1].split("c. 사물")[0].strip()
-            object_block = result_text.split("c. 사물")[-1].strip()
-
-            characters = parse_characters(character_block)
-            locations = parse_locations(location_block)
-            objects = parse_objects(object_block)
-
             entities = []
-            for item in characters + locations + objects:
+            for item in items:
                 name = item.get("name", "")
                 if item.get("type") == "character":
                     desc = json.dumps(item.get("attributes", {}), ensure_ascii=False)
@@ -247,3 +258,30 @@ class SynopsisAnalyzer:
         except Exception as e:
             logger.error(f"시놉시스 분석 실패: {e}")
             return []
+
+    def _request(self, synopsis_text: str, use_cache: bool) -> str:
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": synopsis_text},
+        ]
+        return chat_completion_text(
+            self.client,
+            model="gpt-4.1",
+            messages=messages,
+            temperature=0.3,
+            use_cache=use_cache,
+        )
+
+    @staticmethod
+    def _parse_result(result_text: str) -> list:
+        # Parse to structured list
+        character_block = (
+            result_text.split("b. 장소")[0].replace("a. 인물", "").strip()
+        )
+        location_block = result_text.split("b. 장소")[1].split("c. 사물")[0].strip()
+        object_block = result_text.split("c. 사물")[-1].strip()
+
+        characters = parse_characters(character_block)
+        locations = parse_locations(location_block)
+        objects = parse_objects(object_block)
+        return characters + locations + objects
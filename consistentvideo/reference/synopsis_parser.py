@@ -116,3 +116,87 @@ def parse_objects(text_block):
         })
 
     return results
+
+
+def split_synopsis(text, max_chars=6000):
+    """
+    문단(빈 줄) 경계를 기준으로 max_chars 이하의 청크로 나눈다.
+    한 문단이 max_chars보다 길면 문장 경계에서, 그래도 길면 글자 수로 자른다.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text or "") if p.strip()]
+    pieces = []
+    for paragraph in paragraphs:
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        sentence_buf = ""
+        for sentence in re.split(r"(?<=[.!?。])\s+", paragraph):
+            while len(sentence) > max_chars:
+                if sentence_buf:
+                    pieces.append(sentence_buf)
+                    sentence_buf = ""
+                pieces.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if sentence_buf and len(sentence_buf) + 1 + len(sentence) > max_chars:
+                pieces.append(sentence_buf)
+                sentence_buf = sentence
+            else:
+                sentence_buf = f"{sentence_buf} {sentence}" if sentence_buf else sentence
+        if sentence_buf:
+            pieces.append(sentence_buf)
+
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 2 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def normalize_entity_name(name):
+    # 공백/구두점/대소문자 차이를 무시 ("김 신", "김신", "김신." -> "김신")
+    return re.sub(r"[\W_]+", "", (name or "").lower())
+
+
+def _merge_attribute(old, new):
+    if isinstance(old, list) or isinstance(new, list):
+        merged = list(old) if isinstance(old, list) else [old]
+        for item in (new if isinstance(new, list) else [new]):
+            if item not in merged:
+                merged.append(item)
+        return merged
+    old, new = (old or "").strip(), (new or "").strip()
+    if not old:
+        return new
+    if not new or new in old:
+        return old
+    if old in new:
+        return new
+    return f"{old}, {new}"
+
+
+def merge_entities(item_lists):
+    """
+    청크별 parse_* 결과 목록들을 (type, 정규화된 name) 기준으로 합친다.
+    처음 등장한 순서와 이름 표기를 유지하고, 속성은 키별로 서로 다른 값을 이어 붙인다.
+    """
+    merged = {}
+    for items in item_lists:
+        for item in items:
+            key = (item.get("type"), normalize_entity_name(item.get("name")))
+            if key not in merged:
+                merged[key] = {
+                    "type": item.get("type"),
+                    "name": item.get("name", ""),
+                    "attributes": dict(item.get("attributes", {})),
+                }
+                continue
+            attributes = merged[key]["attributes"]
+            for attr_key, value in item.get("attributes", {}).items():
+                attributes[attr_key] = _merge_attribute(attributes[attr_key], value) if attr_key in attributes else value
+    return list(merged.values())
@@ -0,0 +1,4 @@
+from .artifact_store import ArtifactStore, get_artifact_store
+from .image_io import GeneratedImage, sniff_format
+from .derivatives import get_derivative, schedule_derivatives
+from .download import DownloadError, download_to_file, write_chunks_to_file
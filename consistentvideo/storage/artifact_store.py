@@ -0,0 +1,305 @@
+import os
+import time
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+import threading
+import logging
+from typing import Optional, Dict, Any, Callable, BinaryIO
+
+from consistentvideo.aimodel.response_cache import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR_NAME = "blobs"
+STAGING_DIR_NAME = "staging"
+MANIFEST_NAME = "artifacts.sqlite"
+
+# 이보다 오래된 임시 파일(중단된 기록)은 prune()에서 정리
+STALE_TMP_SECONDS = 24 * 3600
+
+
+def artifact_store_dir(root: str) -> str:
+    """
+    root(노출 디렉터리)의 blob/매니페스트 위치. 서빙되는 디렉터리 밖(CAVG_ARTIFACT_DIR, 기본 캐시 디렉터리 아래)에 둔다.
+    """
+    base = os.path.expanduser(os.getenv("CAVG_ARTIFACT_DIR") or os.path.join(default_cache_dir(), "artifacts"))
+    return os.path.join(base, hashlib.sha256(os.path.abspath(root).encode("utf-8")).hexdigest()[:16])
+
+
+def _publish(src: str, target: str, *, exclusive: bool) -> bool:
+    """
+    blob(src)을 target 이름으로 노출한다. 같은 파일시스템이면 하드링크로 디스크를 공유하고(같은 내용은 한 번만 저장),
+    다른 파일시스템이거나 하드링크를 지원하지 않으면 복사한다. blob은 읽기 전용이라 노출 파일을 제자리에서 고쳐 쓸 수 없다.
+    같은 디렉터리의 임시 이름에 먼저 만든 뒤, exclusive=True면 target이 없을 때만 원자적으로 생성(있으면 False),
+    아니면 rename으로 원자적 교체한다.
+    """
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copyfile(src, tmp_path)
+    try:
+        if not exclusive:
+            os.replace(tmp_path, target)
+            return True
+        try:
+            os.link(tmp_path, target)
+            return True
+        except FileExistsError:
+            return False
+        except OSError:
+            # 하드링크를 지원하지 않는 파일시스템: O_EXCL로 자리를 먼저 확보한 뒤 교체
+            try:
+                os.close(os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+            except FileExistsError:
+                return False
+            os.replace(tmp_path, target)
+            return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class _HashingWriter:
+    # 기록하는 동안 SHA-256을 함께 계산 (내용을 다시 읽지 않고 blob 주소를 구함)
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._digest.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    디렉터리 단위 내용 주소 기반 산출물 저장소.
+    - 실제 내용은 store_dir의 `blobs/<sha256 앞 2자리>/<sha256><ext>`에 한 번만 저장 (같은 내용은 중복 저장하지 않음)
+    - 논리 이름(name)별 버전 -> blob 매핑은 store_dir의 `artifacts.sqlite`에 기록 (조회 O(1))
+    - store_dir은 서빙 디렉터리 밖에 있으며(artifact_store_dir), root에는 노출 파일만 생긴다
+    - 사용자에게 보이는 파일(기존 파일명 규칙)은 blob의 하드링크(불가능하면 복사본)로 원자적으로 생성/교체
+    - blob은 읽기 전용으로 두어 노출 파일을 제자리에서 고쳐 써 blob이 바뀌는 일을 막음 (교체는 새 파일로 rename)
+    - 어떤 노출 파일의 최신 내용도 아닌 blob은 교체 시/저장소를 열 때 정리 (prune)
+
+    ex)
+    store = get_artifact_store(image_dir)
+    filename = store.put_bytes("characters+김신_front", png_bytes, ext=".png", versioned=True)
+    """
+
+    def __init__(self, root: str, store_dir: Optional[str] = None):
+        self.root = root
+        self.store_dir = store_dir or artifact_store_dir(root)
+        self.blob_dir = os.path.join(self.store_dir, BLOB_DIR_NAME)
+        # 다운로드/스트림 기록용 임시 파일 위치 (blob과 같은 파일시스템이라 rename으로 옮겨짐)
+        self.staging_dir = os.path.join(self.store_dir, STAGING_DIR_NAME)
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # 트랜잭션은 _commit에서 직접 관리
+        self._conn = sqlite3.connect(
+            os.path.join(self.store_dir, MANIFEST_NAME), check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                name TEXT NOT NULL,
+                version INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (name, version)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_filename ON artifacts (filename)")
+
+    def blob_path(self, digest: str, ext: str = "") -> str:
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}{ext}")
+
+    def _stage_bytes(self, data: bytes) -> str:
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return tmp_path
+
+    def _place_blob(self, staged_path: str, digest: str, ext: str) -> None:
+        # 임시 파일을 blob 위치로 옮긴다 (같은 내용의 blob이 있으면 임시 파일만 삭제).
+        # prune()과 겹치지 않도록 _commit/prune의 쓰기 트랜잭션 안에서만 호출
+        path = self.blob_path(digest, ext)
+        if os.path.exists(path):
+            os.remove(staged_path)
+            # 읽기 전용으로 두기 전에 만들어진 blob도 함께 보호
+            os.chmod(path, 0o444)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 노출 파일과 inode를 공유하므로 읽기 전용으로 두어 제자리 수정을 막음
+        os.chmod(staged_path, 0o444)
+        shutil.move(staged_path, path)
+
+    def put_bytes(self, name: str, data: bytes, *, ext: str = "", versioned: bool = False) -> str:
+        """data를 name의 새 버전으로 저장하고 노출된 파일명(root 기준)을 반환한다."""
+        digest = hashlib.sha256(data).hexdigest()
+        return self._commit(name, self._stage_bytes(data), digest, ext, len(data), versioned)
+
+    def put_stream(self, name: str, write: Callable[[BinaryIO], Any], *, ext: str = "", versioned: bool = False) -> str:
+        """write(f)가 기록한 내용을 저장한다. 내용을 메모리에 모으지 않고 임시 파일에 쓰면서 해시를 계산."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                writer = _HashingWriter(f)
+                write(writer)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return self._commit(name, tmp_path, writer.hexdigest(), ext, writer.size, versioned)
+
+    def put_file(
+        self, name: str, src_path: str, *, ext: str = "", versioned: bool = False, digest: Optional[str] = None
+    ) -> str:
+        """
+        src_path 파일을 blob으로 옮겨 저장한다 (src_path는 사라짐).
+        같은 파일시스템의 임시 파일(예: staging_dir 아래)이면 복사 없이 rename으로 옮겨진다.
+        기록하면서 해시를 계산한 경우(digest 지정) 파일을 다시 읽지 않는다.
+        """
+        if digest is None:
+            digest_obj = hashlib.sha256()
+            with open(src_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest_obj.update(block)
+            digest = digest_obj.hexdigest()
+        return self._commit(name, src_path, digest, ext, os.path.getsize(src_path), versioned)
+
+    def _commit(self, name: str, staged_path: str, digest: str, ext: str, size: int, versioned: bool) -> str:
+        blob = self.blob_path(digest, ext)
+        with self._lock:
+            # BEGIN IMMEDIATE: 같은 디렉터리를 쓰는 다른 프로세스와도 버전 번호가 겹치지 않고,
+            # blob 배치/정리가 서로 끼어들지 않도록 쓰기 잠금
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._place_blob(staged_path, digest, ext)
+                row = self._conn.execute(
+                    "SELECT version, digest, filename FROM artifacts WHERE name = ? ORDER BY version DESC LIMIT 1",
+                    (name,),
+                ).fetchone()
+                if row is not None and row[1] == digest and os.path.exists(os.path.join(self.root, row[2])):
+                    # 같은 내용이면 새 버전을 만들지 않음
+                    self._conn.execute("COMMIT")
+                    return row[2]
+
+                version = row[0] + 1 if row is not None else 0
+                if versioned:
+                    # 매니페스트 이전에 만들어진 파일과도 겹치지 않도록 원자적 생성으로 빈 이름을 확보
+                    while True:
+                        filename = f"{name}{ext}" if version == 0 else f"{name}_{version}{ext}"
+                        if _publish(blob, os.path.join(self.root, filename), exclusive=True):
+                            break
+                        version += 1
+                else:
+                    filename = f"{name}{ext}"
+                    _publish(blob, os.path.join(self.root, filename), exclusive=False)
+
+                self._conn.execute(
+                    "INSERT INTO artifacts (name, version, digest, filename, size, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, version, digest, filename, size, time.time()),
+                )
+                # 같은 이름을 덮어쓴 경우 이전 내용의 blob은 다른 노출 파일이 쓰지 않으면 삭제
+                if not versioned and row is not None and row[1] != digest and row[1] not in self._referenced_digests():
+                    self._remove_blob(row[1], os.path.splitext(row[2])[1])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                if os.path.exists(staged_path):
+                    os.remove(staged_path)
+                raise
+        logger.debug(f"산출물 저장: {filename} (v{version}, sha256={digest[:12]})")
+        return filename
+
+    def _referenced_digests(self) -> set:
+        # 노출 파일별 최신 버전의 내용 해시 (이전 버전 기록은 매니페스트에만 남고 blob은 보관하지 않음)
+        rows = self._conn.execute(
+            "SELECT a.digest, a.filename FROM artifacts a "
+            "JOIN (SELECT filename, MAX(version) AS version FROM artifacts GROUP BY filename) latest "
+            "ON a.filename = latest.filename AND a.version = latest.version"
+        ).fetchall()
+        return {digest for digest, filename in rows if os.path.exists(os.path.join(self.root, filename))}
+
+    def _remove_blob(self, digest: str, ext: str) -> None:
+        try:
+            os.remove(self.blob_path(digest, ext))
+        except FileNotFoundError:
+            pass
+
+    def prune(self) -> int:
+        """
+        어떤 노출 파일의 최신 내용도 아닌 blob(덮어쓰였거나 노출 파일이 지워진 것)과
+        오래된 임시 파일(중단된 기록/다운로드)을 지우고, 지운 파일 수를 반환한다.
+        """
+        removed = 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                referenced = self._referenced_digests()
+                for dirpath, _, filenames in os.walk(self.blob_dir):
+                    for filename in filenames:
+                        if filename.split(".", 1)[0] not in referenced:
+                            os.remove(os.path.join(dirpath, filename))
+                            removed += 1
+            finally:
+                self._conn.execute("COMMIT")
+        for filename in os.listdir(self.staging_dir):
+            path = os.path.join(self.staging_dir, filename)
+            if now - os.path.getmtime(path) >= STALE_TMP_SECONDS:
+                os.remove(path)
+                removed += 1
+        if removed:
+            logger.info(f"산출물 저장소 정리: {self.root} 파일 {removed}개 삭제")
+        return removed
+
+    def latest(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, digest, filename, size, created_at FROM artifacts WHERE name = ? ORDER BY version DESC LIMIT 1",
+                (name,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"name": name, "version": row[0], "digest": row[1], "filename": row[2], "size": row[3], "created_at": row[4]}
+
+    def digest_of(self, filename: str) -> Optional[str]:
+        """노출된 파일명의 최신 내용 해시 (매니페스트에 없으면 None)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM artifacts WHERE filename = ? ORDER BY created_at DESC LIMIT 1",
+                (filename,),
+            ).fetchone()
+        return row[0] if row else None
+
+
+_stores: Dict[str, ArtifactStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_artifact_store(root: str) -> ArtifactStore:
+    """디렉터리별 공용 저장소 (같은 디렉터리를 쓰는 생성기들이 매니페스트 연결과 잠금을 공유)."""
+    key = os.path.abspath(root)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            os.makedirs(key, exist_ok=True)
+            store = ArtifactStore(key)
+            try:
+                store.prune()
+            except OSError as e:
+                logger.warning(f"산출물 저장소 정리 실패({key}): {e}")
+            _stores[key] = store
+        return store
@@ -0,0 +1,216 @@
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+import logging
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from consistentvideo.aimodel.response_cache import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# 서빙용 파생 이미지 규격: 긴 변 최대 길이 (None이면 원본 크기 유지, 형식만 변환)
+SIZES: Dict[str, Optional[int]] = {
+    "thumb": 480,
+    "medium": 1024,
+    "full": None,
+}
+
+# 형식: (PIL 저장 형식, 확장자, MIME 타입, 저장 옵션)
+FORMATS: Dict[str, Tuple[str, str, str, dict]] = {
+    "webp": ("WEBP", ".webp", "image/webp", {"quality": 82, "method": 4}),
+    "avif": ("AVIF", ".avif", "image/avif", {"quality": 60}),
+    "jpeg": ("JPEG", ".jpg", "image/jpeg", {"quality": 85, "optimize": True}),
+    "png": ("PNG", ".png", "image/png", {"optimize": True}),
+}
+
+# 이미지가 저장될 때 미리 만들어 둘 파생 이미지 (갤러리 썸네일과 상세 보기)
+DEFAULT_VARIANTS = (("thumb", "webp"), ("medium", "webp"))
+
+# 원본 경로별 캐시 디렉터리에 원본 경로를 적어 두는 파일 (정리 시 원본 존재 여부 확인)
+SOURCE_MARKER = ".source"
+STALE_TMP_SECONDS = 3600
+
+# 대상 경로 -> [잠금, 사용 중인 스레드 수]. 렌더가 끝나 아무도 쓰지 않으면 항목을 지움
+_target_locks: Dict[str, List] = {}
+_target_locks_guard = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pruned = False
+
+
+def _derivatives_disabled() -> bool:
+    return os.getenv("CAVG_DERIVATIVES_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+@contextmanager
+def _target_lock(path: str):
+    with _target_locks_guard:
+        entry = _target_locks.setdefault(path, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _target_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _target_locks[path]
+
+
+def derivative_cache_dir() -> str:
+    return os.path.join(default_cache_dir(), "derivatives")
+
+
+def media_type_of(format_name: str) -> str:
+    return FORMATS[format_name][2]
+
+
+def _source_dir(src_path: str) -> str:
+    # 원본 경로별 디렉터리 (같은 원본의 이전 버전 파생 이미지를 한곳에서 찾아 지울 수 있도록)
+    digest = hashlib.sha256(os.path.abspath(src_path).encode("utf-8")).hexdigest()
+    return os.path.join(derivative_cache_dir(), digest[:2], digest)
+
+
+def _source_version(stat: os.stat_result) -> str:
+    return hashlib.sha256(f"{stat.st_ino}|{stat.st_mtime_ns}|{stat.st_size}".encode("utf-8")).hexdigest()[:16]
+
+
+def derivative_path(src_path: str, size: str, format_name: str) -> str:
+    """
+    파생 이미지 캐시 경로 (<원본 경로 해시>/<원본 버전>-<크기><확장자>).
+    원본은 원자적으로 교체되므로 (inode, mtime, 크기)가 바뀌면 다른 버전이 된다.
+    원본 내용을 해시하지 않아 요청마다 수 MB를 읽지 않는다.
+    """
+    version = _source_version(os.stat(src_path))
+    ext = FORMATS[format_name][1]
+    return os.path.join(_source_dir(src_path), f"{version}-{size}{ext}")
+
+
+def _remove_other_versions(source_dir: str, version: str) -> int:
+    # 원본이 다시 생성되어 더 이상 쓰이지 않는 이전 버전의 파생 이미지 삭제
+    removed = 0
+    now = time.time()
+    for filename in os.listdir(source_dir):
+        if filename == SOURCE_MARKER or filename.startswith(f"{version}-"):
+            continue
+        path = os.path.join(source_dir, filename)
+        if filename.endswith(".tmp") and now - os.path.getmtime(path) < STALE_TMP_SECONDS:
+            continue  # 다른 스레드가 만드는 중
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _render(src_path: str, target: str, size: str, format_name: str) -> None:
+    from PIL import Image, ImageOps
+
+    pil_format, _, _, save_kwargs = FORMATS[format_name]
+    with Image.open(src_path) as source:
+        image = ImageOps.exif_transpose(source)
+        max_edge = SIZES[size]
+        if max_edge and max(image.size) > max_edge:
+            image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        source_dir = os.path.dirname(target)
+        os.makedirs(source_dir, exist_ok=True)
+        marker = os.path.join(source_dir, SOURCE_MARKER)
+        if not os.path.exists(marker):
+            with open(marker, "w", encoding="utf-8") as f:
+                f.write(os.path.abspath(src_path))
+        fd, tmp_path = tempfile.mkstemp(dir=source_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, pil_format, **save_kwargs)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def get_derivative(src_path: str, size: str = "thumb", format_name: str = "webp") -> Optional[str]:
+    """
+    파생 이미지 경로를 반환한다. 캐시에 없으면 바로 만들어 저장한다.
+    만들 수 없으면(PIL 미설치, AVIF 미지원 등) None을 반환하며 호출부는 원본을 사용한다.
+    """
+    if size not in SIZES:
+        raise ValueError(f"지원하지 않는 이미지 크기입니다: {size}")
+    if format_name not in FORMATS:
+        raise ValueError(f"지원하지 않는 이미지 형식입니다: {format_name}")
+    try:
+        target = derivative_path(src_path, size, format_name)
+        if os.path.exists(target):
+            return target
+        # 백그라운드 작업과 요청이 같은 파생 이미지를 동시에 만들지 않도록 대상별 잠금
+        with _target_lock(target):
+            if not os.path.exists(target):
+                _render(src_path, target, size, format_name)
+                _remove_other_versions(os.path.dirname(target), os.path.basename(target).split("-", 1)[0])
+        return target
+    except Exception as e:
+        logger.warning(f"파생 이미지 생성 실패({size}/{format_name}, {src_path}): {e}")
+        return None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.getenv("CAVG_DERIVATIVE_WORKERS", "2"))
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="derivatives")
+        return _executor
+
+
+def prune_derivatives() -> int:
+    """
+    원본이 지워졌거나 다시 생성되어 쓰이지 않는 파생 이미지를 정리하고 지운 파일 수를 반환한다.
+    원본이 다시 저장된 직후 새 파생 이미지를 만들 때도 이전 버전은 바로 지워지며, 이 함수는 그 밖에 남은 것을 정리한다.
+    """
+    root = derivative_cache_dir()
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    for prefix in os.listdir(root):
+        prefix_dir = os.path.join(root, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for name in os.listdir(prefix_dir):
+            source_dir = os.path.join(prefix_dir, name)
+            try:
+                with open(os.path.join(source_dir, SOURCE_MARKER), "r", encoding="utf-8") as f:
+                    src_path = f.read().strip()
+                stat = os.stat(src_path)
+            except OSError:
+                # 원본(또는 기록)이 없으면 디렉터리째 삭제
+                removed += sum(len(files) for _, _, files in os.walk(source_dir))
+                shutil.rmtree(source_dir, ignore_errors=True)
+                continue
+            removed += _remove_other_versions(source_dir, _source_version(stat))
+    if removed:
+        logger.info(f"파생 이미지 캐시 정리: 파일 {removed}개 삭제")
+    return removed
+
+
+def schedule_derivatives(src_path: str, variants: Iterable[Tuple[str, str]] = DEFAULT_VARIANTS) -> None:
+    """이미지 저장 직후 호출해 파생 이미지를 백그라운드 작업 풀에서 미리 만든다 (생성 흐름을 막지 않음)."""
+    global _pruned
+    if _derivatives_disabled() or not src_path:
+        return
+    executor = _get_executor()
+    with _executor_lock:
+        # 프로세스에서 처음 예약할 때 한 번, 이전 실행이 남긴 파생 이미지를 백그라운드에서 정리
+        first, _pruned = not _pruned, True
+    if first:
+        executor.submit(prune_derivatives)
+    for size, format_name in variants:
+        executor.submit(get_derivative, src_path, size, format_name)
@@ -0,0 +1,147 @@
+import os
+import time
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+from consistentvideo.aimodel.clients import get_http_session, http_timeout
+
+logger = logging.getLogger(__name__)
+
+PART_SUFFIX = ".part"
+
+
+class DownloadError(RuntimeError):
+    def __init__(self, message: str, *, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def download_chunk_size() -> int:
+    """스트리밍 다운로드/기록 단위 (CAVG_DOWNLOAD_CHUNK_SIZE, 기본 1MiB). 최대 메모리 사용량은 이 크기로 고정된다."""
+    value = os.getenv("CAVG_DOWNLOAD_CHUNK_SIZE")
+    return max(64 * 1024, int(value)) if value else 1024 * 1024
+
+
+def _hash_file(path: str, chunk_size: int) -> "hashlib._Hash":
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest
+
+
+def _total_size(response, offset: int) -> Optional[int]:
+    # 206: Content-Range "bytes 100-999/1000", 200: Content-Length
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return offset + int(length)
+    return None
+
+
+def write_chunks_to_file(chunks: Iterable[bytes], dest_path: str) -> Tuple[str, int]:
+    """
+    SDK 스트림 등 바이트 청크를 임시 파일(dest_path.part)에 기록하며 SHA-256을 계산하고, 끝나면 dest_path로 원자적 교체.
+    (sha256, 크기)를 반환한다.
+    """
+    part_path = dest_path + PART_SUFFIX
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(part_path, "wb") as f:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        os.replace(part_path, dest_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    return digest.hexdigest(), size
+
+
+def download_to_file(
+    url: str,
+    dest_path: str,
+    *,
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: Optional[int] = None,
+    expected_size: Optional[int] = None,
+    expected_sha256: Optional[str] = None,
+    max_attempts: int = 4,
+    session=None,
+) -> Tuple[str, int]:
+    """
+    url을 청크 단위로 dest_path.part에 받아 크기/체크섬을 확인한 뒤 dest_path로 원자적 교체한다.
+    연결이 끊기면 받은 만큼은 남겨 두고 HTTP Range 요청으로 이어 받는다 (서버가 Range를 무시하면 처음부터).
+    재시도를 다 써도 일시적 오류였다면 .part를 남겨 두어, 같은 dest_path로 다시 호출하면 이어 받는다.
+    (sha256, 크기)를 반환한다.
+    """
+    import requests
+
+    session = session or get_http_session()
+    chunk_size = chunk_size or download_chunk_size()
+    part_path = dest_path + PART_SUFFIX
+    last_error: Optional[BaseException] = None
+
+    for attempt in range(1, max_attempts + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+        try:
+            with session.get(url, headers=request_headers, stream=True, timeout=http_timeout()) as response:
+                status = response.status_code
+                if offset and status == 416:
+                    # 이미 끝까지 받은 상태 (이전 시도가 교체 직전에 중단됨)
+                    total, digest = offset, _hash_file(part_path, chunk_size)
+                elif status in (200, 206):
+                    if status == 206 and offset:
+                        total, digest, mode = _total_size(response, offset), _hash_file(part_path, chunk_size), "ab"
+                    else:
+                        # 서버가 Range를 무시하면 처음부터 다시 받는다
+                        total, digest, mode = _total_size(response, 0), hashlib.sha256(), "wb"
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                            digest.update(chunk)
+                else:
+                    # 만료된 URL 등 4xx는 다시 시도해도 실패 (408/429 제외)
+                    raise DownloadError(
+                        f"다운로드 응답 코드 오류: {status}", retryable=status >= 500 or status in (408, 429)
+                    )
+
+            size = os.path.getsize(part_path)
+            expected = expected_size if expected_size is not None else total
+            if expected is not None and size != expected:
+                if size > expected:
+                    os.remove(part_path)
+                # 중간에 끊긴 경우: 받은 부분을 남겨 두고 이어 받기
+                raise DownloadError(f"다운로드 크기 불일치: {size} != {expected}")
+            sha256 = digest.hexdigest()
+            if expected_sha256 and sha256 != expected_sha256.lower():
+                os.remove(part_path)
+                raise DownloadError(f"다운로드 체크섬 불일치: {sha256} != {expected_sha256}")
+
+            os.replace(part_path, dest_path)
+            return sha256, size
+        except (requests.RequestException, DownloadError, OSError) as e:
+            last_error = e
+            if not getattr(e, "retryable", True):
+                break
+            if attempt < max_attempts:
+                delay = min(2 ** attempt, 30)
+                logger.warning(f"다운로드 재시도({attempt}/{max_attempts}, {delay}s 후): {e}")
+                time.sleep(delay)
+
+    if not getattr(last_error, "retryable", True) and os.path.exists(part_path):
+        os.remove(part_path)
+    raise DownloadError(f"다운로드 실패: {url}: {last_error}")
@@ -0,0 +1,119 @@
+import os
+import base64
+import binascii
+from io import BytesIO
+from typing import Optional, Union, BinaryIO
+
+# base64 4글자 = 3바이트. 64KiB 단위로 나눠 디코딩해 전체 바이트를 한 번에 메모리에 올리지 않는다.
+_B64_CHUNK = 4 * 16 * 1024
+
+_EXT_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP", ".gif": "GIF"}
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """파일 앞부분의 시그니처로 이미지 형식을 판별한다 (디코딩 없음)."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "WEBP"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "GIF"
+    return None
+
+
+class GeneratedImage:
+    """
+    프로바이더가 돌려준 인코딩된 이미지 바이트(또는 base64 문자열)를 그대로 들고 있는 이미지.
+    요청 형식이 원본 형식과 같으면 디코딩/재인코딩 없이 바이트를 그대로 기록하고,
+    형식 변환이나 픽셀 접근이 필요할 때만 PIL로 디코딩한다.
+
+    ex)
+    image = GeneratedImage.from_base64(response.data[0].b64_json)
+    image.save("S0001-C0001.png")       # PNG면 base64를 스트리밍 디코딩해 바로 기록
+    image.save(buffer, "JPEG")           # 형식이 다르면 PIL로 변환
+    """
+
+    def __init__(self, data: Optional[bytes] = None, *, b64: Optional[str] = None):
+        if data is None and b64 is None:
+            raise ValueError("이미지 데이터가 비어있습니다.")
+        self._data = data
+        self._b64 = b64
+        self._pil = None
+        self._format: Optional[str] = None
+
+    @classmethod
+    def from_base64(cls, b64: str) -> "GeneratedImage":
+        return cls(b64=b64)
+
+    @property
+    def format(self) -> Optional[str]:
+        if self._format is None:
+            if self._data is not None:
+                head = self._data[:16]
+            else:
+                head = base64.b64decode(self._b64[:24])
+            self._format = sniff_format(head)
+        return self._format
+
+    def to_bytes(self) -> bytes:
+        if self._data is None:
+            self._data = base64.b64decode(self._b64)
+        return self._data
+
+    def to_pil(self):
+        # 변환/리사이즈 등 실제 픽셀 처리가 필요할 때만 디코딩
+        if self._pil is None:
+            from PIL import Image
+
+            self._pil = Image.open(BytesIO(self.to_bytes()))
+        return self._pil
+
+    @property
+    def size(self):
+        return self.to_pil().size
+
+    def write_raw(self, f: BinaryIO) -> int:
+        """원본 인코딩 바이트를 f에 기록한다. base64면 청크 단위로 디코딩하며 기록."""
+        if self._data is not None:
+            f.write(self._data)
+            return len(self._data)
+        b64 = self._b64
+        if any(ch in b64 for ch in "\r\n "):
+            # 줄바꿈이 섞인 base64는 4글자 정렬이 깨지므로 한 번에 디코딩
+            data = base64.b64decode("".join(b64.split()))
+            f.write(data)
+            return len(data)
+        written = 0
+        try:
+            for start in range(0, len(b64), _B64_CHUNK):
+                chunk = base64.b64decode(b64[start:start + _B64_CHUNK])
+                f.write(chunk)
+                written += len(chunk)
+        except binascii.Error as e:
+            raise ValueError(f"이미지 base64 디코딩 실패: {e}")
+        return written
+
+    def save(self, fp: Union[str, BinaryIO], format: Optional[str] = None) -> None:
+        """PIL Image.save와 같은 호출 형태. 형식이 같으면 바이트를 그대로 기록한다."""
+        if format is None and isinstance(fp, str):
+            format = _EXT_FORMATS.get(os.path.splitext(fp)[1].lower())
+        format = (format or self.format or "PNG").upper()
+        if format == "JPG":
+            format = "JPEG"
+
+        if isinstance(fp, str):
+            with open(fp, "wb") as f:
+                self._write(f, format)
+        else:
+            self._write(fp, format)
+
+    def _write(self, f: BinaryIO, format: str) -> None:
+        if self.format == format:
+            self.write_raw(f)
+            return
+        image = self.to_pil()
+        if format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(f, format)
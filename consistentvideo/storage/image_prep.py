@@ -0,0 +1,131 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from consistentvideo.aimodel.response_cache import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+# 프로바이더별 참조 이미지 규격: 긴 변 최대 길이(또는 고정 크기 size), 저장 형식, 색 공간, 품질
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # gpt-image-1 images.edit 참조 이미지 (출력 최대 1536px)
+    "openai_edit": {"max_edge": 1536, "format": "JPEG", "mode": "RGB", "quality": 90},
+    # gpt-4.1 이미지 분석 (high detail도 내부적으로 768px 단변으로 축소됨)
+    "openai_vision": {"max_edge": 1024, "format": "JPEG", "mode": "RGB", "quality": 85},
+    # Gemini 이미지 생성 참조 이미지
+    "gemini": {"max_edge": 1536, "format": "JPEG", "mode": "RGB", "quality": 90},
+    # Sora 2 input_reference (출력 영상 해상도와 정확히 같아야 함, 비율이 다르면 레터박스)
+    "sora_720p": {"size": [1280, 720], "format": "JPEG", "mode": "RGB", "quality": 92},
+}
+
+_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+# (경로, mtime, 크기) -> 원본 SHA-256. 같은 엔티티 이미지를 컷마다 다시 해시하지 않도록 메모
+_source_hashes: Dict[Tuple[str, float, int], str] = {}
+_source_hashes_lock = threading.Lock()
+
+
+def _prep_disabled() -> bool:
+    return os.getenv("CAVG_IMAGE_PREP_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def _source_sha256(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime, stat.st_size)
+    with _source_hashes_lock:
+        cached = _source_hashes.get(key)
+    if cached:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    value = digest.hexdigest()
+    with _source_hashes_lock:
+        _source_hashes[key] = value
+    return value
+
+
+def _profile_tag(profile: Dict[str, Any]) -> str:
+    # 규격이 바뀌면 다른 캐시 파일을 쓰도록 규격 자체를 키에 포함
+    return hashlib.sha256(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def prep_cache_dir() -> str:
+    return os.path.join(default_cache_dir(), "image_prep")
+
+
+def prepare_reference_image(path: str, profile_name: str) -> str:
+    """
+    참조 이미지를 프로바이더 규격(긴 변 축소 또는 고정 크기 레터박스, 형식/색 공간 통일, 메타데이터 제거)으로 변환한 파일 경로를 반환한다.
+    결과는 (원본 해시, 규격)을 키로 디스크에 캐시되어 같은 엔티티를 참조하는 모든 컷이 재사용한다.
+    변환할 수 없으면 원본 경로를 그대로 반환한다. 단 고정 크기 규격은 원본을 보내면 프로바이더가 거부하므로 RuntimeError를 낸다.
+    """
+    if not path or not os.path.exists(path):
+        return path
+    profile = PROFILES.get(profile_name)
+    if profile is None:
+        raise ValueError(f"지원하지 않는 이미지 전처리 규격입니다: {profile_name}")
+    # 고정 크기 규격은 프로바이더 요구사항이므로 전처리를 꺼도 적용
+    if _prep_disabled() and not profile.get("size"):
+        return path
+
+    try:
+        source_hash = _source_sha256(path)
+        ext = _EXTENSIONS.get(profile["format"], ".png")
+        target = os.path.join(prep_cache_dir(), source_hash[:2], f"{source_hash}-{profile_name}-{_profile_tag(profile)}{ext}")
+        if os.path.exists(target):
+            return target
+
+        from PIL import Image, ImageOps
+
+        with Image.open(path) as source:
+            # EXIF 회전 정보를 픽셀에 반영한 뒤 메타데이터 없이 다시 저장
+            image = ImageOps.exif_transpose(source)
+            if image.mode != profile["mode"]:
+                if profile["mode"] == "RGB" and image.mode in ("RGBA", "LA", "P"):
+                    # 투명 배경은 흰색으로 합성 (JPEG는 알파 채널 없음)
+                    rgba = image.convert("RGBA")
+                    background = Image.new("RGB", rgba.size, (255, 255, 255))
+                    background.paste(rgba, mask=rgba.split()[-1])
+                    image = background
+                else:
+                    image = image.convert(profile["mode"])
+            if profile.get("size"):
+                # 고정 크기 규격: 비율을 유지해 맞춘 뒤 남는 부분은 검은 여백으로 채움 (늘려서 왜곡하지 않음)
+                image = ImageOps.pad(image, tuple(profile["size"]), Image.LANCZOS, color=(0, 0, 0))
+            elif max(image.size) > profile["max_edge"]:
+                max_edge = profile["max_edge"]
+                image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    save_kwargs = {"quality": profile["quality"]} if profile["format"] in ("JPEG", "WEBP") else {}
+                    image.save(f, profile["format"], **save_kwargs)
+                os.replace(tmp_path, target)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        logger.debug(
+            f"참조 이미지 전처리({profile_name}): {os.path.basename(path)} "
+            f"{os.path.getsize(path) // 1024}KB -> {os.path.getsize(target) // 1024}KB"
+        )
+        return target
+    except Exception as e:
+        if profile.get("size"):
+            raise RuntimeError(f"참조 이미지를 {profile_name} 규격으로 변환할 수 없습니다({path}): {e}") from e
+        logger.warning(f"참조 이미지 전처리 실패, 원본을 사용합니다({path}): {e}")
+        return path
+
+
+def prepare_reference_images(paths: Optional[List[str]], profile_name: str) -> List[str]:
+    return [prepare_reference_image(p, profile_name) for p in (paths or [])]
@@ -1,2 +1,3 @@
 from .scene_generator import SceneGenerator
 from .cut_generator import CutGenerator
+from .bulk_cut import BulkCutJob, BulkBackend, OpenAIBatchBackend, LocalBulkBackend, get_bulk_backend
@@ -0,0 +1,429 @@
+import os
+import json
+import time
+import hashlib
+import uuid
+import threading
+import logging
+from typing import List, Dict, Any, Optional, Union
+
+from consistentvideo.aimodel.clients import get_openai_client
+from consistentvideo.aimodel.response_cache import default_cache_dir, get_response_cache, chat_completion_with_usage
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+# 벌크 작업 상태: 백엔드 고유 상태를 이 세 가지로 정규화
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+# 이 프로세스에서 처리 중인 로컬 벌크 작업 (job_id -> 처리 스레드)
+# 요청마다 백엔드 객체가 새로 만들어지므로 프로세스 단위로 두어야 같은 작업의 스레드가 중복 실행되지 않음
+_local_active: Dict[str, threading.Thread] = {}
+_local_active_lock = threading.Lock()
+
+
+class BulkBackend:
+    """
+    JSONL 요청 파일을 한 번에 제출하고 나중에 결과를 받아오는 벌크 제출 백엔드.
+    요청/결과 한 줄의 형식은 OpenAI Batch API 형식을 따른다.
+    - 요청: {"custom_id", "method", "url", "body"}
+    - 결과: {"custom_id", "response": {"status_code", "body"}, "error"}
+    """
+
+    name = "base"
+
+    def submit(self, requests_path: str) -> str:
+        """요청 파일을 제출하고 작업 ID를 반환한다."""
+        raise NotImplementedError
+
+    def status(self, job_id: str) -> str:
+        """STATUS_RUNNING / STATUS_COMPLETED / STATUS_FAILED 중 하나."""
+        raise NotImplementedError
+
+    def fetch(self, job_id: str) -> List[Dict[str, Any]]:
+        """완료된 작업의 결과 줄 목록."""
+        raise NotImplementedError
+
+
+class OpenAIBatchBackend(BulkBackend):
+    """OpenAI Batch API (24시간 처리 창, 일반 호출 대비 할인 단가)."""
+
+    name = "openai"
+
+    def __init__(self, client=None, completion_window: str = "24h"):
+        self.client = client or get_openai_client()
+        self.completion_window = completion_window
+
+    def submit(self, requests_path: str) -> str:
+        with open(requests_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=CHAT_COMPLETIONS_URL,
+            completion_window=self.completion_window,
+        )
+        logger.info(f"OpenAI 배치 제출 완료: batch_id={batch.id}")
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        batch = self.client.batches.retrieve(job_id)
+        if batch.status == "completed":
+            return STATUS_COMPLETED
+        if batch.status in ("failed", "expired", "cancelled"):
+            return STATUS_FAILED
+        return STATUS_RUNNING
+
+    def fetch(self, job_id: str) -> List[Dict[str, Any]]:
+        batch = self.client.batches.retrieve(job_id)
+        lines: List[Dict[str, Any]] = []
+        # 성공 결과와 요청 단위 오류는 서로 다른 파일로 돌아옴
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = self.client.files.content(file_id).text
+            lines.extend(json.loads(line) for line in content.splitlines() if line.strip())
+        return lines
+
+
+class LocalBulkBackend(BulkBackend):
+    """
+    요청 파일을 백그라운드 스레드에서 한 줄씩 chat completion으로 처리하는 로컬 대체 백엔드.
+    벌크 API 없이 같은 흐름(제출 -> 폴링 -> 결과 수집)을 확인할 때 사용한다.
+    작업 상태(<job_id>.json)와 결과(<job_id>.results.jsonl, 한 줄씩 추가)를 state_dir에 기록하므로
+    프로세스가 재시작되어도 status() 호출 시 남은 요청부터 이어서 처리한다.
+    """
+
+    name = "local"
+
+    def __init__(self, client=None, state_dir: Optional[str] = None):
+        self.client = client or get_openai_client()
+        self.state_dir = state_dir or os.path.join(default_cache_dir(), "bulk_local")
+
+    def _state_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.json")
+
+    def _results_path(self, job_id: str) -> str:
+        return os.path.join(self.state_dir, f"{job_id}.results.jsonl")
+
+    def _load_state(self, job_id: str) -> Dict[str, Any]:
+        try:
+            with open(self._state_path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"알 수 없는 로컬 벌크 작업입니다: {job_id}")
+
+    def _save_state(self, job_id: str, state: Dict[str, Any]) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = self._state_path(job_id) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self._state_path(job_id))
+
+    def submit(self, requests_path: str) -> str:
+        job_id = f"local-{uuid.uuid4().hex[:12]}"
+        # 요청 파일은 다음 제출 때 덮어써지므로 작업별로 복사해 둠
+        rows = read_jsonl(requests_path)
+        os.makedirs(self.state_dir, exist_ok=True)
+        write_jsonl(os.path.join(self.state_dir, f"{job_id}.requests.jsonl"), rows)
+        self._save_state(job_id, {"status": STATUS_RUNNING, "request_count": len(rows)})
+        self._start(job_id)
+        return job_id
+
+    def _start(self, job_id: str) -> None:
+        # 처리 중인 스레드가 있으면 그대로 두고, 없을 때(첫 제출, 재시작 후)만 새로 시작
+        with _local_active_lock:
+            thread = _local_active.get(job_id)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(target=self._run, args=(job_id,), daemon=True)
+            _local_active[job_id] = thread
+            thread.start()
+
+    def _run(self, job_id: str) -> None:
+        results_path = self._results_path(job_id)
+        try:
+            done = {row["custom_id"] for row in read_jsonl(results_path)} if os.path.exists(results_path) else set()
+            if done:
+                logger.info(f"로컬 벌크 작업 이어서 처리(job_id={job_id}): 완료 {len(done)}개")
+            requests = read_jsonl(os.path.join(self.state_dir, f"{job_id}.requests.jsonl"))
+            with open(results_path, "a", encoding="utf-8") as out:
+                for request in requests:
+                    if request["custom_id"] in done:
+                        continue
+                    out.write(json.dumps(self._call(request), ensure_ascii=False) + "\n")
+                    out.flush()
+            status = STATUS_COMPLETED
+        except Exception as e:
+            logger.error(f"로컬 벌크 작업 실패(job_id={job_id}): {e}")
+            status = STATUS_FAILED
+        state = self._load_state(job_id)
+        state["status"] = status
+        self._save_state(job_id, state)
+        with _local_active_lock:
+            if _local_active.get(job_id) is threading.current_thread():
+                del _local_active[job_id]
+
+    def _call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        body = request["body"]
+        try:
+            text, usage = chat_completion_with_usage(
+                self.client,
+                model=body["model"],
+                messages=body["messages"],
+                temperature=body.get("temperature"),
+                max_tokens=body.get("max_tokens"),
+                use_cache=False,
+            )
+        except Exception as e:
+            return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+        response_body = {
+            "choices": [{"message": {"role": "assistant", "content": text}}],
+            "usage": {
+                "prompt_tokens": usage["prompt_tokens"],
+                "completion_tokens": usage["completion_tokens"],
+                "prompt_tokens_details": {"cached_tokens": usage["cached_tokens"]},
+            },
+        }
+        return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": response_body}, "error": None}
+
+    def status(self, job_id: str) -> str:
+        status = self._load_state(job_id)["status"]
+        if status == STATUS_RUNNING:
+            # 재시작 등으로 처리 스레드가 없으면 남은 요청부터 다시 시작
+            self._start(job_id)
+        return status
+
+    def fetch(self, job_id: str) -> List[Dict[str, Any]]:
+        results_path = self._results_path(job_id)
+        return read_jsonl(results_path) if os.path.exists(results_path) else []
+
+
+BULK_BACKENDS = {
+    "openai": OpenAIBatchBackend,
+    "local": LocalBulkBackend,
+}
+
+
+def get_bulk_backend(name: str, **kwargs) -> BulkBackend:
+    backend_cls = BULK_BACKENDS.get(name)
+    if backend_cls is None:
+        raise ValueError(f"지원하지 않는 벌크 백엔드입니다: {name}")
+    return backend_cls(**kwargs)
+
+
+def read_jsonl(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_jsonl(path: str, rows: List[Dict[str, Any]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def scene_custom_id(index: int) -> str:
+    return f"scene-{index + 1:04d}"
+
+
+def build_request(custom_id: str, messages: List[Dict[str, Any]], *, model: str, temperature: Optional[float], max_tokens: Optional[int]) -> Dict[str, Any]:
+    body: Dict[str, Any] = {"model": model, "messages": messages}
+    if temperature is not None:
+        body["temperature"] = temperature
+    if max_tokens is not None:
+        body["max_tokens"] = max_tokens
+    return {"custom_id": custom_id, "method": "POST", "url": CHAT_COMPLETIONS_URL, "body": body}
+
+
+def result_text(line: Dict[str, Any]) -> str:
+    """결과 한 줄에서 응답 본문 텍스트를 꺼낸다. 요청 단위 오류면 RuntimeError."""
+    response = line.get("response") or {}
+    if line.get("error") or response.get("status_code") != 200:
+        error = line.get("error") or (response.get("body") or {}).get("error") or {}
+        raise RuntimeError(f"벌크 요청 실패({line.get('custom_id')}): {error.get('message', error)}")
+    return response["body"]["choices"][0]["message"]["content"]
+
+
+def result_usage(line: Dict[str, Any]) -> Dict[str, Any]:
+    usage = ((line.get("response") or {}).get("body") or {}).get("usage") or {}
+    return {
+        "prompt_tokens": usage.get("prompt_tokens", 0) or 0,
+        "cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0) or 0,
+        "completion_tokens": usage.get("completion_tokens", 0) or 0,
+        "local_cache_hit": False,
+    }
+
+
+class BulkCutJob:
+    """
+    씬별 컷 분할 요청을 하나의 벌크 작업으로 묶어 제출/폴링/수집한다.
+    작업 정보는 요청 파일 옆 `<이름>.job.json`에 기록되어, 프로세스를 다시 띄운 뒤에도 resume()으로 결과를 받을 수 있다.
+
+    ex)
+    job = BulkCutJob(CutGenerator(), get_bulk_backend("openai"), work_dir="story/bulk")
+    job.submit(scenes, entity_list, story_text)
+    results = job.wait()
+    job.write_cut_txt("story/cut.txt")
+    """
+
+    def __init__(self, cut_generator, backend: BulkBackend, work_dir: str, *, model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500, use_cache: bool = True):
+        self.cut_generator = cut_generator
+        self.backend = backend
+        self.work_dir = work_dir
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.use_cache = use_cache
+        self.requests_path = os.path.join(work_dir, "cut_requests.jsonl")
+        self.job_path = os.path.join(work_dir, "cut_requests.job.json")
+        self.job_id: Optional[str] = None
+        self.input_digest: Optional[str] = None
+        self.scene_count = 0
+        self.results: List[Union[List[Dict], Exception]] = []
+        # custom_id -> (씬 인덱스, 캐시 키)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # 로컬 응답 캐시에 이미 있는 씬은 제출하지 않음
+        self._cached: Dict[int, str] = {}
+
+    def make_input_digest(self, scenes: List[Dict], entity_list: list, story_text: str) -> str:
+        """제출 입력(씬, 엔티티, 스토리, 모델 파라미터)의 해시. 남아 있는 작업이 같은 입력인지 확인할 때 사용."""
+        payload = [self.model, self.temperature, self.max_tokens, scenes, entity_list, story_text]
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def submit(self, scenes: List[Dict], entity_list: list, story_text: str) -> Optional[str]:
+        cache = get_response_cache() if self.use_cache else None
+        rows = []
+        self.scene_count = len(scenes)
+        self.input_digest = self.make_input_digest(scenes, entity_list, story_text)
+        self._pending = {}
+        self._cached = {}
+        for index, scene in enumerate(scenes):
+            messages = self.cut_generator._build_messages(scene, entity_list, story_text)
+            key = cache.make_key(self.model, messages, self.temperature, self.max_tokens) if cache else None
+            cached = cache.get(key) if cache else None
+            if cached is not None:
+                self._cached[index] = cached
+                continue
+            custom_id = scene_custom_id(index)
+            self._pending[custom_id] = {"index": index, "cache_key": key, "scene_id": scene.get("scene_id") if isinstance(scene, dict) else None}
+            rows.append(build_request(custom_id, messages, model=self.model, temperature=self.temperature, max_tokens=self.max_tokens))
+
+        if rows:
+            write_jsonl(self.requests_path, rows)
+            self.job_id = self.backend.submit(self.requests_path)
+        logger.info(f"컷 분할 벌크 제출: 요청 {len(rows)}개, 캐시 적중 {len(self._cached)}개, job_id={self.job_id}")
+        self._save_manifest()
+        return self.job_id
+
+    def _save_manifest(self) -> None:
+        os.makedirs(self.work_dir, exist_ok=True)
+        manifest = {
+            "backend": self.backend.name,
+            "job_id": self.job_id,
+            "input_digest": self.input_digest,
+            "model": self.model,
+            "scene_count": self.scene_count,
+            "pending": self._pending,
+            "cached": {str(i): text for i, text in self._cached.items()},
+        }
+        with open(self.job_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def has_manifest(self) -> bool:
+        """아직 결과를 수집하지 않은 제출 작업이 work_dir에 남아 있는지."""
+        return os.path.exists(self.job_path)
+
+    def resume(self) -> Optional[str]:
+        """이전에 제출한 작업 정보를 job.json에서 다시 읽어온다."""
+        with open(self.job_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("backend") != self.backend.name:
+            raise ValueError(f"제출 당시 백엔드({manifest.get('backend')})와 다른 백엔드로 재개할 수 없습니다.")
+        self.job_id = manifest["job_id"]
+        self.input_digest = manifest.get("input_digest")
+        self.model = manifest.get("model", self.model)
+        self.scene_count = manifest["scene_count"]
+        self._pending = manifest["pending"]
+        self._cached = {int(i): text for i, text in manifest["cached"].items()}
+        return self.job_id
+
+    def status(self) -> str:
+        """제출한 작업의 상태 (모든 씬이 캐시 적중이라 제출하지 않았으면 완료)."""
+        return self.backend.status(self.job_id) if self.job_id is not None else STATUS_COMPLETED
+
+    def finish(self) -> None:
+        """결과를 수집한 뒤 job.json을 지워 다음 호출이 새로 제출하도록 한다."""
+        if os.path.exists(self.job_path):
+            os.remove(self.job_path)
+
+    def wait(self, *, poll_interval: float = 60.0, timeout: Optional[float] = None) -> List[Union[List[Dict], Exception]]:
+        """작업이 끝날 때까지 폴링한 뒤 씬 순서대로 컷 목록(실패한 씬은 예외 객체)을 반환한다."""
+        if self.job_id is not None:
+            started = time.monotonic()
+            while True:
+                status = self.status()
+                if status == STATUS_COMPLETED:
+                    break
+                if status == STATUS_FAILED:
+                    raise RuntimeError(f"벌크 작업이 실패했습니다: job_id={self.job_id}")
+                if timeout is not None and time.monotonic() - started > timeout:
+                    raise TimeoutError(f"벌크 작업 대기 시간 초과: job_id={self.job_id}")
+                time.sleep(poll_interval)
+        return self.collect()
+
+    def collect(self) -> List[Union[List[Dict], Exception]]:
+        cache = get_response_cache() if self.use_cache else None
+        results: List[Union[List[Dict], Exception]] = [
+            RuntimeError("벌크 결과에 해당 씬의 응답이 없습니다.") for _ in range(self.scene_count)
+        ]
+        for index, text in self._cached.items():
+            results[index] = self._parse(index, text)
+
+        lines = self.backend.fetch(self.job_id) if self.job_id is not None else []
+        seen = set()
+        for line in lines:
+            custom_id = line.get("custom_id")
+            pending = self._pending.get(custom_id)
+            # 같은 요청의 결과가 여러 줄이면 첫 줄만 사용 (사용량/캐시 중복 기록 방지)
+            if pending is None or custom_id in seen:
+                continue
+            seen.add(custom_id)
+            index = pending["index"]
+            try:
+                text = result_text(line)
+            except RuntimeError as e:
+                logger.error(str(e))
+                results[index] = e
+                continue
+            self.cut_generator._record_usage({"scene_id": pending.get("scene_id")}, self.model, result_usage(line))
+            if cache is not None and pending.get("cache_key"):
+                cache.put(pending["cache_key"], text, model=self.model)
+            results[index] = self._parse(index, text)
+
+        self.results = results
+        return results
+
+    def _parse(self, index: int, text: str) -> Union[List[Dict], Exception]:
+        try:
+            return self.cut_generator._parse_cuts(text)
+        except ValueError as e:
+            logger.error(f"씬 {index + 1} 벌크 응답 파싱 실패: {e}")
+            return e
+
+    def failed_scenes(self) -> List[Dict[str, Any]]:
+        return [
+            {"scene_num": i + 1, "error": str(r)}
+            for i, r in enumerate(self.results)
+            if isinstance(r, Exception)
+        ]
+
+    def write_cut_txt(self, cuts_output_path: str) -> None:
+        """결과를 cut.txt 형식(씬당 한 줄, 실패한 씬은 빈 리스트)으로 기록한다."""
+        os.makedirs(os.path.dirname(cuts_output_path) or ".", exist_ok=True)
+        with open(cuts_output_path, "w", encoding="utf-8") as f:
+            for cuts in self.results:
+                f.write(str([] if isinstance(cuts, Exception) else cuts) + "\n")
@@ -1,26 +1,108 @@
 import os
+import asyncio
+import weakref
+from typing import Iterator, List, Dict, Tuple, Any
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 import logging
 
+from consistentvideo.aimodel.clients import get_openai_client, get_async_openai_client
+from consistentvideo.aimodel.response_cache import (
+    chat_completion_with_usage,
+    achat_completion_with_usage,
+    chat_completion_stream,
+)
+
 load_dotenv()
 
-_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 logger = logging.getLogger(__name__)
 
+# 세마포어는 이벤트 루프에 묶이므로 루프별로 하나씩 공유
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+
+
+def set_max_concurrency(limit: int) -> None:
+    """acall_gpt의 동시 요청 수 상한을 변경한다 (이후 생성되는 세마포어부터 적용)."""
+    global _max_concurrency
+    _max_concurrency = max(1, int(limit))
+    _semaphores.clear()
+
+
+def _get_async_client() -> AsyncOpenAI:
+    return get_async_openai_client()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(_max_concurrency)
+        _semaphores[loop] = semaphore
+    return semaphore
 
-def call_gpt(prompt: str, model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500) -> str:
+
+def call_gpt(prompt: str, model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500, *, use_cache: bool = True) -> str:
+    messages = [{"role": "user", "content": prompt}]
+    return call_gpt_messages(messages, model=model, temperature=temperature, max_tokens=max_tokens, use_cache=use_cache)[0]
+
+
+def call_gpt_messages(messages: List[Dict[str, Any]], model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500, *, use_cache: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """messages를 그대로 전송하고 (응답 텍스트, 토큰 사용량)을 반환한다."""
     try:
         logger.debug(f"OpenAI 요청: model={model}, temperature={temperature}, max_tokens={max_tokens}")
-        response = _client.chat.completions.create(
+        text, usage = chat_completion_with_usage(
+            get_openai_client(),
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+        )
+        logger.debug(f"OpenAI 응답 수신 완료: usage={usage}")
+        return text.strip(), usage
+    except Exception as e:
+        logger.error(f"OpenAI 호출 중 오류 발생 (model={model}): {e}")
+        raise RuntimeError(f"OpenAI 호출 중 오류 발생 (model={model}): {e}")
+
+
+def call_gpt_stream(prompt: str, model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500, *, use_cache: bool = True) -> Iterator[str]:
+    """응답 텍스트를 도착하는 대로 조각 단위로 내보내는 call_gpt."""
+    try:
+        logger.debug(f"OpenAI 스트리밍 요청: model={model}, temperature={temperature}, max_tokens={max_tokens}")
+        yield from chat_completion_stream(
+            get_openai_client(),
             model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=temperature,
             max_tokens=max_tokens,
+            use_cache=use_cache,
         )
-        text = response.choices[0].message.content.strip()
-        logger.debug("OpenAI 응답 수신 완료")
-        return text
+        logger.debug("OpenAI 스트리밍 응답 수신 완료")
+    except Exception as e:
+        logger.error(f"OpenAI 호출 중 오류 발생 (model={model}): {e}")
+        raise RuntimeError(f"OpenAI 호출 중 오류 발생 (model={model}): {e}")
+
+
+async def acall_gpt(prompt: str, model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500, *, use_cache: bool = True) -> str:
+    messages = [{"role": "user", "content": prompt}]
+    return (await acall_gpt_messages(messages, model=model, temperature=temperature, max_tokens=max_tokens, use_cache=use_cache))[0]
+
+
+async def acall_gpt_messages(messages: List[Dict[str, Any]], model: str = "gpt-4.1", temperature: float = 0.7, max_tokens: int = 1500, *, use_cache: bool = True) -> Tuple[str, Dict[str, Any]]:
+    try:
+        async with _get_semaphore():
+            logger.debug(f"OpenAI 비동기 요청: model={model}, temperature={temperature}, max_tokens={max_tokens}")
+            text, usage = await achat_completion_with_usage(
+                _get_async_client(),
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                use_cache=use_cache,
+            )
+        logger.debug(f"OpenAI 비동기 응답 수신 완료: usage={usage}")
+        return text.strip(), usage
     except Exception as e:
         logger.error(f"OpenAI 호출 중 오류 발생 (model={model}): {e}")
         raise RuntimeError(f"OpenAI 호출 중 오류 발생 (model={model}): {e}")
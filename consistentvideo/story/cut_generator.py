@@ -1,18 +1,143 @@
 import json
-import re
-from typing import List, Dict
-from .call_gpt import call_gpt
+import asyncio
+from typing import List, Dict, Union, Any
+from .call_gpt import call_gpt_messages, acall_gpt_messages
+from .json_parser import extract_json_array
+from .bulk_cut import BulkBackend, BulkCutJob
+from consistentvideo.aimodel.clients import aclose_async_openai_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+# inline: 기존 단일 프롬프트 / prefix: 불변 내용(지시문+스토리+구성요소)을 고정 접두부로 두고 씬만 뒤에 붙임
+PROMPT_LAYOUTS = ("inline", "prefix")
+
 
 class CutGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, prompt_layout: str = "inline"):
+        if prompt_layout not in PROMPT_LAYOUTS:
+            raise ValueError(f"지원하지 않는 prompt_layout입니다: {prompt_layout}")
+        self.prompt_layout = prompt_layout
+        self.usage_log: List[Dict[str, Any]] = []
+        self._prefix_source = None
+        self._prefix_text = None
+
+    def cut_scene(self, scene: Dict, entity_list: list, story_text: str, *, model: str = "gpt-4.1", use_cache: bool = True) -> List[Dict]:
+        messages = self._build_messages(scene, entity_list, story_text)
+        logger.info("컷 분할 프롬프트 전송")
+        response, usage = call_gpt_messages(messages, model=model, use_cache=use_cache)
+        self._record_usage(scene, model, usage)
+        return self._parse_cuts(response)
+
+    async def acut_scene(self, scene: Dict, entity_list: list, story_text: str, *, model: str = "gpt-4.1", use_cache: bool = True) -> List[Dict]:
+        messages = self._build_messages(scene, entity_list, story_text)
+        logger.info("컷 분할 프롬프트 전송 (async)")
+        response, usage = await acall_gpt_messages(messages, model=model, use_cache=use_cache)
+        self._record_usage(scene, model, usage)
+        return self._parse_cuts(response)
+
+    async def acut_scenes(self, scenes: List[Dict], entity_list: list, story_text: str, *, model: str = "gpt-4.1", use_cache: bool = True, max_workers: int = 4) -> List[Union[List[Dict], Exception]]:
+        """
+        여러 씬을 동시에 컷 분할한다. 결과는 입력 씬 순서를 유지하며,
+        실패한 씬은 예외 객체가 그 자리에 들어간다.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def run(index: int, scene: Dict):
+            async with semaphore:
+                try:
+                    return await self.acut_scene(scene, entity_list, story_text, model=model, use_cache=use_cache)
+                except Exception as e:
+                    logger.error(f"씬 {index + 1} 컷 분할 실패: {e}")
+                    raise
+
+        return await asyncio.gather(*(run(i, s) for i, s in enumerate(scenes)), return_exceptions=True)
+
+    def cut_scenes(self, scenes: List[Dict], entity_list: list, story_text: str, *, model: str = "gpt-4.1", use_cache: bool = True, max_workers: int = 4) -> List[Union[List[Dict], Exception]]:
+        # 이벤트 루프가 없는 동기 호출부(FastAPI 동기 엔드포인트 등)용 진입점
+        # 호출마다 새 루프가 생기므로 루프에 묶인 AsyncOpenAI 클라이언트는 루프가 끝나기 전에 닫음
+        async def run_scoped():
+            try:
+                return await self.acut_scenes(scenes, entity_list, story_text, model=model, use_cache=use_cache, max_workers=max_workers)
+            finally:
+                await aclose_async_openai_client()
 
-    def cut_scene(self, scene: Dict, entity_list: list, story_text: str, *, model: str = "gpt-4.1") -> List[Dict]:
-        prompt = f"""
+        return asyncio.run(run_scoped())
+
+    def bulk_cut_scenes(self, scenes: List[Dict], entity_list: list, story_text: str, *, backend: BulkBackend, work_dir: str, model: str = "gpt-4.1", use_cache: bool = True, poll_interval: float = 60.0, timeout: float = None) -> List[Union[List[Dict], Exception]]:
+        """
+        모든 씬의 컷 분할 요청을 하나의 벌크 작업(JSONL)으로 제출하고, 완료될 때까지 폴링해 결과를 씬 순서대로 반환한다.
+        대화형 지연이 필요 없는 야간 배치용. 실패한 씬은 예외 객체가 그 자리에 들어간다.
+        """
+        job = BulkCutJob(self, backend, work_dir, model=model, use_cache=use_cache)
+        job.submit(scenes, entity_list, story_text)
+        return job.wait(poll_interval=poll_interval, timeout=timeout)
+
+    def usage_summary(self) -> Dict[str, Any]:
+        """기록된 호출들의 토큰 사용량 합계와 프로바이더 프롬프트 캐시 적중률."""
+        prompt_tokens = sum(u["prompt_tokens"] for u in self.usage_log)
+        cached_tokens = sum(u["cached_tokens"] for u in self.usage_log)
+        return {
+            "prompt_layout": self.prompt_layout,
+            "calls": len(self.usage_log),
+            "local_cache_hits": sum(1 for u in self.usage_log if u.get("local_cache_hit")),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": sum(u["completion_tokens"] for u in self.usage_log),
+            "cached_ratio": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        }
+
+    def _record_usage(self, scene: Dict, model: str, usage: Dict[str, Any]) -> None:
+        scene_id = scene.get("scene_id") if isinstance(scene, dict) else None
+        self.usage_log.append({"scene_id": scene_id, "model": model, **usage})
+        logger.info(
+            f"컷 분할 토큰 사용량(scene_id={scene_id}): prompt={usage['prompt_tokens']}, "
+            f"cached={usage['cached_tokens']}, completion={usage['completion_tokens']}"
+        )
+
+    def _build_messages(self, scene: Dict, entity_list: list, story_text: str) -> List[Dict[str, str]]:
+        if self.prompt_layout == "prefix":
+            return [
+                {"role": "system", "content": self._stable_prefix(entity_list, story_text)},
+                {"role": "user", "content": f"씬 정보:\n{json.dumps(scene, ensure_ascii=False, indent=2)}"},
+            ]
+        return [{"role": "user", "content": self._build_prompt(scene, entity_list, story_text)}]
+
+    def _stable_prefix(self, entity_list: list, story_text: str) -> str:
+        # 같은 스토리/구성요소라면 씬이 달라도 바이트 단위로 동일한 접두부를 재사용
+        source = self._prefix_source
+        if source is not None and source[1] == story_text and source[0] == list(entity_list):
+            return self._prefix_text
+
+        entity_lines = "\n".join(json.dumps(list(e), ensure_ascii=False) for e in entity_list)
+        self._prefix_text = f"""다음에 주어지는 씬 정보를 컷 단위로 나누어 주세요. 각 컷은 반드시 아래 형식으로 출력해주세요. 하나의 씬당 컷은 최대 3~5개 이하로 해주세요. description에는 컷 내용으로 이미지를 생성할 수 있는 프롬프트를 자세하게 영어로 묘사해주세요.
+하나의 구성요소는 [type, name, attribute, img_path] 형식으로 한 줄에 하나씩 주어집니다. character, location, object에는 알맞는 구성요소의 "name" 문자열만 그대로 리스트형태로 들어가야 합니다.
+character, location, object에 알맞는 구성요소를 찾을 때 전체 스토리와 씬 정보를 참고하여 매칭해주세요. 구성 요소는 여러개가 매칭될 수도 있고 없을 수도 있습니다.
+
+형식(JSON):
+[
+  {{
+    "cut_id": 1,
+    "description": "...",
+    "character": [...],
+    "location": [...],
+    "object": [...]
+  }},
+  ...
+]
+
+전체 스토리:
+```{story_text}```
+
+구성요소:
+{entity_lines}
+"""
+        self._prefix_source = (list(entity_list), story_text)
+        return self._prefix_text
+
+    @staticmethod
+    def _build_prompt(scene: Dict, entity_list: list, story_text: str) -> str:
+        return f"""
 다음 씬 정보를 컷 단위로 나누어 주세요. 각 컷은 반드시 아래 형식으로 출력해주세요. 하나의 씬당 컷은 최대 3~5개 이하로 해주세요. description에는 컷 내용으로 이미지를 생성할 수 있는 프롬프트를 자세하게 영어로 묘사해주세요.
 하나의 구성요소는 (type, name, attribute, img_path)가 튜플 형식으로 구성되어 있습니다. character, location, object에는 알맞는 구성요소의 "name" 문자열만 그대로 리스트형태로 들어가야 합니다.
 character, location, object에 알맞는 구성요소를 찾을 때 전체 스토리와 씬 정보를 참고하여 매칭해주세요. 구성 요소는 여러개가 매칭될 수도 있고 없을 수도 있습니다.
@@ -38,21 +163,12 @@ character, location, object에 알맞는 구성요소를 찾을 때 전체 스
 씬 정보:
 {json.dumps(scene, ensure_ascii=False, indent=2)}
         """
-        logger.info("컷 분할 프롬프트 전송")
-        response = call_gpt(prompt, model=model)
+
+    @staticmethod
+    def _parse_cuts(response: str) -> List[Dict]:
         try:
-            # 코드 블록 안 JSON 추출 또는 본문에서 첫 JSON 배열 추출
-            match = re.search(r"```json\s*(\[.*?\])\s*```", response, re.DOTALL | re.IGNORECASE)
-            json_str = match.group(1) if match else None
-            if not json_str:
-                match = re.search(r"(\[\s*\{[\s\S]*?\}\s*\])", response)
-                json_str = match.group(1) if match else None
-            if not json_str:
-                # 백업: 문자열 양 끝 기준으로 배열 경계 추정
-                start = response.find("[")
-                end = response.rfind("]")
-                if start != -1 and end != -1 and end > start:
-                    json_str = response[start:end + 1]
+            # 문자열 안의 괄호를 건너뛰는 단일 선형 스캔으로 가장 바깥 배열을 추출
+            json_str = extract_json_array(response)
             if not json_str:
                 raise ValueError("응답에서 JSON 배열을 찾을 수 없습니다.")
             cuts = json.loads(json_str)
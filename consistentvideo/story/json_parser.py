@@ -0,0 +1,202 @@
+import json
+import re
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONArrayParser:
+    """
+    청크 단위로 들어오는 LLM 응답에서 최상위 JSON 배열의 객체 원소를
+    닫는 중괄호가 도착하는 즉시 하나씩 돌려주는 파서.
+
+    ex)
+    parser = IncrementalJSONArrayParser()
+    for chunk in stream:
+        for obj in parser.feed(chunk):
+            ...
+    """
+
+    def __init__(self):
+        self._state = "search"  # search -> open -> array -> done
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buffer: List[str] = []
+        self.count = 0
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        completed: List[Dict[str, Any]] = []
+        for ch in chunk or "":
+            if self._state == "done":
+                break
+
+            if self._state == "search":
+                # 배열 시작 후보 '[' 탐색 (코드블록 표시나 설명 문장은 건너뜀)
+                if ch == "[":
+                    self._state = "open"
+                continue
+
+            if self._state == "open":
+                # '[' 다음 첫 비공백 문자가 '{'일 때만 객체 배열로 인정
+                if ch.isspace():
+                    continue
+                if ch == "{":
+                    self._state = "array"
+                    self._begin_object()
+                elif ch == "[":
+                    pass
+                else:
+                    self._state = "search"
+                continue
+
+            # self._state == "array"
+            if self._depth == 0:
+                if ch == "{":
+                    self._begin_object()
+                elif ch == "]":
+                    self._state = "done"
+                continue
+
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(self._finish_object())
+        return completed
+
+    def _begin_object(self) -> None:
+        self._buffer = ["{"]
+        self._depth = 1
+        self._in_string = False
+        self._escape = False
+
+    def _finish_object(self) -> Dict[str, Any]:
+        text = "".join(self._buffer)
+        self._buffer = []
+        try:
+            obj = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.error(f"스트리밍 JSON 원소 파싱 실패: {e}")
+            raise ValueError(f"스트리밍 응답의 JSON 원소를 파싱할 수 없습니다: {e}")
+        self.count += 1
+        return obj
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    n = len(text)
+    while pos < n and text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+
+
+def _find_array_end(text: str, start: int) -> int:
+    """text[start] == '['인 배열의 닫는 ']' 위치. 닫히지 않으면 -1."""
+    depth = 0
+    pos = start
+    search = _STRUCTURAL.search
+    while True:
+        match = search(text, pos)
+        if match is None:
+            return -1
+        ch = match.group()
+        pos = match.end()
+        if ch == '"':
+            # 닫는 따옴표까지 건너뜀 (앞의 역슬래시가 홀수 개면 이스케이프된 따옴표)
+            while True:
+                quote = text.find('"', pos)
+                if quote == -1:
+                    return -1
+                back = quote - 1
+                while back >= pos and text[back] == "\\":
+                    back -= 1
+                pos = quote + 1
+                if (quote - 1 - back) % 2 == 0:
+                    break
+        elif ch == "[" or ch == "{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+
+
+_FENCED_JSON = re.compile(r"```json\s*", re.IGNORECASE)
+
+
+def _fenced_candidates(text: str):
+    # ```json 코드 블록 안의 배열 시작 위치 (증가 순)
+    for match in _FENCED_JSON.finditer(text):
+        if text.startswith("[", match.end()):
+            yield match.end()
+
+
+def _body_candidates(text: str):
+    # 본문에 나오는 `[{` 시작 위치 (증가 순)
+    pos = 0
+    while True:
+        start = text.find("[", pos)
+        if start == -1:
+            return
+        body = _skip_whitespace(text, start + 1)
+        if body < len(text) and text[body] == "{":
+            yield start
+        pos = start + 1
+
+
+def extract_json_array(text: str) -> Optional[str]:
+    """
+    응답 텍스트에서 객체 배열(`[{ ... }]`)의 가장 바깥 범위를 찾는다. 문자열 안의 괄호는 무시한다.
+    ```json 코드 블록을 먼저 보고, 후보를 순서대로 json.loads로 확인해 처음 파싱되는 배열을 반환한다.
+    파싱되는 후보가 없으면 처음 닫힌 후보를(호출부에서 파싱 오류로 보고), 배열이 끝나지 않은(잘린) 응답이면 None.
+    """
+    first = None
+    fenced_rejected = []  # 파싱에 실패한 코드 블록 후보 범위 (시작 위치 증가 순)
+    for phase, candidates in enumerate((_fenced_candidates(text), _body_candidates(text))):
+        # 후보는 단계마다 증가 순으로 나오므로, 파싱에 실패한 후보 안쪽의 배열은 끝 위치 하나로 건너뜀
+        skip_until = -1
+        rejected_index = 0
+        for start in candidates:
+            if start <= skip_until:
+                continue
+            if phase == 1:
+                # 본문 후보 중 이미 실패한 코드 블록 후보 안쪽에 있는 것도 건너뜀
+                while rejected_index < len(fenced_rejected) and fenced_rejected[rejected_index][1] < start:
+                    rejected_index += 1
+                if rejected_index < len(fenced_rejected) and fenced_rejected[rejected_index][0] <= start:
+                    continue
+            end = _find_array_end(text, start)
+            if end == -1:
+                return first
+            candidate = text[start:end + 1]
+            try:
+                json.loads(candidate)
+                return candidate
+            except json.JSONDecodeError:
+                if first is None:
+                    first = candidate
+                skip_until = end
+                if phase == 0:
+                    fenced_rejected.append((start, end))
+    return first
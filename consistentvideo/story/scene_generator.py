@@ -1,7 +1,7 @@
 import json
-import re
-from typing import List, Dict
-from .call_gpt import call_gpt
+from typing import List, Dict, Iterator
+from .call_gpt import call_gpt, acall_gpt, call_gpt_stream
+from .json_parser import IncrementalJSONArrayParser, extract_json_array
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,8 +11,44 @@ class SceneGenerator:
     def __init__(self):
         pass
 
-    def generate_scenes(self, synopsis: str, *, model: str = "gpt-4.1") -> List[Dict]:
-        prompt = f"""
+    def generate_scenes(self, synopsis: str, *, model: str = "gpt-4.1", use_cache: bool = True, stream: bool = False) -> List[Dict]:
+        if stream:
+            return list(self.iter_scenes(synopsis, model=model, use_cache=use_cache))
+        prompt = self._build_prompt(synopsis)
+        logger.info("씬 생성 프롬프트 전송")
+        response = call_gpt(prompt, model=model, use_cache=use_cache)
+        return self._parse_scenes(response)
+
+    def iter_scenes(self, synopsis: str, *, model: str = "gpt-4.1", use_cache: bool = True) -> Iterator[Dict]:
+        """
+        응답을 스트리밍으로 받으며 씬 객체가 완성되는 즉시 하나씩 돌려준다.
+        후속 컷 분할을 첫 씬부터 바로 시작할 수 있다.
+        """
+        prompt = self._build_prompt(synopsis)
+        logger.info("씬 생성 프롬프트 전송 (stream)")
+        parser = IncrementalJSONArrayParser()
+        chunks = []
+        for chunk in call_gpt_stream(prompt, model=model, use_cache=use_cache):
+            chunks.append(chunk)
+            for scene in parser.feed(chunk):
+                logger.debug(f"씬 수신: {scene.get('scene_id') if isinstance(scene, dict) else scene}")
+                yield scene
+
+        if parser.count == 0:
+            # 객체 배열 형태로 스트리밍되지 않은 응답은 전체 파싱으로 폴백
+            yield from self._parse_scenes("".join(chunks))
+        else:
+            logger.info(f"씬 생성 결과 수신 (stream): {parser.count}개")
+
+    async def agenerate_scenes(self, synopsis: str, *, model: str = "gpt-4.1", use_cache: bool = True) -> List[Dict]:
+        prompt = self._build_prompt(synopsis)
+        logger.info("씬 생성 프롬프트 전송 (async)")
+        response = await acall_gpt(prompt, model=model, use_cache=use_cache)
+        return self._parse_scenes(response)
+
+    @staticmethod
+    def _build_prompt(synopsis: str) -> str:
+        return f"""
 다음 시놉시스를 바탕으로 씬 단위로 나누어 주세요.
 각 씬은 다음 형식의 JSON으로 구성해 주세요:
 [
@@ -27,20 +63,11 @@ class SceneGenerator:
 시놉시스:
 {synopsis}
         """
-        logger.info("씬 생성 프롬프트 전송")
-        response = call_gpt(prompt, model=model)
 
-        # JSON 추출 강화: 코드블록 우선, 그 다음 일반 배열
-        match = re.search(r"```json\s*(\[.*?\])\s*```", response, re.DOTALL | re.IGNORECASE)
-        json_str = match.group(1) if match else None
-        if not json_str:
-            match = re.search(r"(\[\s*\{[\s\S]*?\}\s*\])", response)
-            json_str = match.group(1) if match else None
-        if not json_str:
-            start = response.find("[")
-            end = response.rfind("]")
-            if start != -1 and end != -1 and end > start:
-                json_str = response[start:end + 1]
+    @staticmethod
+    def _parse_scenes(response: str) -> List[Dict]:
+        # 문자열 안의 괄호를 건너뛰는 단일 선형 스캔으로 가장 바깥 배열을 추출
+        json_str = extract_json_array(response)
         if not json_str:
             logger.error("GPT 응답에 JSON 배열이 없습니다.")
             raise ValueError("GPT 응답에 JSON 배열이 없습니다.")
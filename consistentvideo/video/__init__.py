@@ -1,2 +1,4 @@
 from .cut_image_generator import CutImageGenerator
 from .video_generator import VideoGenerator
+from .entity_catalog import EntityCatalog
+from .render_ledger import RenderJobLedger, get_render_ledger
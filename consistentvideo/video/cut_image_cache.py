@@ -0,0 +1,73 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+from consistentvideo.storage import get_artifact_store
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".cut_fingerprints.json"
+
+# 같은 출력 디렉터리를 쓰는 컷 생성기들이 동시에 매니페스트를 갱신하므로 경로별로 잠금을 공유
+_manifest_locks: Dict[str, threading.Lock] = {}
+_manifest_locks_guard = threading.Lock()
+
+
+def _manifest_lock(path: str) -> threading.Lock:
+    with _manifest_locks_guard:
+        return _manifest_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def cut_fingerprint(fields: Dict[str, Any], reference_digests: Optional[List[str]] = None) -> str:
+    """컷 이미지 생성 입력(프롬프트, 모델 파라미터, 참조 이미지 해시)으로 만든 SHA-256 키."""
+    payload = dict(fields)
+    payload["reference_images"] = list(reference_digests or [])
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CutImageCache:
+    """
+    컷 이미지 디렉터리의 `.cut_fingerprints.json`에 (컷 이름 -> fingerprint, 파일명, 내용 해시)를 기록한다.
+    증분 모드에서 fingerprint가 같고 파일이 그대로면 프로바이더 호출 없이 기존 컷 이미지를 돌려준다.
+    """
+
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self.path = os.path.join(output_path, MANIFEST_NAME)
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"컷 이미지 fingerprint 매니페스트를 읽을 수 없어 무시합니다: {e}")
+            return {}
+
+    def get(self, cut_name: str, key: str) -> Optional[str]:
+        with _manifest_lock(self.path):
+            entry = self._load().get(cut_name)
+        if not entry or entry.get("fingerprint") != key:
+            return None
+        filename = entry.get("filename")
+        if not filename or not os.path.exists(os.path.join(self.output_path, filename)):
+            return None
+        # 다른 경로(단일 컷 재생성 등)로 파일이 바뀌었으면 기록을 신뢰하지 않는다
+        digest = entry.get("digest")
+        if digest and get_artifact_store(self.output_path).digest_of(filename) not in (None, digest):
+            return None
+        return filename
+
+    def put(self, cut_name: str, key: str, filename: str) -> None:
+        digest = get_artifact_store(self.output_path).digest_of(filename)
+        with _manifest_lock(self.path):
+            manifest = self._load()
+            manifest[cut_name] = {"fingerprint": key, "filename": filename, "digest": digest}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
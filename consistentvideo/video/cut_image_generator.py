@@ -1,6 +1,10 @@
 from io import BytesIO
 from .base import CutImageGeneratorBase
 from .model_selector import CutImageGeneratorModelSelector
+from .entity_catalog import EntityCatalog
+from .cut_image_cache import CutImageCache, cut_fingerprint
+from consistentvideo.storage import get_artifact_store
+from consistentvideo.storage.derivatives import schedule_derivatives
 from dotenv import load_dotenv
 import os
 import logging
@@ -10,7 +14,8 @@ logger = logging.getLogger(__name__)
 
 class CutImageGenerator(CutImageGeneratorBase):
     def __init__(self, scene_num: int, cut: dict, output_path: str, entity_image_path: str,
-                 entity: list = None, ai_model: str = 'gpt-image-1', *, style: str = 'realistic', quality: str = 'low', size: str = '1536x1024'):
+                 entity: list = None, ai_model: str = 'gpt-image-1', *, style: str = 'realistic', quality: str = 'low', size: str = '1536x1024',
+                 catalog: EntityCatalog = None, incremental: bool = False):
         '''
         ex)
         cut = {'cut_id': 1, 'description': '버스 정류장에서 버스가 도착하는 장면.', 'characters': [], 'background': '조용한 아침 거리와 버스 정류장.', 'objects': ['버스', '버스 정류장']}
@@ -19,6 +24,8 @@ class CutImageGenerator(CutImageGeneratorBase):
         ('character', '미상(버스기사)', '{"연령대": "40~50대", "인종": "동아시아(한국인)", "성별": "남성", "헤어 스타일": "짧은 머리", "헤어 컬러": "검정 또는 흑갈색", "신장": "175cm(추정)", "체중": "75kg(추정)", "체형": "보통", "패션 스타일": "버스기사 유니폼", "추가 특징": "인내심 많으나 점점 짜증남, 유머러스함, 승객과 직접 대화"}', '미상_버스기사__front.png'), 
         ...
         ]
+        catalog: 여러 컷을 생성할 때 공유하는 EntityCatalog (없으면 entity로 새로 만든다)
+        incremental: True면 입력 fingerprint가 지난 생성과 같은 컷은 다시 만들지 않고 기존 이미지를 반환
         '''
         super().__init__(entity)
         self.scene_num = scene_num
@@ -31,6 +38,9 @@ class CutImageGenerator(CutImageGeneratorBase):
         self.quality = quality
         self.size = size
         self.cut_image_type_prompt = ""  # 스타일 프리셋으로 대체
+        self.catalog = catalog
+        self.incremental = incremental
+        self.reused = False  # 증분 모드에서 기존 이미지를 재사용했는지
 
     def execute(self):
         if not self.cut:
@@ -44,29 +54,11 @@ class CutImageGenerator(CutImageGeneratorBase):
         cut_description = self.cut.get('description', '')
         cut_id = self.cut.get("cut_id", 9999)
 
-        # Get entities that will be used
-        prompt_entity_parts = []
-        image_paths = []
-
-        if self.entity:
-            for e_type, name, attrs, image_filename in self.entity:
-                if (
-                    (e_type == "character" and name in self.cut.get("character", [])) or
-                    (e_type == "object" and name in self.cut.get("object", [])) or
-                    (e_type == "location" and name == self.cut.get("location", ""))
-                ):
-                    desc = f"['{e_type}': '{name}', 'attribute': {attrs}]"
-                    prompt_entity_parts.append(desc)
-                    logger.debug(f"Entity prompt part: {desc}")
-                    # 이미지 파일이 없거나(None) 경로가 존재하지 않으면 스킵
-                    if image_filename:
-                        image_path = os.path.join(self.entity_image_path, image_filename)
-                        if os.path.exists(image_path):
-                            image_paths.append(image_path)
-                        else:
-                            logger.warning(f"엔티티 이미지가 존재하지 않아 스킵합니다: {image_path}")
-                    else:
-                        logger.warning(f"엔티티에 이미지 파일명이 없어 스킵합니다: {name}")
+        # Get entities that will be used (카탈로그에서 이름으로 바로 조회)
+        if self.catalog is None:
+            self.catalog = EntityCatalog(self.entity, self.entity_image_path)
+        prompt_entity_parts, image_paths = self.catalog.resolve_cut(self.cut)
+        logger.debug(f"Entity prompt parts: {prompt_entity_parts}")
 
         # Input prompt composing
         entity_prompt = " ".join(prompt_entity_parts)
@@ -93,7 +85,28 @@ class CutImageGenerator(CutImageGeneratorBase):
             f"Style: {style_desc}"
         )
 
-        logger.info(f"컷 이미지 생성 시작: S{self.scene_num:04d}-C{cut_id:04d}.png")
+        # 생성 입력 fingerprint (프롬프트에 컷 설명/엔티티 속성/스타일이 모두 들어 있음)
+        cut_name = f"S{self.scene_num:04d}-C{cut_id:04d}"
+        cut_cache = CutImageCache(self.output_path)
+        cache_key = cut_fingerprint(
+            {
+                "prompt": self.prompt,
+                "style": self.style,
+                "model": self.ai_model,
+                "quality": self.quality,
+                "size": self.size,
+            },
+            [self.catalog.image_digest(p) for p in image_paths],
+        )
+        if self.incremental:
+            cached = cut_cache.get(cut_name, cache_key)
+            if cached:
+                self.reused = True
+                save_path = os.path.join(self.output_path, cached)
+                logger.info(f"입력이 바뀌지 않아 컷 이미지를 재사용합니다: {save_path}")
+                return save_path
+
+        logger.info(f"컷 이미지 생성 시작: {cut_name}.png")
         logger.debug(f"참조 이미지 경로: {image_paths}")
         
         image_generator_model = CutImageGeneratorModelSelector().call_CutImageGenerator_ai(
@@ -117,12 +130,16 @@ class CutImageGenerator(CutImageGeneratorBase):
             logger.error(f"컷 이미지 생성 중 오류: {e}")
             raise
 
-        # Save
-        filename = f"S{self.scene_num:04d}-C{cut_id:04d}.png"
+        # Save (같은 컷 이름은 최신 버전으로 원자적 교체, 이전 버전은 저장소 매니페스트에 남음)
+        # GeneratedImage가 이미 PNG면 프로바이더 바이트를 그대로 기록
+        filename = get_artifact_store(self.output_path).put_stream(
+            cut_name, lambda f: cut_image.save(f, "PNG"), ext=".png"
+        )
+        cut_cache.put(cut_name, cache_key, filename)
         save_path = os.path.join(self.output_path, filename)
-        os.makedirs(self.output_path, exist_ok=True)
-        cut_image.save(save_path)
         logger.info(f"컷 이미지 저장 완료: {save_path}")
+        # 스토리보드용 썸네일/미리보기는 백그라운드에서 미리 생성
+        schedule_derivatives(save_path)
 
         return save_path
 
@@ -0,0 +1,132 @@
+import os
+import re
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from consistentvideo.reference.synopsis_parser import normalize_entity_name
+from consistentvideo.reference.image_cache import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# 컷 정보에서 엔티티 타입별로 이름을 담는 키
+CUT_ENTITY_KEYS = {"character": "character", "object": "object", "location": "location"}
+
+_PAREN_RE = re.compile(r"^(?P<outer>[^()]*)\((?P<inner>[^()]+)\)\s*$")
+
+
+class EntityEntry:
+    """카탈로그 항목: 엔티티 한 개의 프롬프트 조각과 확인된 참조 이미지 경로."""
+
+    __slots__ = ("index", "type", "name", "attrs", "image_filename", "image_path", "fragment")
+
+    def __init__(self, index: int, e_type: str, name: str, attrs, image_filename: Optional[str], image_path: Optional[str]):
+        self.index = index
+        self.type = e_type
+        self.name = name
+        self.attrs = attrs
+        self.image_filename = image_filename
+        self.image_path = image_path
+        self.fragment = f"['{e_type}': '{name}', 'attribute': {attrs}]"
+
+
+class EntityCatalog:
+    """
+    프로젝트의 엔티티 목록을 한 번만 색인해 모든 컷 생성기가 공유하는 카탈로그.
+    (타입, 이름) 조회는 dict로 O(1)이며, 공백/구두점/대소문자 차이와 '미상(할아버지)'의 괄호 안/밖 별칭도 찾는다.
+    프롬프트 조각과 참조 이미지 존재 여부는 생성 시 한 번만 계산한다.
+
+    ex)
+    catalog = EntityCatalog(entity_list, entity_image_dir)
+    parts, image_paths = catalog.resolve_cut(cut)
+    """
+
+    def __init__(self, entity: Optional[list], entity_image_path: Optional[str]):
+        self.entity_image_path = entity_image_path
+        self._entries: List[EntityEntry] = []
+        self._by_name: Dict[Tuple[str, str], EntityEntry] = {}
+        self._by_key: Dict[Tuple[str, str], EntityEntry] = {}
+        aliases: Dict[Tuple[str, str], List[EntityEntry]] = {}
+        # 참조 이미지 내용 해시 (컷 fingerprint용, 이미지마다 한 번만 계산)
+        self._image_digests: Dict[str, str] = {}
+        self._digest_lock = threading.Lock()
+
+        for index, item in enumerate(entity or []):
+            try:
+                e_type, name, attrs, image_filename = item
+            except (TypeError, ValueError):
+                logger.warning(f"엔티티 형식이 올바르지 않아 스킵합니다: {item}")
+                continue
+            entry = EntityEntry(index, e_type, name, attrs, image_filename, self._resolve_image(name, image_filename))
+            self._entries.append(entry)
+            # 같은 이름이 여러 번 나오면 기존 동작처럼 처음 항목을 우선
+            self._by_name.setdefault((e_type, name), entry)
+            self._by_key.setdefault((e_type, normalize_entity_name(name)), entry)
+            for alias in self._aliases(name):
+                aliases.setdefault((e_type, alias), []).append(entry)
+
+        # 두 엔티티가 같은 별칭을 가지면 잘못 매칭될 수 있으므로 유일한 별칭만 등록
+        for key, entries in aliases.items():
+            if len(entries) == 1 and key not in self._by_key:
+                self._by_key[key] = entries[0]
+
+    def _resolve_image(self, name: str, image_filename: Optional[str]) -> Optional[str]:
+        if not image_filename:
+            logger.warning(f"엔티티에 이미지 파일명이 없어 스킵합니다: {name}")
+            return None
+        image_path = os.path.join(self.entity_image_path or "", image_filename)
+        if not os.path.exists(image_path):
+            logger.warning(f"엔티티 이미지가 존재하지 않아 스킵합니다: {image_path}")
+            return None
+        return image_path
+
+    @staticmethod
+    def _aliases(name: str) -> List[str]:
+        match = _PAREN_RE.match(name or "")
+        if not match:
+            return []
+        return [alias for alias in (normalize_entity_name(match.group("outer")), normalize_entity_name(match.group("inner"))) if alias]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def entries(self) -> List[EntityEntry]:
+        return list(self._entries)
+
+    def lookup(self, e_type: str, name: str) -> Optional[EntityEntry]:
+        if not isinstance(name, str) or not name:
+            return None
+        entry = self._by_name.get((e_type, name))
+        if entry is None:
+            entry = self._by_key.get((e_type, normalize_entity_name(name)))
+        return entry
+
+    def match_cut(self, cut: dict) -> List[EntityEntry]:
+        """컷에 등장하는 엔티티를 엔티티 목록 순서대로 반환한다 (중복 제거)."""
+        matched: Dict[int, EntityEntry] = {}
+        for e_type, key in CUT_ENTITY_KEYS.items():
+            names = cut.get(key) or []
+            # location은 문자열 하나 또는 목록으로 올 수 있다
+            if isinstance(names, str):
+                names = [names]
+            for name in names:
+                entry = self.lookup(e_type, name)
+                if entry is not None:
+                    matched[entry.index] = entry
+        return [matched[index] for index in sorted(matched)]
+
+    def resolve_cut(self, cut: dict) -> Tuple[List[str], List[str]]:
+        """(프롬프트 조각 목록, 존재하는 참조 이미지 경로 목록). 같은 이미지는 한 번만 넣는다."""
+        entries = self.match_cut(cut)
+        image_paths = list(dict.fromkeys(entry.image_path for entry in entries if entry.image_path))
+        return [entry.fragment for entry in entries], image_paths
+
+    def image_digest(self, image_path: str) -> str:
+        with self._digest_lock:
+            digest = self._image_digests.get(image_path)
+        if digest is None:
+            digest = file_sha256(image_path)
+            with self._digest_lock:
+                self._image_digests[image_path] = digest
+        return digest
@@ -1,12 +1,7 @@
 from .base import ImageGeneratorAIBase, VideoGeneratorAIBase
 import os
-from openai import OpenAI
 import base64
-import requests
 from PIL import Image
-from io import BytesIO
-from runwayml import RunwayML
-import time
 import re
 import logging
 from google import genai
@@ -14,8 +9,23 @@ from mimetypes import guess_type
 import tempfile
 from google.genai import types as genai_types
 from pathlib import Path
-import sys
-import time
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from consistentvideo.aimodel.governor import get_governor
+from consistentvideo.aimodel.job_poller import get_job_poller
+from consistentvideo.storage.image_io import GeneratedImage
+from consistentvideo.storage.image_prep import prepare_reference_image
+from consistentvideo.reference.image_cache import fingerprint
+from consistentvideo.storage.download import PART_SUFFIX, download_chunk_size, download_to_file, write_chunks_to_file
+from consistentvideo.aimodel.upload_cache import call_with_upload_retry, gemini_image_part, runway_image_uri
+from consistentvideo.aimodel.clients import (
+    get_openai_client,
+    get_genai_client,
+    get_runway_client,
+    get_http_session,
+    http_timeout,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -61,8 +71,7 @@ class ImageGeneratorModelGemini(ImageGeneratorAIBase):
         ai_model="gemini-2.5-flash-image",
     ):
         super().__init__()
-        api_key = os.getenv("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_genai_client()
         self.prompt_text = prompt_text
         self.prompt_images = prompt_images
         self.aspect_ratio = aspect_ratio
@@ -72,7 +81,7 @@ class ImageGeneratorModelGemini(ImageGeneratorAIBase):
         # 참조 이미지가 있는 경우와 없는 경우를 분리 처리
         if self.prompt_images:
             # 참조 이미지가 있는 경우: PIL Image 객체 + 텍스트 프롬프트
-            contents = []
+            prepared_paths = []
 
             for img_path in self.prompt_images:
                 if not os.path.exists(img_path):
@@ -80,34 +89,39 @@ class ImageGeneratorModelGemini(ImageGeneratorAIBase):
                         f"참조 이미지가 존재하지 않아 스킵합니다: {img_path}"
                     )
                     continue
-
-                # PIL Image 객체로 직접 로드
-                pil_image = Image.open(img_path)
-                contents.append(pil_image)
-
-            # 텍스트 프롬프트 추가
-            contents.append(self.prompt_text)
-
-            response = self.client.models.generate_content(
-                model=self.ai_model,
-                contents=contents,
-                config=genai_types.GenerateContentConfig(
-                    image_config=genai_types.ImageConfig(
-                        aspect_ratio=self.aspect_ratio,
+                prepared_paths.append(prepare_reference_image(img_path, "gemini"))
+
+            def build_contents():
+                # 업로드된 파일 URI로 참조하고, 업로드할 수 없으면 PIL Image로 인라인 전송 + 텍스트 프롬프트
+                parts = [gemini_image_part(path) or Image.open(path) for path in prepared_paths]
+                return parts + [self.prompt_text]
+
+            def generate(contents):
+                with get_governor("gemini").slot():
+                    return self.client.models.generate_content(
+                        model=self.ai_model,
+                        contents=contents,
+                        config=genai_types.GenerateContentConfig(
+                            image_config=genai_types.ImageConfig(
+                                aspect_ratio=self.aspect_ratio,
+                            )
+                        ),
                     )
-                ),
-            )
+
+            # 업로드 URI가 거부되면(프로바이더에서 먼저 삭제됨 등) 다시 업로드해 한 번 재시도
+            response = call_with_upload_retry("gemini", prepared_paths, build_contents, generate)
         else:
             # 참조 이미지가 없는 경우: 텍스트만
-            response = self.client.models.generate_content(
-                model=self.ai_model,
-                contents=[self.prompt_text],
-                config=genai_types.GenerateContentConfig(
-                    image_config=genai_types.ImageConfig(
-                        aspect_ratio=self.aspect_ratio,
-                    )
-                ),
-            )
+            with get_governor("gemini").slot():
+                response = self.client.models.generate_content(
+                    model=self.ai_model,
+                    contents=[self.prompt_text],
+                    config=genai_types.GenerateContentConfig(
+                        image_config=genai_types.ImageConfig(
+                            aspect_ratio=self.aspect_ratio,
+                        )
+                    ),
+                )
 
         image_parts = [
             part.inline_data.data
@@ -116,7 +130,8 @@ class ImageGeneratorModelGemini(ImageGeneratorAIBase):
         ]
 
         if image_parts:
-            cut_image = Image.open(BytesIO(image_parts[0]))
+            # 인코딩된 바이트를 그대로 보관 (저장 시 형식이 같으면 재인코딩 없음)
+            cut_image = GeneratedImage(image_parts[0])
         # -----------------------------------------------------
 
         return cut_image
@@ -125,8 +140,7 @@ class ImageGeneratorModelGemini(ImageGeneratorAIBase):
 class ImageGeneratorModelDalle3(ImageGeneratorAIBase):
     def __init__(self, prompt_text: str = None, prompt_images: list = None):
         super().__init__()
-        api_key = os.getenv("OPENAI_API_KEY")
-        self.ai_model = OpenAI(api_key=api_key)
+        self.ai_model = get_openai_client()
         self.prompt_text = prompt_text
         self.prompt_images = prompt_images
 
@@ -141,12 +155,13 @@ class ImageGeneratorModelDalle3(ImageGeneratorAIBase):
 
         # ---------------dalle3 (can also dalle2)--------------
 
-        result = self.ai_model.images.generate(
-            model="dall-e-3", prompt=self.prompt_text, size="1792x1024"
-        )
-        image_url = result.data[0].url
-        image_bytes = requests.get(image_url).content
-        cut_image = Image.open(BytesIO(image_bytes))
+        with get_governor("openai_image").slot():
+            result = self.ai_model.images.generate(
+                model="dall-e-3", prompt=self.prompt_text, size="1792x1024"
+            )
+            image_url = result.data[0].url
+            image_bytes = get_http_session().get(image_url, timeout=http_timeout()).content
+        cut_image = GeneratedImage(image_bytes)
 
         # -----------------------------------------------------
 
@@ -163,8 +178,7 @@ class ImageGeneratorModelGPT_image_1(ImageGeneratorAIBase):
         size: str = "1536x1024",
     ):
         super().__init__()
-        api_key = os.getenv("OPENAI_API_KEY")
-        self.ai_model = OpenAI(api_key=api_key)
+        self.ai_model = get_openai_client()
         self.prompt_text = prompt_text
         self.prompt_images = prompt_images
         self.quality = quality
@@ -181,24 +195,26 @@ class ImageGeneratorModelGPT_image_1(ImageGeneratorAIBase):
                             f"참조 이미지가 존재하지 않아 스킵합니다: {img_path}"
                         )
                         continue
-                    image_file_handles.append(open(img_path, "rb"))
-
-            if image_file_handles:
-                # 여러 장의 참조 이미지를 모두 전달
-                result = self.ai_model.images.edit(
-                    model="gpt-image-1",
-                    image=image_file_handles,
-                    prompt=self.prompt_text,
-                    quality=self.quality,  # high/medium/low
-                    size=self.size,  # e.g., 1536x1024
-                )
-            else:
-                result = self.ai_model.images.generate(
-                    model="gpt-image-1",
-                    prompt=self.prompt_text,
-                    quality=self.quality,  # high/medium/low
-                    size=self.size,  # e.g., 1536x1024
-                )
+                    # 축소/정규화된 캐시 사본을 업로드
+                    image_file_handles.append(open(prepare_reference_image(img_path, "openai_edit"), "rb"))
+
+            with get_governor("openai_image").slot():
+                if image_file_handles:
+                    # 여러 장의 참조 이미지를 모두 전달
+                    result = self.ai_model.images.edit(
+                        model="gpt-image-1",
+                        image=image_file_handles,
+                        prompt=self.prompt_text,
+                        quality=self.quality,  # high/medium/low
+                        size=self.size,  # e.g., 1536x1024
+                    )
+                else:
+                    result = self.ai_model.images.generate(
+                        model="gpt-image-1",
+                        prompt=self.prompt_text,
+                        quality=self.quality,  # high/medium/low
+                        size=self.size,  # e.g., 1536x1024
+                    )
         finally:
             for f in image_file_handles:
                 try:
@@ -206,9 +222,8 @@ class ImageGeneratorModelGPT_image_1(ImageGeneratorAIBase):
                 except Exception:
                     pass
 
-        image_base64 = result.data[0].b64_json
-        image_bytes = base64.b64decode(image_base64)
-        cut_image = Image.open(BytesIO(image_bytes))
+        # base64는 저장 시점에 스트리밍 디코딩
+        cut_image = GeneratedImage.from_base64(result.data[0].b64_json)
         # -----------------------------------------------------
 
         return cut_image
@@ -240,15 +255,86 @@ class VideoGeneratorModelSelector:
             return None
 
 
-class VideoGeneratorModelRunway(VideoGeneratorAIBase):
-    def __init__(self, prompt_text: str = None, prompt_image: str = None):
-        super().__init__()
-        api_key = os.getenv("RUNWAY_API_KEY")
-        self.ai_model = RunwayML(api_key=api_key)
-        self.prompt_text = prompt_text
-        self.prompt_image = prompt_image
+class RenderJob:
+    """프로바이더에 제출한 컷 영상 렌더 작업 (handle: 작업 ID/operation/video 객체)."""
+
+    __slots__ = ("scene_num", "cut_num", "cut_id", "handle")
+
+    def __init__(self, scene_num: int, cut_num: int, cut_id, handle=None):
+        self.scene_num = scene_num
+        self.cut_num = cut_num
+        self.cut_id = cut_id
+        self.handle = handle
+
+
+class VideoRenderJobMixin(metaclass=ABCMeta):
+    """
+    영상 모델 공통 실행 흐름: submit() -> 공용 JobPoller가 check()로 완료 확인 -> fetch() / fetch_to().
+    VideoGenerator의 일괄 제출 모드는 여러 컷의 submit/fetch_to를 직접 나눠 호출한다.
+    """
+
+    provider = None  # get_governor 키
 
     def execute(self):
+        job = self.render()
+        return self.fetch(job) if job is not None else None
+
+    def execute_to(self, dest_path: str, *, submit: Optional[Callable[[], Optional[RenderJob]]] = None) -> Optional[str]:
+        """
+        execute()와 같지만 결과 영상을 메모리에 올리지 않고 dest_path에 바로 기록한다. 성공 시 sha256 반환.
+        submit을 주면 self.submit 대신 사용한다 (렌더 작업 원장에서 기존 작업 이어받기 등).
+        """
+        job = self.render(submit)
+        return self.fetch_to(job, dest_path) if job is not None else None
+
+    def render(self, submit: Optional[Callable[[], Optional[RenderJob]]] = None) -> Optional[RenderJob]:
+        """작업을 제출(또는 submit으로 이어받기)하고 렌더가 끝날 때까지 기다린다. 다운로드는 하지 않는다."""
+        # 렌더 작업 하나가 끝날 때까지 프로바이더 슬롯을 점유 (다운로드는 슬롯 밖에서)
+        with get_governor(self.provider).slot():
+            job = (submit or self.submit)()
+            if job is None:
+                return None
+            self.track(job).result()
+        return job
+
+    def render_params(self) -> Dict[str, Any]:
+        """결과에 영향을 주는 모델별 파라미터 (job_fingerprint에 포함)."""
+        return {}
+
+    def job_fingerprint(self) -> str:
+        """같은 입력(모델, 프롬프트, 파라미터, 컷 이미지 내용)이면 같은 값. 렌더 작업 원장의 키로 사용."""
+        fields = {"provider": self.provider, "model": type(self).__name__, "prompt": self.prompt_text}
+        fields.update(self.render_params())
+        return fingerprint(fields, [self.prompt_image])
+
+    def remote_id(self, job: RenderJob) -> Optional[str]:
+        """원장에 기록할 원격 작업 ID. None이면 이어받기를 지원하지 않는다."""
+        return None
+
+    def restore(self, remote_id: str) -> RenderJob:
+        """
+        원장에 기록된 원격 작업 ID로 현재 상태를 조회해 RenderJob을 복원한다 (다시 제출하지 않음).
+        원격 작업이 없으면 프로바이더의 4xx 오류가 그대로 올라간다.
+        """
+        raise NotImplementedError
+
+    def render_error(self, job: RenderJob) -> Optional[str]:
+        """렌더가 끝난 작업을 프로바이더가 실패로 보고했으면 그 사유, 아니면 None."""
+        return None
+
+    def track(self, job: RenderJob):
+        """공용 폴러에 작업을 등록하고 완료 시 끝나는 Future를 반환한다."""
+        return get_job_poller().track(lambda: self.poll(job), name=f"{self.provider}:cut_id={job.cut_id}")
+
+    def poll(self, job: RenderJob) -> Tuple[bool, Optional[float]]:
+        done, _ = self.check(job)
+        return done, self.progress(job)
+
+    def progress(self, job: RenderJob) -> Optional[float]:
+        """프로바이더가 보고한 진행률(0~100). 모르면 None."""
+        return None
+
+    def _render_job(self) -> RenderJob:
         # 파일명에서 S번호와 C번호 추출
         match = re.match(r"S(\d+)-C(\d+)", os.path.basename(self.prompt_image))
         if not match:
@@ -260,48 +346,127 @@ class VideoGeneratorModelRunway(VideoGeneratorAIBase):
 
         logger.info(f"scene_num={scene_num}, cut_num={cut_num}")
         cut = self.cut_list[scene_num - 1][cut_num - 1]
-        cut_id = cut.get("cut_id")
+        return RenderJob(scene_num, cut_num, cut.get("cut_id"))
 
-        with open(self.prompt_image, "rb") as img_file:
-            encoded_image = base64.b64encode(img_file.read()).decode("utf-8")
-
-        logger.info(f"Runway 작업 생성: scene={scene_num}, cut={cut_num}")
-        task = self.ai_model.image_to_video.create(
-            model="gen4_turbo",
-            prompt_image=f"data:image/png;base64,{encoded_image}",
-            prompt_text=self.prompt_text,
-            ratio="1280:720",
-            duration=5,
-        )
-
-        task_id = task.id
-
-        time.sleep(10)
-        task = self.ai_model.tasks.retrieve(task_id)
-        while task.status not in ["SUCCEEDED", "FAILED"]:
-            time.sleep(10)
-            task = self.ai_model.tasks.retrieve(task_id)
-            logger.debug(f"Runway 작업 상태: {task.status}")
+    @abstractmethod
+    def submit(self) -> Optional[RenderJob]:
+        pass
+
+    @abstractmethod
+    def check(self, job: RenderJob) -> Tuple[bool, RenderJob]:
+        pass
+
+    @abstractmethod
+    def fetch_to(self, job: RenderJob, dest_path: str) -> Optional[str]:
+        """완료된 작업의 영상을 청크 단위로 dest_path에 기록하고 sha256을 반환한다 (실패 시 None)."""
+        pass
+
+    def fetch(self, job: RenderJob) -> Optional[bytes]:
+        """완료된 작업의 영상 바이트 (execute()용). fetch_to()로 임시 파일에 받은 뒤 읽는다."""
+        fd, tmp_path = tempfile.mkstemp(suffix=".mp4")
+        os.close(fd)
+        try:
+            if not self.fetch_to(job, tmp_path):
+                return None
+            with open(tmp_path, "rb") as f:
+                return f.read()
+        finally:
+            for path in (tmp_path, tmp_path + PART_SUFFIX):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write_fetched_bytes(self, video_bytes: Optional[bytes], dest_path: str) -> Optional[str]:
+        # SDK가 바이트로만 돌려주는 경우 dest_path에 옮겨 적기
+        if not video_bytes:
+            return None
+        digest, _ = write_chunks_to_file([video_bytes], dest_path)
+        return digest
+
+
+class VideoGeneratorModelRunway(VideoRenderJobMixin, VideoGeneratorAIBase):
+    provider = "runway"
+
+    def __init__(self, prompt_text: str = None, prompt_image: str = None):
+        super().__init__()
+        self.ai_model = get_runway_client()
+        self.prompt_text = prompt_text
+        self.prompt_image = prompt_image
 
+    def submit(self) -> Optional[RenderJob]:
+        job = self._render_job()
+
+        def build_prompt_image() -> str:
+            # 같은 컷 이미지는 업로드 URI를 재사용하고, 업로드할 수 없으면 data URI로 전송
+            prompt_image = runway_image_uri(self.prompt_image)
+            if prompt_image is None:
+                with open(self.prompt_image, "rb") as img_file:
+                    encoded_image = base64.b64encode(img_file.read()).decode("utf-8")
+                prompt_image = f"data:image/png;base64,{encoded_image}"
+            return prompt_image
+
+        def create(prompt_image: str):
+            return self.ai_model.image_to_video.create(
+                model="gen4_turbo",
+                prompt_image=prompt_image,
+                prompt_text=self.prompt_text,
+                ratio="1280:720",
+                duration=5,
+            )
+
+        logger.info(f"Runway 작업 생성: scene={job.scene_num}, cut={job.cut_num}")
+        # 업로드 URI가 거부되면 다시 업로드해 한 번 재시도
+        task = call_with_upload_retry("runway", [self.prompt_image], build_prompt_image, create)
+        job.handle = task.id
+        return job
+
+    def remote_id(self, job: RenderJob) -> Optional[str]:
+        return job.handle if isinstance(job.handle, str) else job.handle.id
+
+    def restore(self, remote_id: str) -> RenderJob:
+        job = self._render_job()
+        job.handle = self.ai_model.tasks.retrieve(remote_id)
+        return job
+
+    def render_error(self, job: RenderJob) -> Optional[str]:
+        task = job.handle
+        if getattr(task, "status", None) == "FAILED":
+            return getattr(task, "failure", None) or "Runway 작업 실패"
+        return None
+
+    def check(self, job: RenderJob) -> Tuple[bool, RenderJob]:
+        task = self.ai_model.tasks.retrieve(job.handle if isinstance(job.handle, str) else job.handle.id)
+        logger.debug(f"Runway 작업 상태: {task.status}")
+        job.handle = task
+        return task.status in ["SUCCEEDED", "FAILED"], job
+
+    def progress(self, job: RenderJob) -> Optional[float]:
+        # Runway task.progress는 0~1
+        value = getattr(job.handle, "progress", None)
+        return value * 100 if isinstance(value, (int, float)) else None
+
+    def fetch_to(self, job: RenderJob, dest_path: str) -> Optional[str]:
+        task = job.handle
         if task.status == "FAILED":
-            logger.error(f"[cut_id={cut_id}] 비디오 생성 실패: {task.status}")
+            logger.error(f"[cut_id={job.cut_id}] 비디오 생성 실패: {task.status}")
             return None
         output_urls = task.output
-
-        if output_urls == None or isinstance(output_urls, list) == False:
-            logger.error(f"[cut_id={cut_id}] 출력 URL이 없습니다")
+        if not output_urls or not isinstance(output_urls, list):
+            logger.error(f"[cut_id={job.cut_id}] 출력 URL이 없습니다")
             return None
-        video_url = output_urls[0]
-        response = requests.get(video_url)
 
-        if response.status_code != 200:
-            logger.error(f"[cut_id={cut_id}] 응답 코드 오류: {response.status_code}")
+        # 연결이 끊기면 받은 부분부터 Range 요청으로 이어 받음
+        try:
+            digest, size = download_to_file(output_urls[0], dest_path)
+        except Exception as e:
+            logger.error(f"[cut_id={job.cut_id}] 비디오 다운로드 실패: {e}")
             return None
+        logger.info(f"[cut_id={job.cut_id}] 비디오 다운로드 완료: {size} bytes")
+        return digest
 
-        return response.content  # Binary type video data
 
+class VideoGeneratorModelVeo3(VideoRenderJobMixin, VideoGeneratorAIBase):
+    provider = "veo"
 
-class VideoGeneratorModelVeo3(VideoGeneratorAIBase):
     def __init__(
         self,
         prompt_text: str = None,
@@ -309,32 +474,20 @@ class VideoGeneratorModelVeo3(VideoGeneratorAIBase):
         ai_model: str = "veo-3.0-fast-generate-preview",
     ):
         super().__init__()
-        api_key = os.getenv("GEMINI_API_KEY")
-        self.client = genai.Client(api_key=api_key)
+        self.client = get_genai_client()
         self.prompt_text = prompt_text
         self.prompt_image = prompt_image
         self.ai_model = ai_model
 
-    def execute(self):
-        # 파일명에서 S번호와 C번호 추출
-        match = re.match(r"S(\d+)-C(\d+)", os.path.basename(self.prompt_image))
-        if not match:
-            raise ValueError(
-                "prompt_image 파일명이 'S####-C####' 형식을 따르지 않습니다."
-            )
-        scene_num = int(match.group(1))  # S번호
-        cut_num = int(match.group(2))  # C번호
-
-        logger.info(f"scene_num={scene_num}, cut_num={cut_num}")
-        cut = self.cut_list[scene_num - 1][cut_num - 1]
-        cut_id = cut.get("cut_id")
+    def submit(self) -> Optional[RenderJob]:
+        job = self._render_job()
 
         # 로컬 이미지 → bytes + mimeType 구성
         with open(self.prompt_image, "rb") as img_file:
             image_bytes = img_file.read()
         mime_type = guess_type(self.prompt_image)[0] or "image/png"
 
-        logger.info(f"Veo 작업 생성: scene={scene_num}, cut={cut_num}")
+        logger.info(f"Veo 작업 생성: scene={job.scene_num}, cut={job.cut_num}")
 
         # Python SDK 전용 Image 타입 구성 (문서: Image object 필요)
         try:
@@ -345,28 +498,55 @@ class VideoGeneratorModelVeo3(VideoGeneratorAIBase):
                 # 2차: genai.types.Image 시도
                 image_obj = genai.types.Image(image_bytes=image_bytes, mime_type=mime_type)  # type: ignore[attr-defined]
             except Exception as e2:
-                logger.error(f"[cut_id={cut_id}] Veo Image 객체 생성 실패: {e1} / {e2}")
+                logger.error(f"[cut_id={job.cut_id}] Veo Image 객체 생성 실패: {e1} / {e2}")
                 return None
 
         try:
-            operation = self.client.models.generate_videos(
+            job.handle = self.client.models.generate_videos(
                 model=self.ai_model,
                 prompt=self.prompt_text,
                 image=image_obj,
             )
         except Exception as e:
-            logger.error(f"[cut_id={cut_id}] Veo 작업 생성 실패: {e}")
+            logger.error(f"[cut_id={job.cut_id}] Veo 작업 생성 실패: {e}")
             return None
-
+        return job
+
+    def render_params(self) -> Dict[str, Any]:
+        return {"ai_model": self.ai_model}
+
+    def remote_id(self, job: RenderJob) -> Optional[str]:
+        return getattr(job.handle, "name", None)
+
+    def restore(self, remote_id: str) -> RenderJob:
+        job = self._render_job()
+        # 이름으로 operation의 최신 상태를 조회 (만료/삭제되었으면 4xx)
+        job.handle = self.client.operations.get(genai_types.GenerateVideosOperation(name=remote_id))
+        return job
+
+    def render_error(self, job: RenderJob) -> Optional[str]:
+        operation = job.handle
+        error = getattr(operation, "error", None)
+        if error:
+            return str(error)
+        response = getattr(operation, "response", None)
+        if not response or not getattr(response, "generated_videos", None):
+            # 안전 필터 등으로 영상 없이 끝난 경우
+            return "Veo 결과 영상이 없습니다"
+        return None
+
+    def check(self, job: RenderJob) -> Tuple[bool, RenderJob]:
         # Poll the operation status until the video is ready.
-        while not operation.done:
-            logger.info("Waiting for video generation to complete...")
-            time.sleep(10)
-            operation = self.client.operations.get(operation)
+        if not job.handle.done:
+            job.handle = self.client.operations.get(job.handle)
+        return bool(job.handle.done), job
 
+    def _fetch_with_sdk(self, job: RenderJob) -> Optional[bytes]:
+        # 결과 파일 URI가 없을 때: SDK로 받아 바이트로 반환
+        cut_id = job.cut_id
         # Download the video.
         try:
-            video = operation.response.generated_videos[0]
+            video = job.handle.response.generated_videos[0]
             self.client.files.download(file=video.video)
         except Exception as e:
             logger.error(f"[cut_id={cut_id}] Veo 파일 다운로드 실패: {e}")
@@ -404,98 +584,118 @@ class VideoGeneratorModelVeo3(VideoGeneratorAIBase):
 
         return output_bytes
 
+    def fetch_to(self, job: RenderJob, dest_path: str) -> Optional[str]:
+        # 결과 파일 URI가 있으면 바이트로 받지 않고 바로 스트리밍 다운로드
+        try:
+            uri = job.handle.response.generated_videos[0].video.uri
+        except Exception:
+            uri = None
+        if not uri:
+            return self._write_fetched_bytes(self._fetch_with_sdk(job), dest_path)
+
+        try:
+            digest, size = download_to_file(uri, dest_path, headers={"x-goog-api-key": os.getenv("GEMINI_API_KEY", "")})
+        except Exception as e:
+            logger.warning(f"[cut_id={job.cut_id}] Veo 스트리밍 다운로드 실패, SDK 다운로드로 재시도: {e}")
+            return self._write_fetched_bytes(self._fetch_with_sdk(job), dest_path)
+        logger.info(f"[cut_id={job.cut_id}] Veo 비디오 다운로드 완료: {size} bytes")
+        return digest
+
+
+class VideoGeneratorModelSora2(VideoRenderJobMixin, VideoGeneratorAIBase):
+    provider = "sora"
 
-class VideoGeneratorModelSora2(VideoGeneratorAIBase):
     def __init__(
         self, prompt_text: str = None, prompt_image: str = None, seconds: int = 4
     ):
         super().__init__()
-        api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=api_key)
+        self.client = get_openai_client()
         self.prompt_text = prompt_text
         self.prompt_image = prompt_image
         self.seconds = seconds
 
     def execute(self):
-        # 파일명에서 S번호와 C번호 추출
-        match = re.match(r"S(\d+)-C(\d+)", os.path.basename(self.prompt_image))
-        if not match:
-            raise ValueError(
-                "prompt_image 파일명이 'S####-C####' 형식을 따르지 않습니다."
-            )
-        scene_num = int(match.group(1))  # S번호
-        cut_num = int(match.group(2))  # C번호
-
-        logger.info(f"scene_num={scene_num}, cut_num={cut_num}")
-        cut = self.cut_list[scene_num - 1][cut_num - 1]
-        cut_id = cut.get("cut_id")
-
         try:
-            # Sora 2 API 호출 (OpenAI 비디오 생성 API 패턴 기반)
-            logger.info(f"Sora 2 작업 생성: scene={scene_num}, cut={cut_num}")
-
-            # 이미지가 있는 경우 base64로 인코딩
-            image_data = None
-            if self.prompt_image and os.path.exists(self.prompt_image):
-                img_resized = Image.open(self.prompt_image).resize((1280, 720))
-                resized_img_path = os.path.join(
-                    os.path.dirname(self.prompt_image),
-                    "resized_" + os.path.basename(self.prompt_image),
-                )
-                print(img_resized, resized_img_path)
-                img_resized.save(resized_img_path)
-                image_data = Path(resized_img_path)
-
-            # Sora 2 API 요청 구성
-            request_data = {
-                "model": "sora-2",
-                "prompt": self.prompt_text,
-                "seconds": self.seconds,
-                "size": "1280x720",  # HD 해상도
-            }
-
-            # 이미지가 있는 경우 추가
-            if image_data:
-                request_data["input_reference"] = image_data
-
-            # OpenAI API 호출 (실제 구현에서는 OpenAI의 비디오 생성 엔드포인트 사용)
-            video = self.client.videos.create(**request_data)
-
-            print("Video generation started:", video)
-
-            progress = getattr(video, "progress", 0)
-            bar_length = 30
-
-            while video.status in ("in_progress", "queued"):
-                # Refresh status
-                video = self.client.videos.retrieve(video.id)
-                progress = getattr(video, "progress", 0)
-
-                filled_length = int((progress / 100) * bar_length)
-                bar = "=" * filled_length + "-" * (bar_length - filled_length)
-                status_text = "Queued" if video.status == "queued" else "Processing"
-
-                sys.stdout.write(f"\r{status_text}: [{bar}] {progress:.1f}%")
-                sys.stdout.flush()
-                time.sleep(2)
-
-            print()
-            if video.status == "failed":
-                message = getattr(
-                    getattr(video, "error", None), "message", "Video generation failed"
-                )
-                print(message)
-                return
-
-            print("Video generation completed:", video)
-            print("Downloading video content...")
+            return super().execute()
+        except Exception as e:
+            logger.error(f"[{os.path.basename(self.prompt_image or '')}] Sora 2 비디오 생성 실패: {e}")
+            return None
 
-            response = self.client.videos.download_content(video.id, variant="video")
-            print(response)
-            content = response.read()
-            print(content)
-            return content
+    def submit(self) -> Optional[RenderJob]:
+        job = self._render_job()
+
+        # Sora 2 API 호출 (OpenAI 비디오 생성 API 패턴 기반)
+        logger.info(f"Sora 2 작업 생성: scene={job.scene_num}, cut={job.cut_num}")
+
+        # 이미지는 1280x720으로 맞춘 파일을 전처리 캐시(원본 해시 + 규격 키)에서 재사용
+        # 컷 이미지 폴더에는 아무것도 쓰지 않으며, 재시도/재생성 시 다시 변환하지 않음
+        image_data = None
+        if self.prompt_image and os.path.exists(self.prompt_image):
+            image_data = Path(prepare_reference_image(self.prompt_image, "sora_720p"))
+
+        # Sora 2 API 요청 구성
+        request_data = {
+            "model": "sora-2",
+            "prompt": self.prompt_text,
+            "seconds": self.seconds,
+            "size": "1280x720",  # HD 해상도
+        }
+
+        # 이미지가 있는 경우 추가
+        if image_data:
+            request_data["input_reference"] = image_data
+
+        # OpenAI API 호출 (실제 구현에서는 OpenAI의 비디오 생성 엔드포인트 사용)
+        job.handle = self.client.videos.create(**request_data)
+        logger.info(f"Video generation started: {job.handle.id}")
+        return job
+
+    def render_params(self) -> Dict[str, Any]:
+        return {"seconds": self.seconds}
+
+    def remote_id(self, job: RenderJob) -> Optional[str]:
+        return job.handle.id
+
+    def restore(self, remote_id: str) -> RenderJob:
+        job = self._render_job()
+        job.handle = self.client.videos.retrieve(remote_id)
+        return job
+
+    def render_error(self, job: RenderJob) -> Optional[str]:
+        video = job.handle
+        if video.status == "failed":
+            return getattr(getattr(video, "error", None), "message", "Video generation failed")
+        return None
+
+    def check(self, job: RenderJob) -> Tuple[bool, RenderJob]:
+        video = job.handle
+        if video.status in ("in_progress", "queued"):
+            # Refresh status
+            video = self.client.videos.retrieve(video.id)
+            job.handle = video
+            status_text = "Queued" if video.status == "queued" else "Processing"
+            logger.debug(f"[cut_id={job.cut_id}] Sora 2 {status_text}: {getattr(video, 'progress', 0):.1f}%")
+        return video.status not in ("in_progress", "queued"), job
+
+    def progress(self, job: RenderJob) -> Optional[float]:
+        value = getattr(job.handle, "progress", None)
+        return float(value) if isinstance(value, (int, float)) else None
+
+    def fetch_to(self, job: RenderJob, dest_path: str) -> Optional[str]:
+        video = job.handle
+        if video.status == "failed":
+            message = getattr(
+                getattr(video, "error", None), "message", "Video generation failed"
+            )
+            logger.error(f"[cut_id={job.cut_id}] {message}")
+            return None
 
+        logger.info(f"[cut_id={job.cut_id}] Video generation completed, streaming video content...")
+        try:
+            with self.client.with_streaming_response.videos.download_content(video.id, variant="video") as response:
+                digest, size = write_chunks_to_file(response.iter_bytes(download_chunk_size()), dest_path)
         except Exception as e:
-            logger.error(f"[cut_id={cut_id}] Sora 2 비디오 생성 실패: {e}")
+            logger.error(f"[cut_id={job.cut_id}] Sora 2 비디오 다운로드 실패: {e}")
             return None
+        logger.info(f"[cut_id={job.cut_id}] Sora 2 비디오 다운로드 완료: {size} bytes")
+        return digest
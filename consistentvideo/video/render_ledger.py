@@ -0,0 +1,101 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+LEDGER_NAME = ".render_jobs.sqlite"
+
+# 프로바이더가 결과를 보관하는 기간보다 짧게: 이보다 오래된 작업은 이어받지 않고 다시 제출
+RESUME_MAX_AGE_SECONDS = 24 * 3600
+
+# 작업 상태: submitted(제출됨) -> completed(렌더 완료, 다운로드 전) -> downloaded
+#          failed(프로바이더가 렌더 실패를 보고) | lost(원격 작업이 없어 확인/이어받기 불가)
+# 다운로드나 상태 확인이 일시적으로 실패한 작업은 submitted/completed로 남아 다음 실행에서 이어받음
+RESUMABLE_STATUSES = ("submitted", "completed")
+
+
+class RenderJobLedger:
+    """
+    영상 출력 디렉터리의 `.render_jobs.sqlite`에 컷별 렌더 작업(프로바이더, 원격 작업 ID, 입력 fingerprint, 제출 시각, 상태)을 기록한다.
+    서버가 재시작되거나 같은 컷을 다시 요청하면 끝나지 않은 원격 작업을 이어서 확인/다운로드해 중복 과금을 막는다.
+    """
+
+    def __init__(self, output_path: str):
+        self.path = os.path.join(output_path, LEDGER_NAME)
+        self._lock = threading.Lock()
+
+        os.makedirs(output_path or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS render_jobs (
+                cut_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                remote_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                submitted_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                error TEXT,
+                PRIMARY KEY (cut_name, fingerprint)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def resumable(self, cut_name: str, fingerprint: str, provider: str) -> Optional[Dict[str, Any]]:
+        """같은 입력으로 제출되어 아직 받지 않은 작업이 있으면 그 기록을 반환한다."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT remote_id, status, submitted_at FROM render_jobs "
+                "WHERE cut_name = ? AND fingerprint = ? AND provider = ?",
+                (cut_name, fingerprint, provider),
+            ).fetchone()
+        if row is None or row[1] not in RESUMABLE_STATUSES:
+            return None
+        if time.time() - row[2] > RESUME_MAX_AGE_SECONDS:
+            return None
+        return {"remote_id": row[0], "status": row[1], "submitted_at": row[2]}
+
+    def record_submit(self, cut_name: str, fingerprint: str, provider: str, remote_id: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO render_jobs "
+                "(cut_name, fingerprint, provider, remote_id, status, submitted_at, updated_at, error) "
+                "VALUES (?, ?, ?, ?, 'submitted', ?, ?, NULL)",
+                (cut_name, fingerprint, provider, remote_id, now, now),
+            )
+            self._conn.commit()
+
+    def mark(self, cut_name: str, fingerprint: str, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE render_jobs SET status = ?, updated_at = ?, error = ? WHERE cut_name = ? AND fingerprint = ?",
+                (status, time.time(), error, cut_name, fingerprint),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM render_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+_ledgers: Dict[str, RenderJobLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_render_ledger(output_path: str) -> RenderJobLedger:
+    """출력 디렉터리별 공용 원장. 같은 프로젝트의 요청들이 연결과 잠금을 공유한다."""
+    key = os.path.abspath(output_path)
+    with _ledgers_lock:
+        ledger = _ledgers.get(key)
+        if ledger is None:
+            ledger = _ledgers[key] = RenderJobLedger(output_path)
+        return ledger
@@ -1,11 +1,24 @@
 from .base import VideoGeneratorBase
 from .model_selector import VideoGeneratorModelSelector
+from .render_ledger import get_render_ledger
+from consistentvideo.storage import get_artifact_store
+from consistentvideo.storage.download import PART_SUFFIX
+from consistentvideo.aimodel.governor import get_governor
+from consistentvideo.aimodel.job_poller import JobLostError, is_permanent_check_error
+from consistentvideo.aimodel.pool import model_concurrency
 import os
+import time
+import uuid
+import hashlib
+import queue
 import subprocess
+import logging
+from typing import Optional
 from dotenv import load_dotenv
 import re
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 
 # 컷 묘사 이미지와 컷 텍스트, 비디오 저장위치 등의 경로에 대해서 수정할 필요가 있음!!!!!
@@ -14,12 +27,20 @@ load_dotenv()
 
 class VideoGenerator(VideoGeneratorBase):
 
-    def __init__(self, cut_list, output_path="./", cut_image_list=None, ai_model: str = "runway"):
+    def __init__(self, cut_list, output_path="./", cut_image_list=None, ai_model: str = "runway",
+                 *, submit_all: bool = False, max_in_flight: Optional[int] = None):
         super().__init__(cut_image_list)  # cut_image_list = ["path1", "path2", ... ]
         self.model_selector = VideoGeneratorModelSelector()
         self.ai_model_name = ai_model
         self.cut_list = cut_list
         self.output_path = output_path
+        # submit_all=True면 모든 컷 작업을 먼저 제출하고 끝나는 순서대로 받아 저장
+        # 동시에 렌더 중인 작업 수는 max_in_flight(기본: 모델별 상한)와 프로바이더 governor 한도를 넘지 않음
+        self.submit_all = submit_all
+        self.max_in_flight = max_in_flight
+        self.results = []  # cut_image_list 순서의 클립 경로 (실패한 컷은 None)
+        self.failed_cuts = []
+        self.resumed_cut_ids = []  # 새로 제출하지 않고 원장의 기존 원격 작업을 이어받은 컷
 
         # ------------ 추상클래스에 없는 필드 테스트용으로 만들어서 사용한 부분임 삭제 요망!!!!!!!!!!!!!!!!!!!!
         self.cut_image_list = cut_image_list
@@ -32,6 +53,178 @@ class VideoGenerator(VideoGeneratorBase):
     #     except FileNotFoundError:
     #         raise RuntimeError("api key doesn't exist")
 
+    def _build_model(self, image_path: str):
+        # 파일명에서 S번호와 C번호 추출
+        match = re.match(r'S(\d+)-C(\d+)', os.path.basename(image_path))
+        if match:
+            scene_num = int(match.group(1))  # S번호
+            cut_num = int(match.group(2))    # C번호
+
+        print(f"scene_num={scene_num}, cut_num={cut_num}")
+        cut = self.cut_list[scene_num-1][cut_num-1]
+        cut_id = cut.get('cut_id')
+        description = cut.get('description', '')
+
+        prompt_text = f"{description} Make a video that fits this situation."
+
+        # 모델 선택 및 실행
+        generator_model = self.model_selector.call_VideoGenerator_ai(
+            self.ai_model_name,
+            prompt_text=prompt_text,
+            prompt_image=image_path,
+        )
+        if generator_model is None:
+            raise RuntimeError(f"Unsupported video model: {self.ai_model_name}")
+
+        # 필요한 컨텍스트 주입
+        generator_model.cut_list = self.cut_list
+        return generator_model, scene_num, cut_id
+
+    def _save_clip_streaming(self, generator_model, job) -> Optional[str]:
+        """
+        완료된 작업의 클립을 파일로 바로 받아(fetch_to) 그 파일을 blob으로 rename해 저장한다.
+        클립 전체를 메모리에 올리지 않으므로 최대 메모리 사용량이 다운로드 청크 크기로 고정된다.
+        """
+        store = get_artifact_store(self.output_path)
+        cut_name = f"S{job.scene_num:04d}-C{job.cut_id:04d}"
+        # 저장소 staging(blob과 같은 파일시스템)에 받아 두어야 put_file이 복사 없이 옮길 수 있음
+        # 이름을 컷과 원격 작업 ID로 정해, 다운로드가 중간에 끊기면 다음 실행이 남은 .part를 Range 요청으로 이어 받음
+        remote_id = generator_model.remote_id(job)
+        token = hashlib.sha256(remote_id.encode("utf-8")).hexdigest()[:16] if remote_id else uuid.uuid4().hex
+        tmp_path = os.path.join(store.staging_dir, f"{cut_name}.{token}.mp4")
+
+        digest = generator_model.fetch_to(job, tmp_path)
+        if not digest:
+            return None
+        try:
+            filename = store.put_file(f"{cut_name}_video", tmp_path, ext=".mp4", digest=digest)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._remove_stale_parts(store.staging_dir, cut_name)
+        return os.path.join(self.output_path, filename)
+
+    @staticmethod
+    def _remove_stale_parts(staging_dir: str, cut_name: str) -> None:
+        # 클립을 저장했으면 같은 컷의 이전 원격 작업이 남긴 .part는 더 이상 이어 받을 일이 없음
+        # (아무도 이어 받지 않은 .part는 저장소 prune이 오래된 임시 파일로 정리)
+        for filename in os.listdir(staging_dir):
+            if filename.startswith(f"{cut_name}.") and filename.endswith(PART_SUFFIX):
+                try:
+                    os.remove(os.path.join(staging_dir, filename))
+                except FileNotFoundError:
+                    pass
+
+    def _submit_or_resume(self, generator_model, cut_name: str, key: str):
+        """
+        렌더 작업 원장에 같은 입력으로 제출되어 아직 받지 않은 작업이 있으면 다시 제출하지 않고 이어받는다.
+        새로 제출한 작업은 원격 ID를 바로 기록해 서버가 중간에 재시작되어도 다음 실행에서 이어받을 수 있게 한다.
+        원격 작업이 없으면(4xx) lost로 기록하고 다시 제출하며, 일시적 조회 오류는 기록을 남긴 채 예외를 올린다.
+        """
+        ledger = get_render_ledger(self.output_path)
+        record = ledger.resumable(cut_name, key, generator_model.provider)
+        if record is not None:
+            try:
+                job = generator_model.restore(record["remote_id"])
+            except Exception as e:
+                if not is_permanent_check_error(e):
+                    raise
+                logger.warning(f"[{cut_name}] 기존 렌더 작업을 찾을 수 없어 다시 제출합니다: {e}")
+                ledger.mark(cut_name, key, "lost", str(e))
+            else:
+                self.resumed_cut_ids.append(job.cut_id)
+                logger.info(f"[{cut_name}] 기존 렌더 작업 이어받기: {generator_model.provider} {record['remote_id']}")
+                return job
+
+        job = generator_model.submit()
+        remote_id = generator_model.remote_id(job) if job is not None else None
+        if remote_id:
+            ledger.record_submit(cut_name, key, generator_model.provider, remote_id)
+        return job
+
+    def _execute_submit_all(self) -> list:
+        """
+        모든 컷 작업을 제출 한도 안에서 먼저 제출하고, 끝난 작업부터 받아 저장한다.
+        프로바이더는 작업을 병렬로 렌더링하므로 전체 시간이 컷 수가 아니라 (컷 수 / 동시 작업 수)에 비례한다.
+        상태 확인은 공용 JobPoller 스레드가 맡고, 이 스레드는 제출과 완료된 작업의 다운로드/저장만 한다.
+        """
+        image_paths = list(self.cut_image_list)
+        models = [self._build_model(image_path) for image_path in image_paths]
+        ledger = get_render_ledger(self.output_path)
+        ledger_keys = [(f"S{scene_num:04d}-C{cut_id:04d}", model.job_fingerprint()) for model, scene_num, cut_id in models]
+        results = [None] * len(image_paths)
+        cap = max(1, self.max_in_flight or model_concurrency(self.ai_model_name))
+        pending = list(range(len(image_paths)))
+        pending.reverse()
+        in_flight = {}  # index -> (job, governor, 제출 시각)
+        completed = queue.Queue()  # 폴러가 완료를 알린 (index, future)
+
+        def fail(index: int, cut_id, error, *, status: Optional[str] = None) -> None:
+            # status가 없으면 원장 기록을 그대로 두어 다음 실행에서 이어받음 (일시적 상태 확인/다운로드 실패 등)
+            logger.error(f"[cut_id={cut_id}] 영상 생성 실패: {error}")
+            self.failed_cuts.append({"image_path": image_paths[index], "cut_id": cut_id, "error": str(error)})
+            if status is not None:
+                ledger.mark(*ledger_keys[index], status, str(error))
+
+        while pending or in_flight:
+            # 1) 한도가 남아 있으면 다음 컷 작업 제출
+            while pending and len(in_flight) < cap:
+                index = pending[-1]
+                generator_model, scene_num, cut_id = models[index]
+                governor = get_governor(generator_model.provider)
+                if not governor.try_acquire():
+                    break
+                pending.pop()
+                try:
+                    job = self._submit_or_resume(generator_model, *ledger_keys[index])
+                except Exception as e:
+                    governor.on_failure(e)
+                    governor.release()
+                    fail(index, cut_id, e)
+                    continue
+                if job is None:
+                    governor.release()
+                    fail(index, cut_id, "작업 제출 실패")
+                    continue
+                in_flight[index] = (job, governor, time.monotonic())
+                generator_model.track(job).add_done_callback(lambda future, index=index: completed.put((index, future)))
+
+            # 2) 완료된 작업을 도착 순서대로 받아 저장 (governor가 막고 있으면 잠시 후 다시 제출 시도)
+            try:
+                index, future = completed.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            generator_model = models[index][0]
+            job, governor, started = in_flight.pop(index)
+            error = future.exception()
+            if error is not None:
+                governor.on_failure(error)
+                governor.release()
+                fail(index, job.cut_id, error, status="lost" if isinstance(error, JobLostError) else None)
+                continue
+
+            # 렌더가 끝나면 슬롯을 반납해 다음 컷을 제출할 수 있게 한 뒤 다운로드
+            governor.on_success(time.monotonic() - started)
+            governor.release()
+            render_error = generator_model.render_error(job)
+            if render_error:
+                fail(index, job.cut_id, render_error, status="failed")
+                continue
+            ledger.mark(*ledger_keys[index], "completed")
+            try:
+                results[index] = self._save_clip_streaming(generator_model, job)
+            except Exception as e:
+                fail(index, job.cut_id, e)
+                continue
+            if not results[index]:
+                fail(index, job.cut_id, "fail to generate video")
+                continue
+            ledger.mark(*ledger_keys[index], "downloaded")
+            logger.info(f"[cut_id={job.cut_id}] 영상 저장 완료: {results[index]}")
+
+        logger.info(f"영상 일괄 생성 완료: 성공 {sum(1 for r in results if r)}개, 실패 {len(self.failed_cuts)}개")
+        return results
+
     def execute(self):
         if not self.cut_image_list:
             raise ValueError("cut_image_list is empty")
@@ -41,45 +234,43 @@ class VideoGenerator(VideoGeneratorBase):
             raise RuntimeError("There is no selected model name")
 
         os.makedirs(self.output_path, exist_ok=True)  # 출력 경로 없으면 생성
-        results = []
+        self.failed_cuts = []
+        self.resumed_cut_ids = []
+
+        if self.submit_all:
+            self.results = self._execute_submit_all()
+            return True
 
+        results = []
         for image_path in self.cut_image_list:
-            # 파일명에서 S번호와 C번호 추출
-            match = re.match(r'S(\d+)-C(\d+)', os.path.basename(image_path))
-            if match:
-                scene_num = int(match.group(1))  # S번호
-                cut_num = int(match.group(2))    # C번호
-
-            print(f"scene_num={scene_num}, cut_num={cut_num}")
-            cut = self.cut_list[scene_num-1][cut_num-1]
-            cut_id = cut.get('cut_id')
-            description = cut.get('description', '')
-            base_name = os.path.basename(image_path)
-            name_without_ext = os.path.splitext(base_name)[0]
-
-            prompt_text = f"{description} Make a video that fits this situation."
-
-            # 모델 선택 및 실행
-            generator_model = self.model_selector.call_VideoGenerator_ai(
-                self.ai_model_name,
-                prompt_text=prompt_text,
-                prompt_image=image_path,
-            )
-            if generator_model is None:
-                raise RuntimeError(f"Unsupported video model: {self.ai_model_name}")
-
-            # 필요한 컨텍스트 주입
-            generator_model.cut_list = self.cut_list
-
-            video_bytes = generator_model.execute()
-            if video_bytes:
-                filename = f"S{scene_num:04d}-C{cut_id:04d}_video.mp4"
-                full_path = os.path.join(self.output_path, filename)
-                with open(full_path, "wb") as f:
-                    f.write(video_bytes)
-                results.append(full_path)
+            generator_model, scene_num, cut_id = self._build_model(image_path)
+            cut_name, key = f"S{scene_num:04d}-C{cut_id:04d}", generator_model.job_fingerprint()
+            ledger = get_render_ledger(self.output_path)
+
+            # 상태 확인/다운로드 중 일시적 오류가 나면 원장 기록이 submitted/completed로 남아 다음 실행에서 이어받음
+            try:
+                job = generator_model.render(submit=lambda: self._submit_or_resume(generator_model, cut_name, key))
+            except JobLostError as e:
+                ledger.mark(cut_name, key, "lost", str(e))
+                raise
+            error = "fail to generate video"
+            clip_path = None
+            if job is not None:
+                render_error = generator_model.render_error(job)
+                if render_error:
+                    ledger.mark(cut_name, key, "failed", render_error)
+                    error = render_error
+                else:
+                    ledger.mark(cut_name, key, "completed")
+                    clip_path = self._save_clip_streaming(generator_model, job)
+            if clip_path:
+                ledger.mark(cut_name, key, "downloaded")
+                results.append(clip_path)
             else:
                 print(f"[cut_id={cut_id}] fail to generate video")
+                results.append(None)
+                self.failed_cuts.append({"image_path": image_path, "cut_id": cut_id, "error": error})
+        self.results = results
 
         # list_path = os.path.join(self.output_path, "clip_file_list.txt")
         # with open(list_path, "w", encoding="utf-8") as f:
@@ -17,7 +17,8 @@ import type {
   ConcatVideosRequest,
   ConcatVideosResponse,
   ApiLogEntry,
-  EntityTuple
+  EntityTuple,
+  ImageVariant
 } from './types';
 import { apiLogs } from './stores';
 
@@ -454,13 +455,15 @@ class ApiClient {
     };
   }
 
-  // 이미지 URL 생성 (동기적)
-  getImageUrl(workDir: string, entitySetName: string, relativePath: string): string {
+  // 이미지 URL 생성 (동기적). variant를 주면 서버에서 캐시된 썸네일/미리보기를 받는다
+  getImageUrl(workDir: string, entitySetName: string, relativePath: string, variant?: ImageVariant): string {
     const params = new URLSearchParams({
       work_dir: workDir,
       entity_set_name: entitySetName,
       relative_path: relativePath
     });
+    if (variant?.size) params.set('size', variant.size);
+    if (variant?.format) params.set('format', variant.format);
     const url = `${this.getBaseUrlSync()}/static/image?${params.toString()}`;
     console.log('Generated image URL:', url);
     return url;
@@ -490,9 +493,9 @@ class ApiClient {
   }
 
   // 초기화를 기다리고 URL 생성 (비동기적)
-  async getImageUrlAsync(workDir: string, entitySetName: string, relativePath: string): Promise<string> {
+  async getImageUrlAsync(workDir: string, entitySetName: string, relativePath: string, variant?: ImageVariant): Promise<string> {
     await this.ensureInitialized();
-    return this.getImageUrl(workDir, entitySetName, relativePath);
+    return this.getImageUrl(workDir, entitySetName, relativePath, variant);
   }
 
   async getVideoUrlAsync(workDir: string, entitySetName: string, relativePath: string): Promise<string> {
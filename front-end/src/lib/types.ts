@@ -30,6 +30,11 @@ export type VideoModel = "runway" | "sora2" | "veo-3.0-fast-generate-001" | "veo
 export type ImageStyle = "realistic" | "illustration" | "anime" | "watercolor" | "oil_painting" | "comic" | "storybook" | "sketch" | "pixel_art" | "lowpoly";
 export type ImageQuality = "low" | "medium" | "high";
 export type ImageSize = "1024x1024" | "1536x1024" | "2048x2048";
+// /static/image 파생 이미지 (썸네일/미리보기, WebP·AVIF 변환)
+export interface ImageVariant {
+    size?: "thumb" | "medium" | "full";
+    format?: "webp" | "avif" | "jpeg" | "png";
+}
 
 // API Request Types
 export interface SynopsisAnalyzeRequest {
@@ -40,6 +45,7 @@ export interface SynopsisAnalyzeRequest {
     synopsis_text_file?: File;
     analyzer_save_dir?: string;
     text_model: TextModel;
+    chunk_chars?: number;
 }
 
 export interface CreateEntitiesRequest {
@@ -54,6 +60,8 @@ export interface CreateEntitiesRequest {
     image_style: ImageStyle;
     image_quality: ImageQuality;
     image_size: ImageSize;
+    concurrency?: number;
+    force_regenerate?: boolean;
 }
 
 export interface MultimodalEditRequest {
@@ -98,6 +106,9 @@ export interface GenerateCutsRequest {
     story_text_file?: File;
     cuts_output_path?: string;
     text_model: TextModel;
+    concurrency?: number;
+    prompt_layout?: 'inline' | 'prefix';
+    bulk?: 'openai' | 'local';
 }
 
 export interface GenerateCutImagesRequest {
@@ -116,6 +127,8 @@ export interface GenerateCutImagesRequest {
     scene_num?: number;
     cut_num?: number;
     selected_cuts?: Array<{ scene_num: number; cut_num: number }>;
+    concurrency?: number;
+    incremental?: boolean;
 }
 
 export interface GenerateCutVideosRequest {
@@ -129,6 +142,8 @@ export interface GenerateCutVideosRequest {
     video_model: VideoModel;
     scene_num?: number;
     cut_num?: number;
+    submit_all?: boolean;
+    max_in_flight?: number;
 }
 
 export interface ConcatVideosRequest {
@@ -150,6 +165,7 @@ export interface SynopsisAnalyzeResponse {
 export interface CreateEntitiesResponse {
     entity_list: EntityTuple[];
     entity_list_output_path: string;
+    cache_report?: { hits: number; misses: number; hit_names: string[]; miss_names: string[] };
 }
 
 export interface MultimodalEditResponse {
@@ -165,14 +181,22 @@ export interface GenerateScenesResponse {
 export interface GenerateCutsResponse {
     cut_list: Cut[][];
     cuts_output_path: string;
+    failed_scenes?: { scene_num: number; scene_id?: number; error: string }[];
+    token_usage?: Record<string, number | string>;
+    bulk_status?: 'running' | 'completed' | 'failed';
+    bulk_job_id?: string;
 }
 
 export interface GenerateCutImagesResponse {
     cut_image_paths: string[];
+    failed_cuts?: { scene_num: number; cut_num: number; cut_id?: number; error: string }[];
+    reused_cut_image_paths?: string[];
 }
 
 export interface GenerateCutVideosResponse {
     video_clip_paths: string[];
+    failed_cuts?: { image_path: string; cut_id?: number; error: string }[];
+    resumed_cut_ids?: number[];
 }
 
 export interface ConcatVideosResponse {
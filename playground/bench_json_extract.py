@@ -0,0 +1,99 @@
+"""
+씬/컷 응답에서 JSON 배열을 추출하는 방식 비교 벤치마크.
+- legacy: 기존 3단계 추출(코드블록 regex -> lazy 배열 regex -> find/rfind)
+- scan  : consistentvideo.story.json_parser.extract_json_array (단일 선형 스캔)
+
+실행: python playground/bench_json_extract.py
+"""
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from consistentvideo.story.json_parser import extract_json_array  # noqa: E402
+
+
+def legacy_extract(response: str):
+    match = re.search(r"```json\s*(\[.*?\])\s*```", response, re.DOTALL | re.IGNORECASE)
+    json_str = match.group(1) if match else None
+    if not json_str:
+        match = re.search(r"(\[\s*\{[\s\S]*?\}\s*\])", response)
+        json_str = match.group(1) if match else None
+    if not json_str:
+        start = response.find("[")
+        end = response.rfind("]")
+        if start != -1 and end != -1 and end > start:
+            json_str = response[start:end + 1]
+    return json_str
+
+
+def make_cuts(n: int) -> list:
+    # description 문자열 안에 괄호/중괄호/따옴표를 섞어 넣은 컷 목록
+    return [
+        {
+            "cut_id": i,
+            "description": f'Shot {i}: a sign reads "[{{exit}}]" and }}] ... ' + "x" * 200,
+            "character": [f"인물{i}"],
+            "location": [{"name": f"장소{i}", "tags": ["[a]", "{b}"]}],
+            "object": [],
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def cases() -> dict:
+    cuts = make_cuts(400)
+    body = json.dumps(cuts, ensure_ascii=False, indent=2)
+    # 잘린 응답: 중첩 객체 리스트 없이 만들어 본문 어디에도 "}]"가 없도록 함
+    plain_cuts = [{k: v for k, v in c.items() if k != "location"} for c in cuts]
+    plain_body = json.dumps(plain_cuts, ensure_ascii=False, indent=2).replace("}]", "}")
+    truncated = plain_body[: len(plain_body) // 2]
+    # 최악의 경우: "[{" 시작 후보가 잔뜩 있지만 닫히지 않음 -> lazy regex가 후보마다 끝까지 다시 탐색
+    noise = "[{ 참고 " * 2000
+    # 닫히지만 파싱되지 않는 "[{" 후보가 반복된 뒤 실제 배열: 후보마다 json.loads 실패 후 다음 후보로 넘어감
+    unparseable = "[{}x] " * 16000
+    return {
+        "plain (nested brackets in strings)": (f"다음은 결과입니다.\n{body}\n이상입니다.", len(cuts)),
+        "code block": (f"```json\n{body}\n```", len(cuts)),
+        "truncated response": (f"결과:\n{truncated}", None),
+        "worst case: '[{' noise + truncated": (f"{noise}\n{truncated}", None),
+        "repeated unparseable '[{}x]' + array": (f"{unparseable}\n{body}", len(cuts)),
+    }
+
+
+def check(json_str, expected):
+    if json_str is None:
+        return "none"
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError:
+        return "invalid"
+    return "ok" if expected is not None and len(data) == expected else f"partial({len(data)})"
+
+
+def bench(fn, text, repeat=5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    print(f"{'case':40s} {'size':>9s} {'legacy':>12s} {'scan':>12s}  legacy/scan result")
+    for name, (text, expected) in cases().items():
+        t_old, r_old = bench(legacy_extract, text, repeat=1 if "noise" in name or "unparseable" in name else 5)
+        t_new, r_new = bench(extract_json_array, text)
+        print(
+            f"{name:40s} {len(text) // 1024:>7d}KB {t_old * 1000:>10.2f}ms {t_new * 1000:>10.2f}ms"
+            f"  {check(r_old, expected)}/{check(r_new, expected)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -248,6 +248,9 @@ cut_list = load_cut_list(STORY_CUT_LIST_PATH)
 logger.info(f"로드된 컷 씬 개수: {len(cut_list)}")
 
 # %%
+# 엔티티 카탈로그는 한 번만 만들어 모든 컷이 공유
+entity_catalog = video.EntityCatalog(entity_list, REFERENCE_IMG_PATH)
+
 scene_num = 1
 for scene in cut_list:
     cut_num = 1
@@ -262,6 +265,7 @@ for scene in cut_list:
             style=IMAGE_STYLE,
             quality=IMAGE_QUALITY,
             size=IMAGE_SIZE,
+            catalog=entity_catalog,
         )
         filename = cut_image_generator.execute()
         logger.info(f"save {filename}")